@@ -6,198 +6,113 @@
 #
 # Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
 #
-
-from mo_dots import Data
-from mo_imports import export
-
-from mo_parsing import *
-from mo_parsing.whitespaces import NO_WHITESPACE, Whitespace
-from terraform_parser.functions import *
-from terraform_parser.keywords import *
-from terraform_parser.utils import scrub, keyword
-
-expression = Forward()
-compound = Forward()
-template = Forward()
-
-with NO_WHITESPACE:
-    CR = Regex(r"\n")
-    identifier = Regex(r"[\w](\[\d+\]|[-\w])*")
-    name = ~keywords + identifier
-    quote = Literal('"').suppress()
-    string_segment = Regex(r"(\\\"|\$\$\{|\%\%\{|\$[^{]|\%[^{]|[^\"$%])+") / to_string
-    compound_string = quote + template + quote
-    multiline_string = (
-        Regex(r"(\$\$\{|\%\%\{|\$[^{]|\%[^{]|[^$%])+") / to_multiline_string
-    )
-
-    rest = Forward()
-
-    def eod_parser(tokens, _, string):
-        eod = Literal(string[tokens.start : tokens.end])
-        rest << (SkipTo(eod)("content") / multiline_content) + eod.suppress()
-
-    multiline = (
-        Literal("<<").suppress()
-        + Optional("-").suppress()
-        + SkipTo(CR)("end") / eod_parser
-        + rest
-    ) / to_multiline
-
-    path = Combine(
-        name
-        + Optional(
-            ~ELLIPSIS + "." + delimited_list(identifier | "*", ".", combine=True)
-        )
-    )
-
-    comment = (
-        Literal("#").suppress() + SkipTo(CR)
-        | "/*" + SkipTo("*/", include=True)
-        | Literal("//").suppress() + SkipTo(CR)
-    )
-
-single_line_white = Whitespace(white="\t ")
-single_line_white.add_ignore(comment)
-
-multiline_white = Whitespace()
-multiline_white.add_ignore(comment)
-
-object = Forward()
-
-with single_line_white:
-    assignment = identifier + Group(ASSIGN + expression)
-    property = compound_string + Group(ASSIGN + expression)
-    sub_resource = (
-        (keyword("provisioner") | keyword("backend")) + compound_string + object
-    )
-
-    assignments = delimited_list(
-        Group(sub_resource | assignment | property) / to_inner_object,
-        separator=OneOrMore(CR | COMMA),
-    )
-    splat_accessor = LB + "*" + RB
-    dynamic_accessor = LB + expression + RB
-    simple_accessor = Literal(".").suppress() + identifier / to_multiline_string
-
-with multiline_white:
-
-    object << LC + Optional(Group(assignments)) + RC
-    function_call = (
-        name("op") + LP + delimited_list(expression("params")) + Optional(COMMA) + RP
-    ) / to_json_call
-
-    for_preamble = FOR + (
-        (
-            Group(identifier / (lambda t: {"name": t[0], "value": "index"}))
-            + Optional(
-                COMMA + Group(identifier / (lambda t: {"name": t[0], "value": "value"}))
-            )
-        )("select")
-        + IN
-        + compound("from")
-    )("from")
-
-    for_object = (
-        LC
-        + for_preamble
-        + COLON
-        + expression("groupby")
-        + "=>"
-        + (expression("value"))("select")
-        + Optional(IF + expression("where"))
-        + RC
-    )("object")
-
-    for_tuple = (
-        LB
-        + for_preamble
-        + COLON
-        + Group(expression("value"))("select")
-        + Optional(IF + expression("where"))
-        + RB
-    )
-
-    if_when = LPC + IF + expression("when") + RC
-    if_else = LPC + ELSE + RC
-    if_ends = LPC + Keyword("endif").suppress() + RC
-    basic_template = LDC + expression + RC
-    for_start = LPC + for_preamble + RC
-    for_end = LPC + Keyword("endfor").suppress() + RC
-
-    compound << (
-        NULL
-        | TRUE
-        | FALSE
-        | compound_string
-        | for_object
-        | for_tuple
-        | LP + expression + RP
-        | LB + delimited_list(expression) + Optional(COMMA) + RB
-        | object
-        | multiline
-        | function_call
-        | real_num
-        | int_num
-        | path
-    )
-
-    expression << infix_notation(
-        compound,
-        [
-            (splat_accessor, 1, LEFT_ASSOC, to_splat),
-            (dynamic_accessor, 1, LEFT_ASSOC, to_offset),
-            (simple_accessor, 1, LEFT_ASSOC, to_offset),
-            (ELLIPSIS, 1, LEFT_ASSOC, to_list),
-        ]
-        + [
-            (
-                o,
-                1 if o in unary_ops else (3 if isinstance(o, tuple) else 2),
-                unary_ops.get(o, LEFT_ASSOC),
-                to_json_operator,
-            )
-            for o in KNOWN_OPS
-        ],
-    )
-
-    resource = (
-        Keyword("resource").suppress() + compound_string + compound_string + object
-    )
-    data = Keyword("data") + compound_string + compound_string + object
-    module = Keyword("module").suppress() + compound_string + object
-    # module = (identifier("type") + string("name") + json("params")) / dict
-    variable = Keyword("variable") / "var" + compound_string + object
-    output = Keyword("output") + compound_string + object
-    local = Keyword("locals") / "local" + object
-    provider = Keyword("provider") + compound_string + object
-    terraform = keyword("terraform") + object
-    everything = ZeroOrMore(
-        (terraform | resource | data | module | variable | output | local | provider)
-        / to_inner_object
-    )
-
-
-with NO_WHITESPACE:
-    if_template = Group(
-        (if_when + template("then")) / dict + Optional(if_else + template) + if_ends
-    )("case")
-    for_template = (for_start + Group(template("value"))("select") + for_end) / dict
-    code = basic_template | if_template | for_template
-    template << Group(ZeroOrMore(string_segment | code) / to_concat)
-    multiline_string_parser = Group(
-        ZeroOrMore(multiline_string | code) / to_concat
-    ).finalize()
-
-
-set_parser_names()
-everything = everything.finalize()
-
-
-def parse(content) -> Data:
-    return scrub(everything.parse(content, parse_all=True))
-
-
-export("terraform_parser.functions", multiline_string_parser)
-
-# https://github.com/hashicorp/hcl/blob/main/hclsyntax/spec.md
+from importlib import import_module
+
+# THE GRAMMAR (AND EVERYTHING THAT NEEDS IT) IS BUILT ON FIRST USE, NOT AT
+# IMPORT, SO SHORT-LIVED TOOLS THAT HIT THE CACHE NEVER PAY FOR IT
+_lazy = {
+    "ParseCache": "terraform_parser.cache",
+    "parse_files": "terraform_parser.parallel",
+    "parse_directory": "terraform_parser.parallel",
+    "ParsedFile": "terraform_parser.parallel",
+    "IncrementalParser": "terraform_parser.incremental",
+    "split_blocks": "terraform_parser.blocks",
+    "parse_blocks": "terraform_parser.blocks",
+    "parse_lazy": "terraform_parser.blocks",
+    "LazyBlock": "terraform_parser.blocks",
+    "iter_parse": "terraform_parser.blocks",
+    "BlockIndex": "terraform_parser.index",
+    "Corpus": "terraform_parser.columnar",
+    "to_hcl": "terraform_parser.writer",
+    "write": "terraform_parser.writer",
+    "Merge": "terraform_parser.merge",
+    "merge_files": "terraform_parser.merge",
+    "DependencyGraph": "terraform_parser.graph",
+    "to_dot": "terraform_parser.diagram",
+    "Profile": "terraform_parser.profile",
+    "Evaluator": "terraform_parser.evaluate",
+    "normalize": "terraform_parser.normalize",
+    # BEFORE THE GRAMMAR WAS LAZY, THIS MODULE WAS THE GRAMMAR, AND EXPORTED
+    # WHAT IT IMPORTED TOO
+    "Data": "mo_dots",
+}
+
+# SUBMODULES THE GRAMMAR IMPORTED, SO WERE EXPORTED AS MODULES
+_submodules = ("functions", "utils")
+
+# NAMES TAKEN FROM THE GRAMMAR: ITS RULES, AND WHAT IT IMPORTS (eg mo_parsing)
+_grammar = tuple("""
+    ADD AND And AnyChar ASSIGN assignment assignments basic_template binary_ops Call
+    CaselessKeyword CaselessLiteral Char CharsNotIn CloseMatch code COLON Combine
+    COMMA comment compound compound_string CR data delimited_list Dict DIV
+    dynamic_accessor ELLIPSIS ELSE Empty EQ everything expect export expression
+    FALSE first FollowedBy FOR for_end for_object for_preamble for_start
+    for_template for_tuple Forward function_call Group GT GTE identifier IF if_else
+    if_ends if_template if_when IN infix_notation int_num interpolation_parser
+    is_number json Keyword keyword keywords KNOWN_OPS LB LC LDC LEFT_ASSOC LineEnd
+    LineStart Literal local LookAhead LookBehind LP LPC LT LTE Many MatchAll
+    MatchFirst MOD module MUL multiline multiline_string multiline_string_parser
+    multiline_white name NEG NEQ NO_WHITESPACE NoMatch NOT NotAny NULL object one_of
+    OneOrMore Optional OR Or output ParseEnhancement ParseException ParseExpression
+    ParserElement ParseResults ParseSyntaxException path POS PrecededBy precedence
+    property provider quote RB RC real_num RecursiveGrammarException Regex resource
+    RIGHT_ASSOC RP scrub set_parser_names simple_accessor single_line_white SkipTo
+    splat_accessor SQL_NULL string_segment StringEnd StringStart SUB sub_resource
+    Suppress template terraform THEN to_concat to_inner_object to_json_call
+    to_json_operator to_list to_multiline to_multiline_string to_offset to_splat
+    to_string Token TokenConverter TRUE unary_ops variable White Whitespace Word
+    WordEnd WordStart ZeroOrMore
+""".split())
+
+
+def parse(content, cache=None, profile=None, normalize=False):
+    """
+    THREAD SAFE: THE GRAMMAR HOLDS NO PER-PARSE STATE, AND mo_parsing RUNS EACH
+    PARSE UNDER ITS OWN LOCK.  THREADS DO NOT PARSE IN PARALLEL; USE parse_files()
+    TO SPREAD WORK OVER CORES.
+
+    :param content: TERRAFORM SOURCE
+    :param cache: OPTIONAL ParseCache, TO SKIP PARSING CONTENT SEEN BEFORE
+    :param profile: OPTIONAL Profile, TO ACCUMULATE PER-RULE COUNTS AND TIMES
+    :param normalize: True TO FOLD CONSTANTS, AND MERGE LITERAL RUNS (SEE normalize())
+    """
+    if normalize:
+        from terraform_parser.normalize import normalize as fold
+
+        return fold(parse(content, cache, profile))
+    if cache is not None:
+        try:
+            return cache[content]
+        except KeyError:
+            pass
+    from terraform_parser.grammar import everything
+    from terraform_parser.utils import collapse
+
+    if profile is None:
+        result = collapse(list(everything.parse(content, parse_all=True)))
+    else:
+        with profile:
+            result = collapse(list(everything.parse(content, parse_all=True)))
+    if cache is not None:
+        cache[content] = result
+    return result
+
+
+def __getattr__(name):
+    """
+    PEP 562: LOAD THE MODULE PROVIDING name ON FIRST ACCESS; A GRAMMAR NAME
+    (eg everything, expression) IS TAKEN FROM THE GRAMMAR, ANY OTHER NAME IS
+    AN AttributeError, WITHOUT BUILDING THE GRAMMAR
+    """
+    if name in _submodules:
+        value = import_module(f"{__name__}.{name}")
+        globals()[name] = value
+        return value
+    module = _lazy.get(name)
+    if module is None and name in _grammar:
+        module = "terraform_parser.grammar"
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,174 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from terraform_parser import parse
+from terraform_parser.lexer import (
+    tokenize,
+    skip_white,
+    code_end,
+    ScanError,
+    STRING,
+    IDENTIFIER,
+    KEYWORD,
+    OPERATOR,
+    NEWLINE,
+)
+from terraform_parser.utils import collapse
+
+# FILES SMALLER THAN THIS ARE NOT WORTH SENDING TO OTHER PROCESSES
+MIN_PARALLEL_SIZE = 64 * 1024
+
+
+class LazyBlock(object):
+    """
+    A TOP-LEVEL BLOCK, WITH ITS HEADER (eg resource "aws_instance" "this") READY,
+    AND ITS BODY PARSED ON FIRST ACCESS OF value
+    """
+
+    __slots__ = ["kind", "labels", "start", "end", "content", "_chars", "_value"]
+
+    def __init__(self, kind, labels, start, end, content, chars=None):
+        """
+        :param start: BYTE OFFSET (IN THE UTF-8 ENCODED FILE) OF THE BLOCK
+        :param end: BYTE OFFSET OF THE END OF THE BLOCK
+        :param chars: (start, end) CHARACTER OFFSETS INTO content, IF NOT THE SAME AS THE BYTES
+        """
+        self.kind = kind
+        self.labels = labels
+        self.start = start
+        self.end = end
+        self.content = content
+        self._chars = chars or (start, end)
+        self._value = _not_parsed
+
+    @property
+    def text(self):
+        start, end = self._chars
+        return self.content[start:end]
+
+    @property
+    def value(self):
+        if self._value is _not_parsed:
+            self._value = collapse(parse_block(self.text))
+        return self._value
+
+    def __str__(self):
+        return " ".join([self.kind, *(json.dumps(l) for l in self.labels)])
+
+
+_not_parsed = object()
+
+
+def parse_lazy(content):
+    """
+    :return: LIST OF LazyBlock, WITHOUT PARSING ANY BLOCK BODY
+    """
+    if content.isascii():
+        return [
+            LazyBlock(labels[0], tuple(labels[1:]), start, end, content)
+            for start, labels, end in _scan(content)
+        ]
+    # BYTE OFFSETS ARE NOT CHARACTER OFFSETS: COUNT THE BYTES BETWEEN BLOCKS AS WE GO
+    output = []
+    char, byte = 0, 0
+    for start, labels, end in _scan(content):
+        byte_start = byte + len(content[char:start].encode("utf8"))
+        byte = byte_start + len(content[start:end].encode("utf8"))
+        char = end
+        output.append(
+            LazyBlock(labels[0], tuple(labels[1:]), byte_start, byte, content, (start, end))
+        )
+    return output
+
+
+def split_blocks(content):
+    """
+    FIND THE TOP-LEVEL BLOCKS WITHOUT PARSING THEM; RESPECTS STRINGS,
+    TEMPLATES, HEREDOCS AND COMMENTS
+    :return: GENERATOR OF (start, end) CHARACTER OFFSETS INTO content
+    """
+    for start, _, end in _scan(content):
+        yield start, end
+
+
+def _scan(content):
+    """
+    :return: GENERATOR OF (start, labels, end) FOR EACH BLOCK; labels[0] IS THE KIND
+    """
+    length = len(content)
+    pos = skip_white(content, 0)
+    while pos < length:
+        labels = []
+        for kind, start, end in tokenize(content, pos):
+            if kind == STRING:
+                labels.append(json.loads(content[start:end]))
+            elif kind in (IDENTIFIER, KEYWORD):
+                labels.append(content[start:end])
+            elif kind == OPERATOR and content[start] == "{" and labels:
+                end = code_end(content, end, ["{"])
+                break
+            elif kind != NEWLINE:
+                raise ScanError(f"expecting block header at {start}")
+        else:
+            raise ScanError(f"expecting block at {pos}")
+        yield pos, labels, end
+        pos = skip_white(content, end)
+
+
+def parse_block(content):
+    """
+    :return: LIST OF TOP-LEVEL VALUES IN content
+    """
+    from terraform_parser.grammar import everything
+
+    return list(everything.parse(content, parse_all=True))
+
+
+def parse_blocks(content, jobs=None):
+    """
+    SAME RESULT AS parse(content), BUT EACH TOP-LEVEL BLOCK IS PARSED ON ITS OWN,
+    ON A POOL OF WORKER PROCESSES WHEN content IS LARGE
+    :param jobs: NUMBER OF WORKER PROCESSES (DEFAULT os.cpu_count()), 1 TO PARSE IN THIS PROCESS
+    """
+    try:
+        texts = [content[start:end] for start, end in split_blocks(content)]
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1 or len(texts) < 2 or len(content) < MIN_PARALLEL_SIZE:
+            values = [parse_block(t) for t in texts]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                chunk = max(1, len(texts) // (jobs * 4))
+                values = list(pool.map(parse_block, texts, chunksize=chunk))
+    except Exception:
+        # LET THE FULL PARSER REPORT THE ERROR, WITH CORRECT POSITIONS
+        return parse(content)
+    return collapse([v for vs in values for v in vs])
+
+
+def iter_parse(content):
+    """
+    STREAMING parse(): EACH TOP-LEVEL BLOCK IS PARSED, SCRUBBED AND YIELDED ON
+    ITS OWN, SO ONLY ONE BLOCK'S ParseResults IS EVER HELD IN MEMORY
+    :return: GENERATOR OF THE SCRUBBED VALUE OF EACH BLOCK (parse() RETURNS THE
+             LIST OF THESE, OR THE ONE VALUE, OR None)
+    """
+    count = 0
+    try:
+        for start, _, end in _scan(content):
+            for value in parse_block(content[start:end]):
+                yield value
+                count += 1
+    except Exception:
+        # LET THE FULL PARSER REPORT THE ERROR, WITH CORRECT POSITIONS; IF IT
+        # FINDS NO ERROR, CONTINUE WITH ITS VALUES
+        for value in parse_block(content)[count:]:
+            yield value
@@ -0,0 +1,166 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import hashlib
+import os
+import pickle
+import threading
+import time
+import zlib
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def grammar_version():
+    """
+    :return: FINGERPRINT OF THE PACKAGE VERSION, THE GRAMMAR SOURCE, AND mo-parsing
+    """
+    from importlib import metadata
+
+    digest = hashlib.sha256()
+    for package in ("terraform-parser", "mo-parsing"):
+        try:
+            digest.update(f"{package}={metadata.version(package)}\n".encode("utf8"))
+        except metadata.PackageNotFoundError:
+            pass
+    for name in sorted(os.listdir(PACKAGE_DIR)):
+        if name.endswith(".py"):
+            with open(os.path.join(PACKAGE_DIR, name), "rb") as f:
+                digest.update(name.encode("utf8"))
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache(object):
+    """
+    CONTENT-ADDRESSED, SIZE-BOUNDED, ON-DISK CACHE OF parse() RESULTS
+
+    KEYED BY (grammar_version(), content), SO ENTRIES FROM OTHER VERSIONS
+    ARE NEVER SEEN, AND ARE THE FIRST TO BE EVICTED
+    """
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024, version=None):
+        """
+        :param directory: WHERE TO STORE THE CACHE FILES
+        :param max_size: BYTES ALLOWED ON DISK BEFORE LEAST-RECENTLY-USED ARE EVICTED
+        :param version: OVERRIDE THE GRAMMAR VERSION (FOR TESTING)
+        """
+        self.directory = os.path.abspath(directory)
+        self.max_size = max_size
+        self.version = version or grammar_version()
+        os.makedirs(self.directory, exist_ok=True)
+        self.size = sum(size for _, _, size in self._entries())
+
+    def key(self, content):
+        digest = hashlib.sha256(self.version.encode("utf8"))
+        digest.update(content.encode("utf8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def __getitem__(self, content):
+        path = self._path(self.key(content))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            _touch(path)
+        except OSError:
+            raise KeyError(content) from None
+        try:
+            return _loads(data)
+        except Exception:
+            # CORRUPT (eg TRUNCATED BY A FULL DISK), OR PICKLED BY OTHER CODE (eg A
+            # CLASS THAT IS GONE): FORGET IT, SO IT IS PARSED AGAIN
+            self._remove(path)
+            raise KeyError(content) from None
+
+    def __setitem__(self, content, value):
+        path = self._path(self.key(content))
+        data = _dumps(value)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        try:
+            # REPLACING AN ENTRY DOES NOT ADD TO THE SIZE
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        # ATOMIC, SO CONCURRENT PROCESSES NEVER SEE PARTIAL ENTRIES
+        os.replace(temp, path)
+        _touch(path)
+        self.size += len(data) - previous
+        if self.size > self.max_size:
+            self.evict()
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        self.size = max(0, self.size - size)
+
+    def __contains__(self, content):
+        return os.path.exists(self._path(self.key(content)))
+
+    def evict(self):
+        """
+        REMOVE LEAST-RECENTLY-USED ENTRIES UNTIL WE ARE 10% BELOW max_size
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        limit = self.max_size * 0.9
+        for _, path, size in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self.size = total
+
+    def clear(self):
+        for _, path, _ in list(self._entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.size = 0
+
+    def _entries(self):
+        """
+        :return: (last_used, path, size) FOR EVERY ENTRY
+        """
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield stat.st_mtime_ns, entry.path, stat.st_size
+
+
+def _touch(path):
+    # FILESYSTEM CLOCKS ARE COARSE; USE OUR OWN SO EVICTION IS LEAST-RECENTLY-USED
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def _dumps(value):
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(data):
+    return pickle.loads(zlib.decompress(data))
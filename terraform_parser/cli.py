@@ -0,0 +1,153 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+PARSE TERRAFORM FILES TO NDJSON
+
+    python -m terraform_parser [--jobs N] [--blocks] [--cache DIR] [--normalize] PATH...
+
+EACH PATH IS A FILE, A DIRECTORY (SEARCHED FOR *.tf), OR A GLOB.  ONE RECORD
+PER FILE IS WRITTEN TO stdout:
+
+    {"path": "main.tf", "result": ...}
+
+OR, WITH --blocks, ONE RECORD PER BLOCK:
+
+    {"path": "main.tf", "address": "aws_s3_bucket.logs", "keyword": "resource", "labels": [...], "body": ...}
+
+A FILE THAT CAN NOT BE PARSED IS {"path": ..., "error": ...}; THE OTHER FILES
+ARE STILL PARSED, AND THE EXIT CODE IS 1
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+from terraform_parser.parallel import find_files, parse_files
+from terraform_parser.utils import SQL_NULL
+
+
+def expand(paths, extension=".tf"):
+    """
+    :param paths: FILES, DIRECTORIES, AND GLOBS
+    :return: GENERATOR OF FILE PATHS, EACH ONCE, IN THE ORDER GIVEN
+    """
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            found = find_files(path, extension)
+        elif glob.has_magic(path):
+            found = sorted(
+                f
+                for p in glob.glob(path, recursive=True)
+                for f in (find_files(p, extension) if os.path.isdir(p) else [p])
+            )
+        else:
+            found = [path]
+        for f in found:
+            if f not in seen:
+                seen.add(f)
+                yield f
+
+
+def records(parsed, blocks=False, normalize=False):
+    """
+    :param parsed: ParsedFile
+    :return: GENERATOR OF THE RECORDS (dicts) TO WRITE FOR IT
+    """
+    if parsed.error is not None:
+        yield {"path": parsed.path, "error": parsed.error}
+        return
+    result = parsed.result
+    if normalize:
+        from terraform_parser.normalize import normalize as fold
+
+        result = fold(result)
+    if not blocks:
+        yield {"path": parsed.path, "result": result}
+        return
+    from terraform_parser.writer import address, iter_blocks
+
+    for keyword, labels, body in iter_blocks(result):
+        yield {
+            "path": parsed.path,
+            "address": address(keyword, labels),
+            "keyword": keyword,
+            "labels": list(labels),
+            "body": body,
+        }
+
+
+def to_json(record):
+    return json.dumps(record, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _default(value):
+    if value is SQL_NULL:
+        return None
+    raise TypeError(f"can not write {value.__class__.__name__} as JSON")
+
+
+def main(argv=None, stdout=None, stderr=None):
+    """
+    :return: EXIT CODE: 0 IF ALL FILES PARSED, 1 IF ANY FAILED, 2 IF NO FILES FOUND
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    parser = argparse.ArgumentParser(
+        prog="terraform-parser", description="Parse Terraform files to NDJSON"
+    )
+    parser.add_argument("paths", nargs="+", metavar="PATH", help="file, directory, or glob")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes (default: one per CPU, 1 to parse in this process)",
+    )
+    parser.add_argument("--blocks", action="store_true", help="write one record per block")
+    parser.add_argument("--cache", metavar="DIR", help="directory to keep parse results in")
+    parser.add_argument(
+        "--normalize", action="store_true", help="fold constants and merge literal runs"
+    )
+    parser.add_argument(
+        "--extension", default=".tf", help="extension of files to find in directories"
+    )
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        from terraform_parser.cache import ParseCache
+
+        cache = ParseCache(args.cache)
+
+    paths = list(expand(args.paths, args.extension))
+    if not paths:
+        stderr.write("no files found\n")
+        return 2
+
+    failures = 0
+    try:
+        for parsed in parse_files(paths, jobs=args.jobs, cache=cache):
+            if parsed.error is not None:
+                failures += 1
+                stderr.write(f"{parsed.path}: {parsed.error}\n")
+            for record in records(parsed, args.blocks, args.normalize):
+                stdout.write(to_json(record))
+                stdout.write("\n")
+        stdout.flush()
+    except BrokenPipeError:
+        # THE READER (eg head) STOPPED EARLY; DO NOT COMPLAIN AGAIN AT EXIT
+        if stdout is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    if failures:
+        stderr.write(f"{failures} of {len(paths)} files failed\n")
+        return 1
+    return 0
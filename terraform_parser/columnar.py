@@ -0,0 +1,352 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from array import array
+
+from terraform_parser.utils import SQL_NULL, Template
+
+# NODE KINDS
+DICT = 0
+LIST = 1
+STRING = 2
+INTEGER = 3
+NUMBER = 4  # FLOATS, AND INTEGERS TOO BIG FOR AN int32
+TRUE = 5
+FALSE = 6
+NONE = 7
+NULL = 8  # SQL_NULL
+TEMPLATE = 9  # A DICT THAT parse() MARKED AS A STRING TEMPLATE (SEE Template)
+
+DICTS = (DICT, TEMPLATE)
+
+NO_KEY = -1
+_MAX_INT = 2 ** 31 - 1
+
+
+class Corpus(object):
+    """
+    MANY PARSE RESULTS, STORED AS FLAT ARRAYS, ONE ENTRY PER NODE, IN
+    PRE-ORDER.  THE DESCENDANTS OF NODE i ARE i+1 UP TO (NOT INCLUDING) end[i]
+
+        kind[i]   - ONE OF THE NODE KINDS ABOVE
+        parent[i] - INDEX OF THE CONTAINING NODE (-1 FOR A FILE'S ROOT)
+        key[i]    - STRING ID OF THE DICT KEY THAT HOLDS THIS NODE, OR NO_KEY
+        value[i]  - STRING ID, INTEGER, OR INDEX INTO numbers, DEPENDING ON kind
+
+    EVERY STRING (KEYS AND VALUES) IS STORED ONCE.  WHILE ADDING, THEY ARE IN
+    A LIST; freeze() PACKS THEM INTO ONE str, WITH offsets, AND DROPS THE
+    LOOKUP TABLE NEEDED TO INTERN MORE
+    """
+
+    __slots__ = [
+        "kind",
+        "parent",
+        "key",
+        "value",
+        "end",
+        "strings",
+        "text",
+        "offsets",
+        "numbers",
+        "_ids",
+        "files",
+        "errors",
+    ]
+
+    def __init__(self):
+        self.kind = array("b")
+        self.parent = array("i")
+        self.key = array("i")
+        self.value = array("i")
+        self.end = array("i")
+        self.strings = []
+        self.text = None
+        self.offsets = None
+        self.numbers = []
+        self._ids = {}
+        self.files = {}  # MAP FROM path TO INDEX OF ROOT NODE
+        self.errors = {}  # MAP FROM path TO ERROR MESSAGE
+
+    def __len__(self):
+        return len(self.kind)
+
+    def intern(self, string):
+        """
+        :return: ID OF string IN THE STRING TABLE
+        """
+        if self.text is not None:
+            self._thaw()
+        id = self._ids.get(string)
+        if id is None:
+            id = self._ids[string] = len(self.strings)
+            self.strings.append(string)
+        return id
+
+    def add(self, path, result):
+        """
+        STORE ONE parse() RESULT, REPLACING ANY EARLIER ONE FOR path
+        :return: Cursor OF ITS ROOT
+        """
+        if path in self.files:
+            self.remove(path)
+        root = self.files[path] = self._add(result, -1, NO_KEY)
+        return Cursor(self, root)
+
+    def remove(self, path):
+        """
+        DROP THE NODES OF path; THE NODES AFTER THEM MOVE DOWN TO FILL THE GAP,
+        SO CURSORS MADE BEFORE ARE NO LONGER VALID.  ITS STRINGS ARE KEPT, THEY
+        MAY BE SHARED
+        """
+        start = self.files.pop(path)
+        stop = self.end[start]
+        size = stop - start
+        # NUMBERS ARE APPENDED IN NODE ORDER, SO THOSE OF path ARE ONE RUN TOO
+        numbers = [self.value[i] for i in range(start, stop) if self.kind[i] == NUMBER]
+        if numbers:
+            del self.numbers[numbers[0] : numbers[-1] + 1]
+        for column in (self.kind, self.parent, self.key, self.value, self.end):
+            del column[start:stop]
+
+        kind, parent, value, end = self.kind, self.parent, self.value, self.end
+        for i in range(start, len(kind)):
+            # A LATER NODE IS A ROOT, OR ITS PARENT IS LATER TOO
+            if parent[i] != -1:
+                parent[i] -= size
+            end[i] -= size
+            if numbers and kind[i] == NUMBER:
+                value[i] -= len(numbers)
+        for other, root in self.files.items():
+            if root > start:
+                self.files[other] = root - size
+
+    def _add(self, value, parent, key):
+        index = len(self.kind)
+        self.parent.append(parent)
+        self.key.append(key)
+        self.end.append(0)
+        if value is SQL_NULL:
+            self._set(NULL, 0)
+        elif value is None:
+            self._set(NONE, 0)
+        elif value is True:
+            self._set(TRUE, 0)
+        elif value is False:
+            self._set(FALSE, 0)
+        elif isinstance(value, str):
+            self._set(STRING, self.intern(value))
+        elif isinstance(value, int) and -_MAX_INT <= value <= _MAX_INT:
+            self._set(INTEGER, value)
+        elif isinstance(value, (int, float)):
+            self._set(NUMBER, len(self.numbers))
+            self.numbers.append(value)
+        elif isinstance(value, dict):
+            self._set(TEMPLATE if isinstance(value, Template) else DICT, len(value))
+            for k, v in value.items():
+                self._add(v, index, self.intern(k))
+        elif isinstance(value, list):
+            self._set(LIST, len(value))
+            for v in value:
+                self._add(v, index, NO_KEY)
+        else:
+            raise TypeError(f"can not store {value.__class__.__name__}")
+        self.end[index] = len(self.kind)
+        return index
+
+    def string(self, id):
+        """
+        :return: THE STRING WITH GIVEN id
+        """
+        if self.text is None:
+            return self.strings[id]
+        return self.text[self.offsets[id] : self.offsets[id + 1]]
+
+    def freeze(self):
+        """
+        PACK THE STRING TABLE; CALL WHEN DONE ADDING
+        """
+        if self.text is not None:
+            return
+        offsets = array("q", [0])
+        for string in self.strings:
+            offsets.append(offsets[-1] + len(string))
+        self.text = "".join(self.strings)
+        self.offsets = offsets
+        self.strings = None
+        self._ids = None
+
+    def _thaw(self):
+        self.strings = [self.string(id) for id in range(len(self.offsets) - 1)]
+        self._ids = {string: id for id, string in enumerate(self.strings)}
+        self.text = None
+        self.offsets = None
+
+    def _set(self, kind, value):
+        self.kind.append(kind)
+        self.value.append(value)
+
+    def __getitem__(self, path):
+        """
+        :return: Cursor OF THE ROOT OF path
+        """
+        return Cursor(self, self.files[path])
+
+    def to_json(self, path):
+        return self[path].to_json()
+
+    def memory(self):
+        """
+        :return: APPROXIMATE BYTES USED BY THE ARRAYS AND TABLES
+        """
+        arrays = (self.kind, self.parent, self.key, self.value, self.end)
+        size = sum(a.itemsize * len(a) for a in arrays)
+        size += sum(n.__sizeof__() for n in self.numbers) + self.numbers.__sizeof__()
+        if self.text is None:
+            size += sum(s.__sizeof__() for s in self.strings) + self.strings.__sizeof__()
+            size += self._ids.__sizeof__()
+        else:
+            size += self.text.__sizeof__() + self.offsets.itemsize * len(self.offsets)
+        return size
+
+
+def from_files(paths, jobs=None, cache=None):
+    """
+    PARSE paths (SEE parse_files) INTO A Corpus; FILES THAT FAIL TO PARSE ARE
+    RECORDED IN Corpus.errors
+    """
+    from terraform_parser.parallel import parse_files
+
+    corpus = Corpus()
+    for parsed in parse_files(paths, jobs=jobs, cache=cache):
+        if parsed.error:
+            corpus.errors[parsed.path] = parsed.error
+        else:
+            corpus.add(parsed.path, parsed.result)
+    corpus.freeze()
+    return corpus
+
+
+class Cursor(object):
+    """
+    A POSITION IN A Corpus; CHEAP TO MAKE, HOLDS NO COPY OF THE DATA
+    """
+
+    __slots__ = ["corpus", "index"]
+
+    def __init__(self, corpus, index):
+        self.corpus = corpus
+        self.index = index
+
+    @property
+    def kind(self):
+        return self.corpus.kind[self.index]
+
+    @property
+    def key(self):
+        """
+        :return: THE DICT KEY HOLDING THIS NODE, OR None
+        """
+        key = self.corpus.key[self.index]
+        return None if key == NO_KEY else self.corpus.string(key)
+
+    @property
+    def parent(self):
+        parent = self.corpus.parent[self.index]
+        return None if parent == -1 else Cursor(self.corpus, parent)
+
+    @property
+    def value(self):
+        """
+        :return: THE SCALAR VALUE OF THIS NODE (USE to_json() FOR CONTAINERS)
+        """
+        corpus, index = self.corpus, self.index
+        kind = corpus.kind[index]
+        if kind == STRING:
+            return corpus.string(corpus.value[index])
+        elif kind == INTEGER:
+            return corpus.value[index]
+        elif kind == NUMBER:
+            return corpus.numbers[corpus.value[index]]
+        elif kind == TRUE:
+            return True
+        elif kind == FALSE:
+            return False
+        elif kind == NULL:
+            return SQL_NULL
+        elif kind == NONE:
+            return None
+        raise TypeError("containers have no scalar value, use to_json()")
+
+    def __len__(self):
+        """
+        :return: NUMBER OF CHILDREN
+        """
+        if self.kind in (DICT, TEMPLATE, LIST):
+            return self.corpus.value[self.index]
+        return 0
+
+    def __iter__(self):
+        """
+        :return: CURSORS OF THE CHILDREN
+        """
+        corpus, end = self.corpus, self.corpus.end
+        child, stop = self.index + 1, end[self.index]
+        while child < stop:
+            yield Cursor(corpus, child)
+            child = end[child]
+
+    def items(self):
+        for child in self:
+            yield child.key, child
+
+    def __getitem__(self, item):
+        """
+        :param item: DICT KEY, OR LIST INDEX
+        """
+        kind = self.kind
+        if kind in DICTS and isinstance(item, str):
+            for child in self:
+                if child.key == item:
+                    return child
+            raise KeyError(item)
+        elif kind == LIST and isinstance(item, int):
+            if item < 0:
+                item += len(self)
+            for i, child in enumerate(self):
+                if i == item:
+                    return child
+            raise IndexError(item)
+        raise TypeError(f"can not index {self.key or 'node'} with {item!r}")
+
+    def get(self, item, default=None):
+        try:
+            return self[item]
+        except (KeyError, IndexError, TypeError):
+            return default
+
+    def to_json(self):
+        """
+        :return: THIS NODE IN THE SAME SHAPE AS parse() RETURNS
+        """
+        kind = self.kind
+        if kind == DICT:
+            return {child.key: child.to_json() for child in self}
+        elif kind == TEMPLATE:
+            return Template((child.key, child.to_json()) for child in self)
+        elif kind == LIST:
+            return [child.to_json() for child in self]
+        return self.value
+
+    def __eq__(self, other):
+        return isinstance(other, Cursor) and other.corpus is self.corpus and other.index == self.index
+
+    def __hash__(self):
+        return self.index
+
+    def __str__(self):
+        return f"Cursor({self.index}, key={self.key})"
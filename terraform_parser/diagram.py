@@ -0,0 +1,183 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import io
+import json
+import os
+import shutil
+import subprocess
+
+from terraform_parser.graph import strongly_connected
+
+# WAYS TO CLUSTER NODES
+MODULE = "module"  # BY DIRECTORY OF THE DEFINING FILE
+TYPE = "type"  # BY RESOURCE TYPE
+
+# KINDS OF ADDRESS SHOWN BY DEFAULT; THE REST (var, local, output, provider)
+# ARE PRUNED, AND THE EDGES THROUGH THEM CONNECT WHAT THEY CONNECTED
+KEEP = {"resource", "data", "module"}
+
+# ADDRESS PREFIX TO KIND
+KINDS = {
+    "data": "data",
+    "module": "module",
+    "var": "variable",
+    "local": "locals",
+    "output": "output",
+    "provider": "provider",
+}
+
+GRAPH_ATTRIBUTES = {
+    "rankdir": "LR",
+    "concentrate": "true",
+    "newrank": "true",
+    "splines": "polyline",
+}
+NODE_ATTRIBUTES = {"shape": "box", "fontname": "Helvetica", "fontsize": "10"}
+
+
+def to_dot(graph, cluster=MODULE, aggregate=3, keep=KEEP):
+    """
+    SEE write_dot()
+    :return: DOT TEXT
+    """
+    file = io.StringIO()
+    write_dot(graph, file, cluster=cluster, aggregate=aggregate, keep=keep)
+    return file.getvalue()
+
+
+def write_dot(graph, file, cluster=MODULE, aggregate=3, keep=KEEP):
+    """
+    WRITE A Graphviz DIAGRAM OF A DependencyGraph, IN ONE PASS
+    :param graph: DependencyGraph
+    :param file: WHERE TO WRITE THE DOT TEXT
+    :param cluster: MODULE OR TYPE
+    :param aggregate: SHOW THIS MANY (OR MORE) RESOURCES OF ONE TYPE, IN ONE
+                      CLUSTER, AS A SINGLE NODE
+    :param keep: KINDS OF ADDRESS TO SHOW
+    """
+    kept = sorted(a for a in graph.defined if kind(a) in keep)
+    edges = _contract(graph, set(kept))
+
+    # CLUSTER NAME TO {TYPE: [ADDRESS]}
+    clusters = {}
+    for node in kept:
+        name = _cluster(graph, node, cluster)
+        clusters.setdefault(name, {}).setdefault(_type(node), []).append(node)
+
+    ids = {}  # ADDRESS TO ID OF THE DIAGRAM NODE SHOWING IT
+    file.write("digraph terraform {\n")
+    file.write(f"  graph [{_attributes(GRAPH_ATTRIBUTES)}];\n")
+    file.write(f"  node [{_attributes(NODE_ATTRIBUTES)}];\n")
+    for i, (name, types) in enumerate(sorted(clusters.items())):
+        file.write(f"  subgraph cluster_{i} {{\n")
+        file.write(f"    label={_quote(name)};\n")
+        for type_, members in sorted(types.items()):
+            if len(members) >= aggregate:
+                id = f"{name}/{type_}"
+                label = f"{type_}\n× {len(members)}"
+                file.write(f"    {_quote(id)} [label={_quote(label)}, style=bold];\n")
+                for member in members:
+                    ids[member] = id
+            else:
+                for member in members:
+                    ids[member] = member
+                    file.write(f"    {_quote(member)};\n")
+        file.write("  }\n")
+
+    lines = set()
+    for node in kept:
+        source = ids[node]
+        for dependency in edges[node]:
+            target = ids[dependency]
+            if target != source:
+                lines.add(f"  {_quote(source)} -> {_quote(target)};\n")
+    for line in sorted(lines):
+        file.write(line)
+    file.write("}\n")
+
+
+def render(dot, output, format="svg", engine="dot"):
+    """
+    LAY OUT dot WITH THE LOCAL Graphviz BINARY
+    :param dot: DOT TEXT
+    :param output: FILE TO WRITE
+    :param engine: Graphviz LAYOUT PROGRAM; sfdp IS FASTER FOR VERY LARGE DIAGRAMS
+    """
+    binary = shutil.which(engine)
+    if binary is None:
+        raise FileNotFoundError(f"Graphviz {engine!r} not found, see https://www.graphviz.org/")
+    subprocess.run(
+        [binary, f"-T{format}", "-o", output], input=dot.encode("utf8"), check=True
+    )
+
+
+def kind(address):
+    """
+    :return: KEYWORD OF THE BLOCK AT address
+    """
+    return KINDS.get(address.split(".", 1)[0], "resource")
+
+
+def _type(address):
+    parts = address.split(".")
+    if parts[0] == "data":
+        return f"data.{parts[1]}"
+    return parts[0]
+
+
+def _cluster(graph, address, cluster):
+    if cluster == TYPE:
+        return _type(address)
+    return os.path.dirname(min(graph.defined[address])) or "."
+
+
+def _contract(graph, kept):
+    """
+    :return: MAP FROM EACH kept ADDRESS TO THE kept ADDRESSES IT DEPENDS ON,
+             DIRECTLY, OR THROUGH ADDRESSES THAT ARE NOT kept
+    """
+
+    def pruned(address):
+        return [d for d in graph.dependencies(address) if d not in kept]
+
+    # EVERY ADDRESS IN A CYCLE OF PRUNED ADDRESSES REACHES THE SAME kept
+    # ADDRESSES, SO EACH CYCLE IS DONE AT ONCE; A CYCLE COMES AFTER THE ONES IT
+    # DEPENDS ON, SO THEIRS ARE ALREADY KNOWN
+    through = {}  # MAP FROM PRUNED ADDRESS TO THE kept ADDRESSES IT REACHES
+    roots = [d for node in kept for d in pruned(node)]
+    for component in strongly_connected(roots, pruned):
+        members = set(component)
+        found = set()
+        for address in component:
+            for dependency in graph.dependencies(address):
+                if dependency in kept:
+                    found.add(dependency)
+                elif dependency not in members:
+                    found.update(through[dependency])
+        for address in component:
+            through[address] = found
+
+    output = {}
+    for node in kept:
+        targets = output[node] = set()
+        for dependency in graph.dependencies(node):
+            if dependency in kept:
+                targets.add(dependency)
+            else:
+                targets.update(through[dependency])
+    return output
+
+
+def _attributes(attributes):
+    return ", ".join(f"{k}={_quote(v)}" for k, v in attributes.items())
+
+
+def _quote(text):
+    # JSON STRING ESCAPES ARE ALSO DOT STRING ESCAPES
+    return json.dumps(text, ensure_ascii=False)
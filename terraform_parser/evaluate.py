@@ -0,0 +1,1039 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import base64
+import csv
+import hashlib
+import io
+import ipaddress
+import json
+import math
+import re
+from urllib.parse import quote
+
+from terraform_parser.graph import iter_nodes
+from terraform_parser.utils import SQL_NULL, Template
+from terraform_parser.writer import is_for, is_object, pairs
+
+_step = re.compile(r"\[(\d+)\]|([^.\[\]]+)")
+_pending = object()  # MARKS A local BEING EVALUATED, TO DETECT CYCLES
+_missing = object()
+
+
+class EvaluationError(Exception):
+    pass
+
+
+class CycleError(EvaluationError):
+    pass
+
+
+class Evaluator(object):
+    """
+    COMPILE THE locals OF MANY FILES ONCE, THEN EVALUATE THEM UNDER ANY NUMBER
+    OF VARIABLE SETS, WITHOUT WALKING THE EXPRESSION TREES AGAIN
+
+        evaluator = Evaluator()
+        evaluator.add(parse(content))
+        for variables in environments:
+            scope = evaluator.scope(variables)
+            print(scope["name"])  # local.name
+    """
+
+    __slots__ = ["locals", "defaults"]
+
+    def __init__(self):
+        self.locals = {}  # MAP FROM NAME TO COMPILED local
+        self.defaults = {}  # MAP FROM NAME TO DEFAULT VALUE OF variable
+
+    def add(self, result):
+        """
+        COMPILE THE locals, AND EVALUATE THE variable DEFAULTS, OF ONE parse() RESULT
+        """
+        for node, body in iter_nodes(result):
+            kind, _, name = node.partition(".")
+            if kind == "local":
+                self.locals[name] = compile_expression(body)
+            elif kind == "var":
+                for key, value in pairs(body) if body else []:
+                    if key == "default":
+                        self.defaults[name] = compile_expression(value)({})
+
+    def scope(self, variables=None, context=None):
+        """
+        :param variables: MAP FROM NAME TO VALUE, OVERRIDING THE DEFAULTS
+        :param context: OPTIONAL MAP FROM ANY OTHER ROOT (eg each, count, path,
+                        aws_instance) TO ITS VALUE
+        :return: Scope TO EVALUATE locals, AND OTHER EXPRESSIONS, IN
+        """
+        return Scope(self, {**self.defaults, **(variables or {})}, context)
+
+
+class Scope(object):
+    """
+    ONE SET OF VARIABLES. EACH local IS EVALUATED ON FIRST USE, AND REMEMBERED
+    """
+
+    __slots__ = ["evaluator", "env", "values", "_active"]
+
+    def __init__(self, evaluator, variables, context=None):
+        self.evaluator = evaluator
+        # WHAT COMPILED EXPRESSIONS ARE CALLED WITH: MAP FROM ROOT NAME TO VALUE
+        self.env = {**(context or {}), "var": variables, "local": self}
+        self.values = {}  # MAP FROM NAME TO VALUE OF local
+        self._active = []  # NAMES OF THE locals BEING EVALUATED, INNERMOST LAST
+
+    def __getitem__(self, name):
+        value = self.values.get(name, _missing)
+        if value is _pending:
+            chain = self._active[self._active.index(name) :] + [name]
+            raise CycleError("cycle: " + " -> ".join(f"local.{n}" for n in chain))
+        if value is not _missing:
+            return value
+        function = self.evaluator.locals.get(name)
+        if function is None:
+            raise EvaluationError(f"unknown local.{name}")
+        self.values[name] = _pending
+        self._active.append(name)
+        try:
+            value = self.values[name] = function(self.env)
+        except BaseException:
+            del self.values[name]
+            raise
+        finally:
+            self._active.pop()
+        return value
+
+    def evaluate(self, expr):
+        """
+        :param expr: AN EXPRESSION FROM parse(), OR WHAT compile_expression() RETURNS
+        """
+        function = expr if callable(expr) else compile_expression(expr)
+        return function(self.env)
+
+    def to_dict(self):
+        """
+        :return: MAP FROM NAME TO VALUE OF EVERY local
+        """
+        return {name: self[name] for name in self.evaluator.locals}
+
+
+def compile_expression(expr):
+    """
+    :param expr: AN EXPRESSION FROM parse()
+    :return: FUNCTION OF env (MAP FROM ROOT NAME, eg var, local, each, TO ITS
+             VALUE) THAT RETURNS THE VALUE OF expr
+    """
+    if expr is SQL_NULL or expr is None or isinstance(expr, (bool, int, float)):
+        return _constant(expr)
+    elif isinstance(expr, str):
+        return _path(expr)
+    elif is_object(expr):
+        return _object(expr)
+    elif isinstance(expr, list):
+        return _tuple(expr)
+    elif not isinstance(expr, dict):
+        raise TypeError(f"can not compile {expr.__class__.__name__}")
+    elif isinstance(expr, Template):
+        return _template(expr["concat"])
+    elif is_for(expr.get("from")):
+        return _for_tuple(expr)
+    elif "from" in expr and set(expr) <= {"from", "select"}:
+        return _splat(expr)
+    elif len(expr) != 1:
+        return _object(expr)
+    ((op, args),) = expr.items()
+    compiler = OPERATORS.get(op)
+    if compiler is None:
+        return _call(op, args)
+    try:
+        return compiler(args)
+    except (TypeError, ValueError) as cause:
+        # AN OBJECT WITH ONE OPERATOR-NAMED KEY (eg {add = 1}) IS THAT OPERATOR
+        raise EvaluationError(f"can not compile {op}: {cause}") from cause
+
+
+def _constant(value):
+    value = None if value is SQL_NULL else value
+    return lambda env: value
+
+
+def _path(path):
+    """
+    var.a.b[0] IS THE ROOT var, THEN THE STEPS a, b, 0
+    """
+    root, *steps = _steps(path)
+    get = _getter(steps)
+
+    def path_value(env):
+        value = env.get(root, _missing)
+        if value is _missing:
+            raise EvaluationError(f"unknown {root!r} in {path}")
+        return get(value)
+
+    return path_value
+
+
+def _steps(path):
+    return [int(index) if index else name for index, name in _step.findall(path)]
+
+
+def _getter(steps):
+    """
+    :return: FUNCTION THAT FOLLOWS steps FROM A VALUE; * IS A SPLAT
+    """
+    if "*" in steps:
+        i = steps.index("*")
+        before, after = _getter(steps[:i]), _getter(steps[i + 1 :])
+        return lambda value: [after(v) for v in _as_list(before(value))]
+    elif not steps:
+        return lambda value: value
+    elif len(steps) == 1:
+        (step,) = steps
+        return lambda value: _get(value, step)
+
+    def get(value):
+        for step in steps:
+            value = _get(value, step)
+        return value
+
+    return get
+
+
+def _get(value, key):
+    try:
+        if isinstance(value, list):
+            return value[int(key)]
+        elif isinstance(value, dict):
+            return value[key if isinstance(key, str) else str(key)]
+        elif isinstance(value, Scope):
+            return value[key]
+    except (KeyError, IndexError, ValueError):
+        pass
+    raise EvaluationError(f"{_type(value)} has no {key!r}")
+
+
+def _get_op(args):
+    # x[k], AND f(x).k: THE EXPRESSION, THEN THE KEYS
+    expr, *keys = [compile_expression(a) for a in args]
+
+    def get(env):
+        value = expr(env)
+        for key in keys:
+            value = _get(value, key(env))
+        return value
+
+    return get
+
+
+def _as_list(value):
+    # SPLAT: null IS NO ELEMENTS, AND A SINGLE VALUE IS ONE
+    if value is None:
+        return []
+    elif isinstance(value, list):
+        return value
+    return [value]
+
+
+def _tuple(exprs):
+    functions = [compile_expression(e) for e in exprs]
+    return lambda env: [f(env) for f in functions]
+
+
+def _object(expr):
+    items = [(key, compile_expression(value)) for key, value in pairs(expr)]
+    return lambda env: {key: f(env) for key, f in items}
+
+
+def _splat(expr):
+    source = compile_expression(expr["from"])
+    select = expr.get("select")
+    get = _getter(_steps(select["value"])) if select else _getter([])
+    return lambda env: [get(v) for v in _as_list(source(env))]
+
+
+def _preamble(preamble):
+    """
+    :return: (LOOP VARIABLE NAMES, COMPILED COLLECTION)
+    """
+    names = preamble["select"]
+    names = names if isinstance(names, list) else [names]
+    return [n["name"] for n in names], compile_expression(preamble["from"])
+
+
+def _loop(names, collection, env):
+    """
+    :return: GENERATOR OF env, WITH THE LOOP VARIABLES SET FOR EACH ELEMENT
+    """
+    if isinstance(collection, dict):
+        items = sorted(collection.items())
+    elif isinstance(collection, list):
+        items = enumerate(collection)
+    else:
+        raise EvaluationError(f"can not loop over {_type(collection)}")
+    inner = dict(env)
+    if len(names) == 1:
+        (name,) = names
+        for _, value in items:
+            inner[name] = value
+            yield inner
+    else:
+        key_name, name = names
+        for key, value in items:
+            inner[key_name] = key
+            inner[name] = value
+            yield inner
+
+
+def _for_tuple(expr):
+    names, source = _preamble(expr["from"])
+    select = compile_expression(expr["select"]["value"])
+    where = compile_expression(expr["where"]) if "where" in expr else None
+
+    def for_tuple(env):
+        return [
+            select(inner)
+            for inner in _loop(names, source(env), env)
+            if where is None or _to_bool(where(inner))
+        ]
+
+    return for_tuple
+
+
+def _for_object(args):
+    names, source = _preamble(args["from"])
+    key = compile_expression(args["groupby"])
+    select = args["select"]
+    grouped = isinstance(select, dict) and set(select) == {"list"}  # k => v...
+    value = compile_expression(select["list"] if grouped else select)
+    where = compile_expression(args["where"]) if "where" in args else None
+
+    def for_object(env):
+        output = {}
+        for inner in _loop(names, source(env), env):
+            if where is not None and not _to_bool(where(inner)):
+                continue
+            k = _to_string(key(inner))
+            if grouped:
+                output.setdefault(k, []).append(value(inner))
+            elif k in output:
+                raise EvaluationError(f"duplicate key {k!r}, use => ... to group")
+            else:
+                output[k] = value(inner)
+        return output
+
+    return for_object
+
+
+def _template(args):
+    """
+    "a${b}" IS THE TEXT OF ITS PARTS, JOINED
+    """
+    functions = [_part(p) for p in (args if isinstance(args, list) else [args])]
+    return lambda env: "".join(_to_string(f(env)) for f in functions)
+
+
+def _concat(args):
+    """
+    A CALL TO concat(): parse() LOSES THE BRACKETS OF LIST ARGUMENTS, SO
+    concat(a, ["b", "c"]) IS {"concat": [a, "b", "c"]}, AND ANY ARGUMENT THAT IS
+    NOT A LIST IS ONE ELEMENT (A LIST INSIDE A LIST ARGUMENT IS SPREAD TOO).
+    parse() MARKS STRING TEMPLATES AS Template, SO A {"concat": ...} BUILT
+    ANY OTHER WAY (eg LOADED FROM JSON) IS TAKEN AS A CALL
+    """
+    functions = [compile_expression(p) for p in (args if isinstance(args, list) else [args])]
+
+    def concat(env):
+        output = []
+        for f in functions:
+            value = f(env)
+            if isinstance(value, list):
+                output.extend(value)
+            else:
+                output.append(value)
+        return output
+
+    return concat
+
+
+def _part(part):
+    """
+    INSIDE A TEMPLATE, %{if} IS NOT WRAPPED IN case, AND %{for} IS A for TUPLE OF STRINGS
+    """
+    if isinstance(part, dict) and "when" in part:
+        return _case(part)
+    elif isinstance(part, list) and part and isinstance(part[0], dict) and "when" in part[0]:
+        return _case(part)
+    elif isinstance(part, dict) and is_for(part.get("from")):
+        strings = _for_tuple(part)
+        return lambda env: "".join(_to_string(s) for s in strings(env))
+    return compile_expression(part)
+
+
+def _case(args):
+    cases = args if isinstance(args, list) else [args]
+    branches = []
+    otherwise = _text(None)
+    for case in cases:
+        if isinstance(case, dict) and "when" in case:
+            branches.append((compile_expression(case["when"]), _text(case.get("then"))))
+        else:
+            otherwise = _text(case)
+
+    def case(env):
+        for when, then in branches:
+            if _to_bool(when(env)):
+                return then(env)
+        return otherwise(env)
+
+    return case
+
+
+def _text(template):
+    if template is None:
+        return lambda env: ""
+    function = _part(template)
+    return lambda env: _to_string(function(env))
+
+
+def _if_then_else(args):
+    when, then, otherwise = [compile_expression(a) for a in args]
+    return lambda env: then(env) if _to_bool(when(env)) else otherwise(env)
+
+
+def _missing_op(args):
+    function = compile_expression(args)
+    return lambda env: function(env) is None
+
+
+def _exists_op(args):
+    function = compile_expression(args)
+    return lambda env: function(env) is not None
+
+
+def _arithmetic(op):
+    def compile_op(args):
+        first, *rest = [compile_expression(a) for a in args]
+
+        def arithmetic(env):
+            value = _to_number(first(env))
+            try:
+                for f in rest:
+                    value = op(value, _to_number(f(env)))
+            except ZeroDivisionError:
+                raise EvaluationError("division by zero") from None
+            return _normal(value)
+
+        return arithmetic
+
+    return compile_op
+
+
+def _comparison(op):
+    def compile_op(args):
+        left, right = [compile_expression(a) for a in args]
+        return lambda env: op(_to_number(left(env)), _to_number(right(env)))
+
+    return compile_op
+
+
+def _eq(args):
+    left, right = [compile_expression(a) for a in args]
+    return lambda env: _equal(left(env), right(env))
+
+
+def _neq(args):
+    left, right = [compile_expression(a) for a in args]
+    return lambda env: not _equal(left(env), right(env))
+
+
+def _and(args):
+    functions = [compile_expression(a) for a in args]
+    return lambda env: all(_to_bool(f(env)) for f in functions)
+
+
+def _or(args):
+    functions = [compile_expression(a) for a in args]
+    return lambda env: any(_to_bool(f(env)) for f in functions)
+
+
+def _not(args):
+    function = compile_expression(args)
+    return lambda env: not _to_bool(function(env))
+
+
+def _neg(args):
+    function = compile_expression(args)
+    return lambda env: -_to_number(function(env))
+
+
+def _pos(args):
+    function = compile_expression(args)
+    return lambda env: _to_number(function(env))
+
+
+def _list(args):
+    # ONLY MEANINGFUL AS THE LAST ARGUMENT OF A CALL, SEE _call()
+    return compile_expression(args)
+
+
+def _call(name, args):
+    params = args if isinstance(args, list) else [args]
+    lazy = LAZY.get(name)
+    if lazy:
+        return lazy([compile_expression(p) for p in params])
+    function = BUILTINS.get(name)
+    expand = bool(params) and isinstance(params[-1], dict) and set(params[-1]) == {"list"}
+    if expand:
+        # f(a, b...) PASSES THE ELEMENTS OF b AS ARGUMENTS
+        params = params[:-1] + [params[-1]["list"]]
+    if name in MAPPED and len(params) > 1 and not expand:
+        # parse() SPLITS AN OBJECT ARGUMENT: keys({a = 1, b = 2}) IS
+        # {"keys": [{"a": 1}, {"b": 2}]}, AND LOSES THE BRACKETS OF A LIST:
+        # jsonencode([1, 2]) IS {"jsonencode": [1, 2]}, SO PUT IT BACK TOGETHER
+        params = [params]
+    functions = [compile_expression(p) for p in params]
+    if name in PACKED and not expand:
+        functions = _pack(name, functions)
+
+    def call(env):
+        if function is None:
+            raise EvaluationError(f"{name}() is not supported")
+        values = [f(env) for f in functions]
+        if expand:
+            values[-1:] = _as_list(values[-1])
+        try:
+            return function(*values)
+        except EvaluationError:
+            raise
+        except Exception as cause:
+            raise EvaluationError(f"{name}(): {cause}") from cause
+
+    return call
+
+
+def _pack(name, functions):
+    """
+    parse() LOSES THE BRACKETS OF A LIST ARGUMENT: contains(["a", "b"], x) IS
+    {"contains": ["a", "b", x]}, AND contains(["a"], x) IS {"contains": ["a", x]}
+    :return: functions, WITH THE LIST ARGUMENT PUT BACK TOGETHER
+    """
+    before, after = PACKED[name]
+    end = len(functions) - after
+    if end - before == 1:
+        if name == "length":
+            # length("abc") IS ALSO FINE
+            return functions
+        element = functions[before]
+        packed = lambda env: _as_tuple(element(env))
+    else:
+        elements = functions[before:end]
+        packed = lambda env: [f(env) for f in elements]
+    return functions[:before] + [packed] + functions[end:]
+
+
+def _as_tuple(value):
+    return value if isinstance(value, (list, dict)) else [value]
+
+
+def _try(functions):
+    def try_(env):
+        for f in functions:
+            try:
+                return f(env)
+            except CycleError:
+                raise
+            except EvaluationError:
+                continue
+        raise EvaluationError("try(): no argument could be evaluated")
+
+    return try_
+
+
+def _can(functions):
+    (function,) = functions
+
+    def can(env):
+        try:
+            function(env)
+            return True
+        except CycleError:
+            raise
+        except EvaluationError:
+            return False
+
+    return can
+
+
+def _type(value):
+    if value is None:
+        return "null"
+    elif isinstance(value, bool):
+        return "bool"
+    elif isinstance(value, (int, float)):
+        return "number"
+    elif isinstance(value, str):
+        return "string"
+    elif isinstance(value, list):
+        return "tuple"
+    elif isinstance(value, (dict, Scope)):
+        return "object"
+    return value.__class__.__name__
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    elif value == "true":
+        return True
+    elif value == "false":
+        return False
+    raise EvaluationError(f"expecting bool, not {_type(value)}")
+
+
+def _to_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    elif isinstance(value, str):
+        try:
+            return _normal(float(value)) if re.search(r"[.eE]", value) else int(value)
+        except ValueError:
+            pass
+    raise EvaluationError(f"expecting number, not {_type(value)}")
+
+
+def _normal(value):
+    # TERRAFORM HAS ONE NUMBER TYPE: 4 / 2 IS 2, NOT 2.0
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+        return int(value)
+    return value
+
+
+def _to_string(value):
+    if isinstance(value, str):
+        return value
+    elif isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, int):
+        return str(value)
+    elif isinstance(value, float):
+        return str(_normal(value))
+    raise EvaluationError(f"expecting string, not {_type(value)}")
+
+
+def _equal(a, b):
+    # UNLIKE PYTHON, true != 1
+    if isinstance(a, bool) != isinstance(b, bool):
+        return False
+    return a == b
+
+
+def _mod(a, b):
+    # SIGN OF THE DIVIDEND, LIKE Go (AND TERRAFORM)
+    if not b:
+        raise ZeroDivisionError()
+    return math.fmod(a, b)
+
+
+def _format(spec, *args):
+    args = iter(args)
+
+    def verb(match):
+        flags, kind = match.groups()
+        if kind == "%":
+            return "%"
+        value = next(args)
+        if kind == "q":
+            return json.dumps(_to_string(value))
+        elif kind == "d":
+            return ("%" + flags + "d") % int(_to_number(value))
+        elif kind in "fegEG":
+            return ("%" + flags + kind) % float(_to_number(value))
+        elif kind == "t":
+            return _to_string(_to_bool(value))
+        elif kind == "v" and not isinstance(value, (str, int, float, bool)):
+            return json.dumps(value, separators=(",", ":"))
+        return ("%" + flags + "s") % _to_string(value)
+
+    try:
+        return re.sub(r"%([-+ #0]*\d*(?:\.\d+)?)([sdvqtfegEG%])", verb, spec)
+    except StopIteration:
+        raise EvaluationError("format(): too few arguments") from None
+
+
+def _formatlist(spec, *args):
+    lengths = {len(a) for a in args if isinstance(a, list)}
+    if len(lengths) > 1:
+        raise EvaluationError("formatlist(): lists must be the same length")
+    (length,) = lengths or {1}
+    return [
+        _format(spec, *(a[i] if isinstance(a, list) else a for a in args)) for i in range(length)
+    ]
+
+
+def _regex_replacement(replacement):
+    # $1 AND ${name} ARE GROUP REFERENCES, AS IN RE2
+    return re.sub(r"\$\{?(\w+)\}?", r"\\g<\1>", replacement.replace("\\", "\\\\"))
+
+
+def _replace(string, substring, replacement):
+    if len(substring) > 1 and substring.startswith("/") and substring.endswith("/"):
+        return re.sub(substring[1:-1], _regex_replacement(replacement), string)
+    return string.replace(substring, replacement)
+
+
+def _regex_match(match):
+    if match.re.groupindex:
+        return match.groupdict()
+    elif match.re.groups:
+        return list(match.groups())
+    return match.group()
+
+
+def _regex(pattern, string):
+    match = re.search(pattern, string)
+    if not match:
+        raise EvaluationError(f"regex(): no match for {pattern!r}")
+    return _regex_match(match)
+
+
+def _substr(string, offset, length):
+    if offset < 0:
+        offset += len(string)
+    return string[offset:] if length < 0 else string[offset : offset + length]
+
+
+def _trim(string, characters):
+    return string.strip(characters)
+
+
+def _trimprefix(string, prefix):
+    return string[len(prefix) :] if prefix and string.startswith(prefix) else string
+
+
+def _trimsuffix(string, suffix):
+    return string[: -len(suffix)] if suffix and string.endswith(suffix) else string
+
+
+def _distinct(values):
+    output = []
+    for v in values:
+        if v not in output:
+            output.append(v)
+    return output
+
+
+def _flatten(values):
+    output = []
+    for v in values:
+        if isinstance(v, list):
+            output.extend(_flatten(v))
+        else:
+            output.append(v)
+    return output
+
+
+def _element(values, index):
+    if not values:
+        raise EvaluationError("element(): empty list")
+    return values[int(_to_number(index)) % len(values)]
+
+
+def _lookup(mapping, key, *default):
+    if key in mapping:
+        return mapping[key]
+    elif default:
+        return default[0]
+    raise EvaluationError(f"lookup(): no {key!r} and no default")
+
+
+def _merge(*mappings):
+    output = {}
+    for m in mappings:
+        if m is not None:
+            output.update(m)
+    return output
+
+
+def _one(values):
+    if len(values) > 1:
+        raise EvaluationError("one(): more than one element")
+    return values[0] if values else None
+
+
+def _range(*args):
+    start, stop, step = {1: (0, args[0], 1), 2: (*args, 1), 3: args}[len(args)]
+    output = []
+    value = start
+    while (value < stop) if step > 0 else (value > stop):
+        output.append(value)
+        value += step
+    return output
+
+
+def _chunklist(values, size):
+    if not size:
+        return [values]
+    return [values[i : i + size] for i in range(0, len(values), size)]
+
+
+def _coalesce(*values):
+    for v in values:
+        if v is not None and v != "":
+            return v
+    raise EvaluationError("coalesce(): no non-null argument")
+
+
+def _coalescelist(*values):
+    for v in values:
+        if v:
+            return v
+    raise EvaluationError("coalescelist(): no non-empty argument")
+
+
+def _slice(values, start, end):
+    if not 0 <= start <= end <= len(values):
+        raise EvaluationError(f"slice(): {start}:{end} out of range")
+    return values[start:end]
+
+
+def _setintersection(first, *rest):
+    return [v for v in _distinct(first) if all(v in r for r in rest)]
+
+
+def _setsubtract(first, second):
+    return [v for v in _distinct(first) if v not in second]
+
+
+def _setunion(*lists):
+    return _distinct([v for values in lists for v in values])
+
+
+def _transpose(mapping):
+    output = {}
+    for key, values in sorted(mapping.items()):
+        for v in values:
+            output.setdefault(v, []).append(key)
+    return output
+
+
+def _matchkeys(values, keys, searchset):
+    return [v for v, k in zip(values, keys) if k in searchset]
+
+
+def _zipmap(*args):
+    """
+    parse() LOSES THE BRACKETS OF BOTH LISTS: zipmap(["a", "b"], [1, 2]) IS
+    {"zipmap": ["a", "b", 1, 2]}, SO SPLIT args WHERE EACH SIDE IS ONE LIST, OR
+    ITS ELEMENTS, AND BOTH SIDES ARE THE SAME LENGTH
+    """
+    for i in range(1, len(args)):
+        keys, values = _elements(args[:i]), _elements(args[i:])
+        if len(keys) == len(values):
+            return dict(zip((_to_string(k) for k in keys), values))
+    raise EvaluationError("expecting two lists of the same length")
+
+
+def _elements(args):
+    if len(args) == 1 and isinstance(args[0], list):
+        return args[0]
+    return list(args)
+
+
+def _tobool(value):
+    return None if value is None else _to_bool(value)
+
+
+def _tonumber(value):
+    return None if value is None else _to_number(value)
+
+
+def _tostring(value):
+    return None if value is None else _to_string(value)
+
+
+def _tolist(value):
+    return list(value.values()) if isinstance(value, dict) else list(value)
+
+
+def _jsonencode(value):
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+def _csvdecode(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def _digest(algorithm):
+    return lambda text: hashlib.new(algorithm, text.encode("utf8")).hexdigest()
+
+
+def _base64_digest(algorithm):
+    return lambda text: base64.b64encode(
+        hashlib.new(algorithm, text.encode("utf8")).digest()
+    ).decode("ascii")
+
+
+def _cidrhost(prefix, number):
+    network = ipaddress.ip_network(prefix, strict=False)
+    if number < 0:
+        number += network.num_addresses
+    if not 0 <= number < network.num_addresses:
+        raise EvaluationError(f"cidrhost(): {number} is not in {prefix}")
+    return str(network.network_address + number)
+
+
+def _cidrnetmask(prefix):
+    return str(ipaddress.IPv4Network(prefix, strict=False).netmask)
+
+
+def _cidrsubnet(prefix, newbits, number):
+    network = ipaddress.ip_network(prefix, strict=False)
+    length = network.prefixlen + newbits
+    if length > network.max_prefixlen or not 0 <= number < 2 ** newbits:
+        raise EvaluationError(f"cidrsubnet(): can not fit {number} in {prefix}")
+    size = 2 ** (network.max_prefixlen - length)
+    address = network.network_address + number * size
+    return f"{address}/{length}"
+
+
+# COMPILERS FOR THE OPERATORS IN parse() OUTPUT
+OPERATORS = {
+    "literal": _constant,
+    "concat": _concat,
+    "case": _case,
+    "object": _for_object,
+    "get": _get_op,
+    "list": _list,
+    "if_then_else": _if_then_else,
+    "missing": _missing_op,
+    "exists": _exists_op,
+    "add": _arithmetic(lambda a, b: a + b),
+    "sub": _arithmetic(lambda a, b: a - b),
+    "mul": _arithmetic(lambda a, b: a * b),
+    "div": _arithmetic(lambda a, b: a / b),
+    "mod": _arithmetic(_mod),
+    "lt": _comparison(lambda a, b: a < b),
+    "lte": _comparison(lambda a, b: a <= b),
+    "gt": _comparison(lambda a, b: a > b),
+    "gte": _comparison(lambda a, b: a >= b),
+    "eq": _eq,
+    "neq": _neq,
+    "and": _and,
+    "or": _or,
+    "not": _not,
+    "neg": _neg,
+    "pos": _pos,
+}
+
+# FUNCTIONS WITH A LIST ARGUMENT: MAP FROM NAME TO (ARGUMENTS BEFORE, ARGUMENTS AFTER) IT
+PACKED = {
+    **{
+        name: (0, 0)
+        for name in (
+            "alltrue anytrue compact distinct flatten length one reverse sort sum tolist toset"
+        ).split()
+    },
+    "chunklist": (0, 1),
+    "contains": (0, 1),
+    "element": (0, 1),
+    "index": (0, 1),
+    "join": (1, 0),
+    "slice": (0, 2),
+}
+
+# FUNCTIONS WITH ONE ARGUMENT, THAT MAY BE AN OBJECT
+MAPPED = {"jsonencode", "keys", "tomap", "transpose", "values"}
+
+# FUNCTIONS GIVEN THEIR ARGUMENTS UNEVALUATED
+LAZY = {"try": _try, "can": _can}
+
+# TERRAFORM BUILT-IN FUNCTIONS, GIVEN THEIR EVALUATED ARGUMENTS; THE OTHERS
+# (eg file, timestamp) DEPEND ON MORE THAN THEIR ARGUMENTS
+BUILTINS = {
+    "abs": lambda n: abs(_to_number(n)),
+    "ceil": lambda n: math.ceil(_to_number(n)),
+    "floor": lambda n: math.floor(_to_number(n)),
+    "log": lambda n, base: _normal(math.log(n, base)),
+    "max": lambda *n: max(_to_number(v) for v in n),
+    "min": lambda *n: min(_to_number(v) for v in n),
+    "parseint": lambda text, base: int(text, base),
+    "pow": lambda n, p: _normal(math.pow(n, p)),
+    "signum": lambda n: (n > 0) - (n < 0),
+    "sum": lambda values: _normal(sum(_to_number(v) for v in values)),
+    "chomp": lambda text: text.rstrip("\r\n"),
+    "format": _format,
+    "formatlist": _formatlist,
+    "indent": lambda n, text: text.replace("\n", "\n" + " " * n),
+    "join": lambda separator, *lists: separator.join(
+        _to_string(v) for values in lists for v in _as_tuple(values)
+    ),
+    "lower": lambda text: text.lower(),
+    "regex": _regex,
+    "regexall": lambda pattern, text: [_regex_match(m) for m in re.finditer(pattern, text)],
+    "replace": _replace,
+    "split": lambda separator, text: text.split(separator) if text else [],
+    "strrev": lambda text: text[::-1],
+    "substr": _substr,
+    "title": lambda text: re.sub(r"\b\w", lambda m: m.group().upper(), text),
+    "trim": _trim,
+    "trimprefix": _trimprefix,
+    "trimsuffix": _trimsuffix,
+    "trimspace": lambda text: text.strip(),
+    "upper": lambda text: text.upper(),
+    "alltrue": lambda values: all(_to_bool(v) for v in values),
+    "anytrue": lambda values: any(_to_bool(v) for v in values),
+    "chunklist": _chunklist,
+    "coalesce": _coalesce,
+    "coalescelist": _coalescelist,
+    "compact": lambda values: [v for v in values if v is not None and v != ""],
+    "contains": lambda values, value: any(_equal(v, value) for v in values),
+    "distinct": _distinct,
+    "element": _element,
+    "flatten": _flatten,
+    "index": lambda values, value: values.index(value),
+    "keys": lambda mapping: sorted(mapping),
+    "length": len,
+    "lookup": _lookup,
+    "matchkeys": _matchkeys,
+    "merge": _merge,
+    "one": _one,
+    "range": _range,
+    "reverse": lambda values: values[::-1],
+    "setintersection": _setintersection,
+    "setsubtract": _setsubtract,
+    "setunion": _setunion,
+    "slice": _slice,
+    "sort": lambda values: sorted(_to_string(v) for v in values),
+    "transpose": _transpose,
+    "values": lambda mapping: [v for _, v in sorted(mapping.items())],
+    "zipmap": _zipmap,
+    "base64decode": lambda text: base64.b64decode(text).decode("utf8"),
+    "base64encode": lambda text: base64.b64encode(text.encode("utf8")).decode("ascii"),
+    "csvdecode": _csvdecode,
+    "jsondecode": json.loads,
+    "jsonencode": _jsonencode,
+    "urlencode": lambda text: quote(text, safe=""),
+    "base64sha256": _base64_digest("sha256"),
+    "base64sha512": _base64_digest("sha512"),
+    "md5": _digest("md5"),
+    "sha1": _digest("sha1"),
+    "sha256": _digest("sha256"),
+    "sha512": _digest("sha512"),
+    "cidrhost": _cidrhost,
+    "cidrnetmask": _cidrnetmask,
+    "cidrsubnet": _cidrsubnet,
+    "nonsensitive": lambda value: value,
+    "sensitive": lambda value: value,
+    "tobool": _tobool,
+    "tolist": _tolist,
+    "tomap": dict,
+    "tonumber": _tonumber,
+    "toset": lambda values: _distinct(values),
+    "tostring": _tostring,
+}
@@ -7,14 +7,21 @@
 # Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
 #
 import json
+import re
 
 from mo_imports import expect
 
-from mo_parsing import ParseResults, Forward, Group, is_number, Keyword, quote
+from mo_parsing import ParseException, ParseResults, Forward, Group, is_number, Keyword, quote
 from terraform_parser.keywords import binary_ops
-from terraform_parser.utils import SQL_NULL, Call, And
+from terraform_parser.lexer import code_end, ScanError
+from terraform_parser.utils import SQL_NULL, Call, And, Template, scrub
 
-multiline_string_parser = expect("multiline_string_parser")
+multiline_string_parser, interpolation_parser = expect(
+    "multiline_string_parser", "interpolation_parser"
+)
+
+# SAME AS THE GRAMMAR'S multiline_string
+multiline_literal = re.compile(r"(\$\$\{|\%\%\{|\$[^{]|\%[^{]|[^$%])+")
 
 
 def first(values):
@@ -41,7 +48,7 @@ def to_concat(tokens):
         return {"literal": ""}
     if len(items) == 1 and (not isinstance(items[0], dict) or "from" not in items[0]):
         return tokens
-    return {"concat": items}
+    return Template(concat=items)
 
 
 def to_multiline_string(tokens):
@@ -50,12 +57,30 @@ def to_multiline_string(tokens):
 
 
 def to_multiline(tokens):
-    return list(multiline_string_parser.parse(tokens["content"]))
-
-
-def multiline_content(tokens, _, string):
-    content = string[tokens.start : tokens.end]
-    return content
+    """
+    HEREDOC BODIES ARE MOSTLY LITERAL (POLICIES, SCRIPTS), SO ONLY THE ${}
+    SPANS ARE SENT TO THE GRAMMAR.  DIRECTIVES (%{}) NEED THE FULL TEMPLATE
+    GRAMMAR, AND GET IT
+    """
+    content = tokens["content"]
+    items = []
+    pos, length = 0, len(content)
+    while pos < length:
+        found = multiline_literal.match(content, pos)
+        if found:
+            items.append(to_multiline_string([found.group()]))
+            pos = found.end()
+        elif content.startswith("${", pos):
+            try:
+                end = code_end(content, pos + 2, ["${"])
+                items.extend(interpolation_parser.parse(content[pos:end], parse_all=True))
+            except (ScanError, ParseException):
+                return list(multiline_string_parser.parse(content))
+            pos = end
+        else:
+            return list(multiline_string_parser.parse(content))
+    result = to_concat(items)
+    return result if isinstance(result, list) else [result]
 
 
 def to_inner_object(tokens):
@@ -73,6 +98,14 @@ def to_inner_object(tokens):
     return prev
 
 
+def to_block(tokens):
+    """
+    A TOP-LEVEL BLOCK IS DONE: RETURN ITS FINAL VALUE NOW, SO ITS ParseResults
+    ARE RELEASED AS THE PARSE PROCEEDS, AND NO WALK OF THE WHOLE FILE IS NEEDED
+    """
+    return scrub(to_inner_object(tokens))
+
+
 def to_splat(tokens):
     expr, _ = tokens.tokens
     return Call("from", [expr], {})
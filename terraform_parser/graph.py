@@ -0,0 +1,261 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import re
+from collections import Counter
+
+from terraform_parser.writer import address, iter_blocks, pairs, is_for
+
+# FIRST PART OF A PATH THAT IS NOT A REFERENCE TO ANOTHER BLOCK
+NOT_REFERENCES = {"count", "each", "path", "self", "terraform"}
+
+_index = re.compile(r"\[[^\]]*\]")
+
+
+def reference(path):
+    """
+    :param path: A PATH FROM parse(), eg aws_instance.this[0].id
+    :return: ADDRESS OF THE BLOCK path REFERS TO, OR None
+    """
+    parts = _index.sub("", path).split(".")
+    root = parts[0]
+    if root in NOT_REFERENCES or len(parts) < 2:
+        return None
+    if root == "data":
+        return ".".join(parts[:3]) if len(parts) >= 3 else None
+    return ".".join(parts[:2])
+
+
+def references(value, names=frozenset()):
+    """
+    :param value: ANY PART OF parse() OUTPUT
+    :param names: LOOP VARIABLES IN SCOPE, NOT REFERENCES
+    :return: GENERATOR OF ADDRESSES REFERRED TO BY value (MAY REPEAT)
+    """
+    if isinstance(value, str):
+        if value.split(".", 1)[0].split("[", 1)[0] not in names:
+            ref = reference(value)
+            if ref:
+                yield ref
+    elif isinstance(value, list):
+        for v in value:
+            yield from references(v, names)
+    elif isinstance(value, dict):
+        preamble = value.get("from")
+        if is_for(preamble):
+            # for EXPRESSION: THE LOOP VARIABLES ARE LOCAL TO IT
+            yield from references(preamble["from"], names)
+            select = preamble["select"]
+            select = select if isinstance(select, list) else [select]
+            names = names | {s["name"] for s in select}
+            for key, v in value.items():
+                if key != "from":
+                    yield from references(v, names)
+            return
+        if preamble is not None and set(value) <= {"from", "select"}:
+            # SPLAT: select IS A PATH INTO EACH ELEMENT
+            yield from references(preamble, names)
+            return
+        for key, v in value.items():
+            if key == "literal":
+                continue
+            if key == "depends_on":
+                # OLD STYLE depends_on = ["aws_s3_bucket.this"]
+                yield from _literals(v)
+            yield from references(v, names)
+
+
+def _literals(value):
+    if isinstance(value, list):
+        for v in value:
+            yield from _literals(v)
+    elif isinstance(value, dict) and isinstance(value.get("literal"), str):
+        ref = reference(value["literal"])
+        if ref:
+            yield ref
+
+
+def iter_nodes(result):
+    """
+    :param result: WHAT parse() RETURNS
+    :return: GENERATOR OF (address, body) FOR EVERY BLOCK, AND EVERY local
+    """
+    for keyword, labels, body in iter_blocks(result):
+        if keyword == "locals":
+            for key, value in pairs(body) if body else []:
+                yield address(keyword, (key,)), value
+        elif keyword != "terraform":
+            yield address(keyword, labels), body
+
+
+class DependencyGraph(object):
+    """
+    ADDRESSES, AND THE ADDRESSES THEY REFER TO, FOR A SET OF FILES.  EACH FILE
+    CAN BE REPLACED ON ITS OWN, AT A COST PROPORTIONAL TO ITS SIZE
+    """
+
+    __slots__ = ["files", "defined", "_dependencies", "_dependents"]
+
+    def __init__(self):
+        self.files = {}  # MAP FROM path TO {address: set(addresses it refers to)}
+        self.defined = {}  # MAP FROM address TO set OF paths DEFINING IT
+        self._dependencies = {}  # MAP FROM address TO Counter OF addresses IT REFERS TO
+        self._dependents = {}  # MAP FROM address TO Counter OF addresses REFERRING TO IT
+
+    def __len__(self):
+        return len(self.defined)
+
+    def __contains__(self, address):
+        return address in self.defined
+
+    def update(self, path, result):
+        """
+        SET (OR REPLACE) THE parse() RESULT OF ONE FILE
+        """
+        self.remove(path)
+        nodes = {}
+        for node, body in iter_nodes(result):
+            refs = nodes.setdefault(node, set())
+            refs.update(references(body))
+            refs.discard(node)
+        self.files[path] = nodes
+        for node, refs in nodes.items():
+            self.defined.setdefault(node, set()).add(path)
+            dependencies = self._dependencies.setdefault(node, Counter())
+            for ref in refs:
+                dependencies[ref] += 1
+                self._dependents.setdefault(ref, Counter())[node] += 1
+
+    def remove(self, path):
+        """
+        FORGET THE BLOCKS OF ONE FILE
+        """
+        nodes = self.files.pop(path, None)
+        if not nodes:
+            return
+        for node, refs in nodes.items():
+            paths = self.defined[node]
+            paths.discard(path)
+            if not paths:
+                del self.defined[node]
+            dependencies = self._dependencies[node]
+            for ref in refs:
+                _decrement(dependencies, ref)
+                _decrement(self._dependents[ref], node)
+                if not self._dependents[ref]:
+                    del self._dependents[ref]
+            if not dependencies:
+                del self._dependencies[node]
+
+    def dependencies(self, address):
+        """
+        :return: set OF ADDRESSES address REFERS TO DIRECTLY
+        """
+        return set(self._dependencies.get(address, ()))
+
+    def dependents(self, address):
+        """
+        :return: set OF ADDRESSES THAT REFER TO address DIRECTLY
+        """
+        return set(self._dependents.get(address, ()))
+
+    def closure(self, address, reverse=False):
+        """
+        :param reverse: True FOR EVERYTHING THAT DEPENDS ON address (eg THE
+                        IMPACT OF CHANGING IT), False FOR EVERYTHING IT NEEDS
+        :return: set OF ADDRESSES REACHABLE FROM address, NOT INCLUDING address
+                 (UNLESS IT IS IN A CYCLE)
+        """
+        edges = self._dependents if reverse else self._dependencies
+        seen = set()
+        todo = [address]
+        while todo:
+            for next in edges.get(todo.pop(), ()):
+                if next not in seen:
+                    seen.add(next)
+                    todo.append(next)
+        return seen
+
+    def cycles(self):
+        """
+        :return: LIST OF CYCLES, EACH A SORTED LIST OF ADDRESSES (STRONGLY
+                 CONNECTED COMPONENTS OF MORE THAN ONE ADDRESS)
+        """
+        edges = self._dependencies
+        return [
+            sorted(component)
+            for component in strongly_connected(edges, lambda node: edges.get(node, ()))
+            if len(component) > 1
+        ]
+
+
+def strongly_connected(roots, children):
+    """
+    :param roots: NODES TO START FROM
+    :param children: FUNCTION FROM A NODE TO THE NODES IT POINTS TO
+    :return: GENERATOR OF STRONGLY CONNECTED COMPONENTS (LISTS OF NODES) REACHABLE
+             FROM roots; A COMPONENT COMES AFTER EVERY COMPONENT IT POINTS TO
+    """
+    # ITERATIVE TARJAN, SO DEEP CHAINS DO NOT HIT THE RECURSION LIMIT
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    for root in roots:
+        if root in index:
+            continue
+        work = [(root, iter(children(root)))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, todo = work[-1]
+            for child in todo:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(children(child))))
+                    break
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+def _decrement(counter, key):
+    if counter[key] == 1:
+        del counter[key]
+    else:
+        counter[key] -= 1
+
+
+def from_files(paths, jobs=None, cache=None):
+    """
+    PARSE paths (SEE parse_files) INTO A DependencyGraph; FILES THAT FAIL
+    TO PARSE ARE LEFT OUT
+    """
+    from terraform_parser.parallel import parse_files
+
+    graph = DependencyGraph()
+    for parsed in parse_files(paths, jobs=jobs, cache=cache):
+        if not parsed.error:
+            graph.update(parsed.path, parsed.result)
+    return graph
@@ -0,0 +1,104 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from terraform_parser.grammar import everything
+from terraform_parser.utils import collapse
+
+
+class Block(object):
+    __slots__ = ["start", "end", "values"]
+
+    def __init__(self, start, end, values):
+        self.start = start
+        self.end = end
+        self.values = values
+
+
+class IncrementalParser(object):
+    """
+    KEEP THE SOURCE, AND THE SCRUBBED RESULT OF EACH TOP-LEVEL BLOCK, SO AN
+    EDIT ONLY RE-PARSES THE BLOCKS IT TOUCHES
+    """
+
+    def __init__(self, content=""):
+        self.content = ""
+        self.blocks = []
+        self.reparsed = 0  # NUMBER OF BLOCKS PARSED BY LAST CHANGE
+        self.edit(0, 0, content)
+
+    @property
+    def result(self):
+        return collapse([v for b in self.blocks for v in b.values])
+
+    def update(self, content):
+        """
+        REPLACE THE WHOLE SOURCE; ONLY THE DIFFERING RANGE IS RE-PARSED
+        """
+        old = self.content
+        prefix = _common_length(old, content, lambda s, n: s[:n])
+        limit = min(len(old), len(content)) - prefix
+        suffix = _common_length(old, content, lambda s, n: s[len(s) - n :], limit)
+        self.edit(prefix, len(old) - suffix, content[prefix : len(content) - suffix])
+
+    def edit(self, start, end, text):
+        """
+        REPLACE self.content[start:end] WITH text
+        """
+        old = self.content
+        content = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+
+        # BLOCKS THAT END BEFORE, OR START AFTER, THE EDIT ARE UNTOUCHED
+        # (A BLOCK ADJACENT TO THE EDIT IS TOUCHED, THE TEXT MAY JOIN IT)
+        blocks = self.blocks
+        first = 0
+        while first < len(blocks) and blocks[first].end < start:
+            first += 1
+        last = first
+        while last < len(blocks) and blocks[last].start <= end:
+            last += 1
+
+        left = blocks[first - 1].end if first else 0
+        right = blocks[last].start + delta if last < len(blocks) else len(content)
+
+        try:
+            middle = _parse_blocks(content[left:right], left)
+        except Exception:
+            # THE EDIT MAY REACH BEYOND THE REGION (eg AN OPEN COMMENT), SO TRY EVERYTHING
+            middle = _parse_blocks(content, 0)
+            before, after = [], []
+        else:
+            before = blocks[:first]
+            after = [Block(b.start + delta, b.end + delta, b.values) for b in blocks[last:]]
+
+        self.content = content
+        self.blocks = before + middle + after
+        self.reparsed = len(middle)
+        return self
+
+
+def _parse_blocks(content, offset):
+    tokens = everything.parse(content, parse_all=True)
+    return [
+        Block(t.start + offset, t.end + offset, list(t))
+        for t in tokens.tokens
+    ]
+
+
+def _common_length(a, b, part, limit=None):
+    """
+    :return: LARGEST n (<= limit) WHERE part(a, n) == part(b, n), BY BINARY SEARCH
+    """
+    lo, hi = 0, min(len(a), len(b)) if limit is None else limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if part(a, mid) == part(b, mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
@@ -0,0 +1,194 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import hashlib
+import os
+import sqlite3
+
+from terraform_parser.blocks import parse_lazy
+from terraform_parser.parallel import find_files
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER,
+    size INTEGER,
+    hash TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    path TEXT,
+    kind TEXT,
+    type TEXT,
+    name TEXT,
+    start INTEGER,  -- BYTE OFFSETS INTO THE FILE
+    end INTEGER
+);
+CREATE INDEX IF NOT EXISTS blocks_address ON blocks (kind, type, name);
+CREATE INDEX IF NOT EXISTS blocks_type ON blocks (type, name);
+CREATE INDEX IF NOT EXISTS blocks_path ON blocks (path);
+"""
+
+# ADDRESS PREFIX TO BLOCK KIND, FOR BLOCKS WITH ONE LABEL
+SINGLE_LABEL = {
+    "module": "module",
+    "var": "variable",
+    "output": "output",
+    "provider": "provider",
+}
+
+
+class IndexedBlock(object):
+    __slots__ = ["path", "kind", "type", "name", "start", "end"]
+
+    def __init__(self, path, kind, type, name, start, end):
+        """
+        :param start: BYTE OFFSET OF THE BLOCK IN THE FILE AT path
+        :param end: BYTE OFFSET OF ITS END
+        """
+        self.path = path
+        self.kind = kind
+        self.type = type
+        self.name = name
+        self.start = start
+        self.end = end
+
+    def __str__(self):
+        return f"{self.path}:{self.start} {self.kind} {self.type or ''} {self.name or ''}"
+
+
+class BlockIndex(object):
+    """
+    ON-DISK (SQLITE) INDEX OF EVERY TOP-LEVEL BLOCK IN A SET OF FILES
+    """
+
+    def __init__(self, filename):
+        """
+        :param filename: SQLITE DATABASE FILE, CREATED IF MISSING (USE ":memory:" FOR NONE)
+        """
+        self.db = sqlite3.connect(filename)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def update(self, directory, extension=".tf"):
+        """
+        BRING THE INDEX UP TO DATE WITH THE FILES UNDER directory; ONLY FILES
+        WITH A NEW mtime OR size ARE READ, AND ONLY IF THEIR HASH CHANGED ARE
+        THEY RE-INDEXED
+        :return: NUMBER OF FILES RE-INDEXED
+        """
+        known = {
+            path: (mtime, size, hash)
+            for path, mtime, size, hash in self.db.execute(
+                "SELECT path, mtime, size, hash FROM files"
+            )
+        }
+        # STORE ABSOLUTE PATHS, SO THE SAME FILE IS ONE ROW, WHATEVER THE cwd
+        directory = os.path.abspath(directory)
+        prefix = os.path.join(directory, "")
+        seen = set()
+        count = 0
+        with self.db:
+            for path in find_files(directory, extension):
+                seen.add(path)
+                stat = os.stat(path)
+                mtime, size, hash = known.get(path, (None, None, None))
+                if (mtime, size) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                with open(path, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                if digest == hash:
+                    self.db.execute(
+                        "UPDATE files SET mtime=?, size=? WHERE path=?",
+                        (stat.st_mtime_ns, stat.st_size, path),
+                    )
+                    continue
+                self._index(path, stat, digest, data)
+                count += 1
+
+            for path in known:
+                if path.startswith(prefix) and path not in seen:
+                    self._remove(path)
+        return count
+
+    def _index(self, path, stat, digest, data):
+        self._remove(path)
+        error = None
+        rows = []
+        try:
+            blocks = parse_lazy(data.decode("utf8"))
+        except Exception as cause:
+            blocks = []
+            error = f"{cause.__class__.__name__}: {cause}"
+        for block in blocks:
+            type, name = _type_name(block.labels)
+            rows.append((path, block.kind, type, name, block.start, block.end))
+            if error is None:
+                # THE HEADER SCANNED, BUT THE BODY MAY NOT PARSE; KEEP THE BLOCK, AND SAY SO
+                try:
+                    block.value
+                except Exception as cause:
+                    error = f"{block}: {cause.__class__.__name__}: {cause}"
+        self.db.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.db.execute(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_mtime_ns, stat.st_size, digest, error),
+        )
+
+    def _remove(self, path):
+        self.db.execute("DELETE FROM blocks WHERE path=?", (path,))
+        self.db.execute("DELETE FROM files WHERE path=?", (path,))
+
+    def find(self, address):
+        """
+        :param address: TERRAFORM ADDRESS, eg aws_instance.this, data.aws_vpc.this, module.x, var.x
+        :return: LIST OF IndexedBlock DEFINING address
+        """
+        path = address.split(".")
+        if path[0] == "data" and len(path) == 3:
+            return self.blocks(kind="data", type=path[1], name=path[2])
+        kind = SINGLE_LABEL.get(path[0])
+        if kind and len(path) == 2:
+            return self.blocks(kind=kind, name=path[1])
+        if len(path) == 2:
+            return self.blocks(kind="resource", type=path[0], name=path[1])
+        return []
+
+    def blocks(self, kind=None, type=None, name=None, path=None):
+        """
+        :return: LIST OF IndexedBlock MATCHING ALL GIVEN PARAMETERS
+        """
+        where = [
+            (column, value)
+            for column, value in (("kind", kind), ("type", type), ("name", name), ("path", path))
+            if value is not None
+        ]
+        sql = "SELECT path, kind, type, name, start, end FROM blocks"
+        if where:
+            sql += " WHERE " + " AND ".join(f"{column}=?" for column, _ in where)
+        sql += " ORDER BY path, start"
+        return [IndexedBlock(*row) for row in self.db.execute(sql, [v for _, v in where])]
+
+    def errors(self):
+        """
+        :return: LIST OF (path, error) FOR FILES THAT COULD NOT BE INDEXED
+        """
+        return list(self.db.execute(
+            "SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path"
+        ))
+
+
+def _type_name(labels):
+    if len(labels) >= 2:
+        return labels[0], labels[1]
+    elif labels:
+        return None, labels[0]
+    return None, None
@@ -0,0 +1,261 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_dots import listwrap
+
+from mo_parsing import whitespaces, ParseException, ParseResults, Group, Suppress
+from mo_parsing.expressions import ParseExpression
+from mo_parsing.infix import RIGHT_ASSOC
+from mo_parsing.utils import append_config, wrap_parse_action
+
+# KINDS OF OPERATOR
+PREFIX = "prefix"
+SUFFIX = "suffix"
+BINARY = "binary"
+TERNARY = "ternary"
+
+
+def infix_notation(base_expr, spec):
+    """
+    SAME spec, AND SAME ParseResults GIVEN TO THE PARSE ACTIONS, AS
+    mo_parsing.infix_notation, BUT PARSED BY PRECEDENCE CLIMBING: EACH OPERAND
+    IS PARSED ONCE, AND EACH OPERATOR IS REDUCED AS SOON AS ITS RIGHT SIDE IS
+    KNOWN, RATHER THAN COLLECTING A FLAT LIST AND RESCANNING IT, LEVEL BY
+    LEVEL, FOR EVERY REDUCTION
+    :param base_expr: THE OPERAND
+    :param spec: LIST OF (op, arity, assoc, parse_action), TIGHTEST FIRST
+    """
+    return Precedence(base_expr, spec)
+
+
+class Operator(object):
+    """
+    ONE LEVEL OF spec
+    """
+
+    __slots__ = ["level", "kind", "op", "suppressed", "assoc", "group", "actions"]
+
+    def __init__(self, level, kind, op, suppressed, assoc, actions):
+        self.level = level
+        self.kind = kind
+        self.op = op  # FOR TERNARY, THE (first, second) PAIR
+        self.suppressed = suppressed
+        self.assoc = assoc
+        self.group = Group(op[0] if kind == TERNARY else op)  # TYPE OF THE REDUCED ParseResults
+        self.actions = actions
+
+
+class Precedence(ParseExpression):
+    """
+    OPERAND, AND OPERATORS, PARSED BY PRECEDENCE CLIMBING
+    """
+
+    __slots__ = ["operators", "prefix", "suffix", "infix"]
+    Config = append_config(ParseExpression, "whitespace")
+
+    def __init__(self, base_expr, spec):
+        operators = []
+        for level, (op, arity, assoc, *rest) in enumerate(spec):
+            actions = [wrap_parse_action(a) for a in listwrap(rest[0])] if rest else []
+            if arity == 1:
+                kind = PREFIX if assoc == RIGHT_ASSOC else SUFFIX
+                op, suppressed = _normalize(op)
+            elif arity == 2:
+                kind = BINARY
+                op, suppressed = _normalize(op)
+            else:
+                kind = TERNARY
+                (first, s0), (second, s1) = _normalize(op[0]), _normalize(op[1])
+                op, suppressed = (first, second), (s0, s1)
+            operators.append(Operator(level, kind, op, suppressed, assoc, actions))
+
+        exprs = [base_expr]
+        for o in operators:
+            exprs.extend(o.op if o.kind == TERNARY else [o.op])
+        ParseExpression.__init__(self, exprs)
+        self.set_config(whitespace=whitespaces.CURRENT)
+        self.operators = operators
+        self._index()
+
+    def _index(self):
+        # MAP FROM FIRST CHARACTER TO THE OPERATORS THAT CAN START WITH IT
+        self.prefix = _by_first([(o.op, o) for o in self.operators if o.kind == PREFIX])
+        self.suffix = _by_first([(o.op, o) for o in self.operators if o.kind == SUFFIX])
+        self.infix = _by_first([
+            (o.op[0] if o.kind == TERNARY else o.op, o)
+            for o in self.operators
+            if o.kind in (BINARY, TERNARY)
+        ])
+
+    def copy(self):
+        output = ParseExpression.copy(self)
+        output.operators = self.operators
+        output.prefix = self.prefix
+        output.suffix = self.suffix
+        output.infix = self.infix
+        return output
+
+    def streamline(self):
+        if self.streamlined:
+            return self
+        self.streamlined = True
+        self.exprs = [e.streamline() for e in self.exprs]
+        ops = iter(self.exprs[1:])
+        for o in self.operators:
+            o.op = (next(ops), next(ops)) if o.kind == TERNARY else next(ops)
+        self._index()
+        return self
+
+    def check_recursion(self, seen=()):
+        seen = seen + (self,)
+        self.exprs[0].check_recursion(seen)
+        for o in self.operators:
+            if o.kind == PREFIX:
+                o.op.check_recursion(seen)
+
+    def expecting(self):
+        return {}
+
+    def _min_length(self):
+        return self.exprs[0].min_length()
+
+    @property
+    def whitespace(self):
+        return self.parser_config.whitespace
+
+    def parse_impl(self, string, start, do_actions=True):
+        failures = []
+        result = self._expression(string, start, len(self.operators), do_actions, failures)
+        return ParseResults(self, start, result.end, [result], failures)
+
+    def _expression(self, string, start, limit, do_actions, failures):
+        """
+        :param limit: ONLY REDUCE BINARY AND TERNARY OPERATORS WITH level < limit
+        :return: ParseResults OF THE LONGEST EXPRESSION AT start
+        """
+        skip = self.parser_config.whitespace.skip
+
+        # PREFIX OPERATORS, OR THE OPERAND
+        found = _match(self.prefix, string, start, do_actions)
+        if found:
+            o, r = found
+            tok = self._expression(string, skip(string, r.end), o.level, do_actions, failures)
+            if o.suppressed:
+                left = ParseResults(o.group, tok.start, tok.end, (tok,), [])
+            else:
+                left = ParseResults(o.group, r.start, tok.end, (r, tok), [])
+            left = _act(o, left, string)
+        else:
+            left = self.exprs[0]._parse(string, start, do_actions)
+            failures.extend(left.failures)
+
+        # SUFFIX OPERATORS, LEFT TO RIGHT
+        while True:
+            index = skip(string, left.end)
+            found = _match(self.suffix, string, index, do_actions)
+            if not found:
+                break
+            o, r = found
+            if o.suppressed:
+                left = ParseResults(o.group, left.start, left.end, (left,), [])
+            else:
+                left = ParseResults(o.group, left.start, r.end, (left, r), [])
+            left = _act(o, left, string)
+
+        # BINARY AND TERNARY OPERATORS, TIGHTER THAN limit
+        while True:
+            index = skip(string, left.end)
+            found = _match(self.infix, string, index, do_actions)
+            if not found:
+                break
+            o, r0 = found
+            if o.level >= limit:
+                break
+            next_limit = o.level + 1 if o.assoc == RIGHT_ASSOC else o.level
+            try:
+                if o.kind == BINARY:
+                    right = self._expression(
+                        string, skip(string, r0.end), next_limit, do_actions, failures
+                    )
+                    if o.suppressed:
+                        seq = (left, right)
+                    else:
+                        seq = (left, r0, right)
+                else:
+                    middle = self._expression(
+                        string,
+                        skip(string, r0.end),
+                        len(self.operators),
+                        do_actions,
+                        failures,
+                    )
+                    r1 = o.op[1]._parse(string, skip(string, middle.end), do_actions)
+                    right = self._expression(
+                        string, skip(string, r1.end), next_limit, do_actions, failures
+                    )
+                    seq = [left, middle, right]
+                    s0, s1 = o.suppressed
+                    if not s1:
+                        seq.insert(2, r1)
+                    if not s0:
+                        seq.insert(1, r0)
+            except ParseException as cause:
+                # THE OPERATOR IS NOT PART OF THIS EXPRESSION
+                failures.append(cause)
+                break
+            left = _act(o, ParseResults(o.group, left.start, right.end, seq, []), string)
+        return left
+
+
+def _normalize(op):
+    """
+    :return: (op, suppressed) PAIR
+    """
+    op = whitespaces.CURRENT.normalize(op)
+    if isinstance(op, Suppress):
+        return op.expr, True
+    return op, False
+
+
+def _by_first(pairs):
+    """
+    :param pairs: LIST OF (element, operator)
+    :return: MAP FROM FIRST CHARACTER TO LIST OF (element, operator); KEY None
+             FOR ELEMENTS THAT CAN START WITH ANYTHING
+    """
+    output = {}
+    for element, o in pairs:
+        firsts = {k[:1] for k in element.expecting()} or {None}
+        for first in firsts:
+            output.setdefault(first, []).append((element, o))
+    anything = output.get(None, [])
+    for first, candidates in output.items():
+        if first is not None:
+            candidates.extend(anything)
+    return output
+
+
+def _match(lookup, string, start, do_actions):
+    """
+    :return: (operator, ParseResults) FOR THE LONGEST OPERATOR AT start, OR None
+    """
+    best = None
+    for element, o in lookup.get(string[start : start + 1].lower()) or lookup.get(None, ()):
+        try:
+            r = element._parse(string, start, do_actions)
+        except ParseException:
+            continue
+        if best is None or r.end > best[1].end:
+            best = o, r
+    return best
+
+
+def _act(o, result, string):
+    for action in o.actions:
+        result = action(result, -1, string)
+    return result
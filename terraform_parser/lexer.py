@@ -0,0 +1,154 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import re
+
+# WORDS THAT CAN NOT BE USED AS A name
+KEYWORDS = frozenset(["for", "in", "if"])
+CASELESS_KEYWORDS = frozenset(["true", "false", "null"])
+
+# TOKEN KINDS
+IDENTIFIER = "identifier"
+KEYWORD = "keyword"
+NUMBER = "number"
+STRING = "string"
+HEREDOC = "heredoc"
+OPERATOR = "operator"
+NEWLINE = "newline"
+
+_white = re.compile(r"(?:\s+|#[^\n]*|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+_line_white = re.compile(r"(?:[ \t\r]+|#[^\n]*|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+_token = re.compile(
+    r"""
+    (?P<newline>\n)
+    |(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+    |(?P<identifier>\w(?:\[\d+\]|[-\w])*)
+    |(?P<string>")
+    |(?P<heredoc><<-?)
+    |(?P<operator>\.\.\.|=>|==|!=|<>|<=|>=|&&|\|\||[-+*/%!<>=?:.,(){}\[\]])
+    """,
+    re.VERBOSE,
+)
+_string = re.compile(r"\\.|\$\$\{|%%\{|[$%]\{|\"", re.DOTALL)
+_code = re.compile(r"[{}\"]|#[^\n]*|//[^\n]*|/\*.*?\*/|<<-?", re.DOTALL)
+
+
+class ScanError(Exception):
+    pass
+
+
+def is_keyword(word):
+    """
+    SET MEMBERSHIP OF THE WORD'S LEADING PART (eg true-thing IS STILL true)
+    """
+    head = _head.match(word).group()
+    return head in KEYWORDS or head.lower() in CASELESS_KEYWORDS
+
+
+_head = re.compile(r"[a-zA-Z0-9_]*")
+
+
+def skip_white(content, start):
+    """
+    :return: POSITION AFTER ANY WHITESPACE AND COMMENTS
+    """
+    return _white.match(content, start).end()
+
+
+def tokenize(content, start=0, end=None):
+    """
+    SINGLE PASS OVER content, SKIPPING WHITESPACE AND COMMENTS
+    :return: GENERATOR OF (kind, start, end); STRINGS (WITH THEIR TEMPLATES)
+             AND HEREDOCS ARE SINGLE TOKENS; RUNS OF NEWLINES ARE ONE TOKEN
+    """
+    end = len(content) if end is None else end
+    pos = _line_white.match(content, start).end()
+    while pos < end:
+        found = _token.match(content, pos)
+        if not found:
+            raise ScanError(f"unexpected character {content[pos]!r} at {pos}")
+        kind = found.lastgroup
+        token_end = found.end()
+        if kind == NEWLINE:
+            token_end = _white.match(content, token_end).end()
+            yield NEWLINE, pos, token_end
+            pos = token_end
+            continue
+        elif kind == STRING:
+            token_end = string_end(content, pos)
+        elif kind == HEREDOC:
+            token_end = heredoc_end(content, pos)
+        elif kind == IDENTIFIER and is_keyword(found.group()):
+            kind = KEYWORD
+        yield kind, pos, token_end
+        pos = _line_white.match(content, token_end).end()
+
+
+def string_end(content, start):
+    """
+    :param start: POSITION OF THE OPENING QUOTE
+    :return: POSITION AFTER THE CLOSING QUOTE, SKIPPING TEMPLATE EXPRESSIONS
+    """
+    stack = ['"']  # '"' (STRING), "${" (TEMPLATE EXPRESSION), OR "{"
+    pos = start + 1
+    while stack:
+        if stack[-1] == '"':
+            found = _string.search(content, pos)
+            if not found:
+                raise ScanError(f"unterminated string at {start}")
+            token = found.group()
+            pos = found.end()
+            if token == '"':
+                stack.pop()
+            elif token in ("${", "%{"):
+                stack.append("${")
+            continue
+
+        pos = code_end(content, pos, stack)
+    return pos
+
+
+def code_end(content, start, stack):
+    """
+    SCAN CODE UNTIL stack IS POPPED TO A STRING (OR EMPTY)
+    :param stack: THE OPEN "{", "${" AND '"'; MODIFIED IN PLACE
+    :return: POSITION AFTER THE LAST TOKEN SCANNED
+    """
+    pos = start
+    while stack and stack[-1] != '"':
+        found = _code.search(content, pos)
+        if not found:
+            raise ScanError(f"expecting }} for code at {start}")
+        token = found.group()
+        pos = found.end()
+        if token == "{":
+            stack.append("{")
+        elif token == "}":
+            stack.pop()
+        elif token == '"':
+            pos = string_end(content, found.start())
+        elif token.startswith("<<"):
+            pos = heredoc_end(content, found.start())
+    return pos
+
+
+def heredoc_end(content, start):
+    """
+    :param start: POSITION OF THE <<
+    :return: POSITION AFTER THE TERMINATOR; SAME RULE AS THE GRAMMAR'S Heredoc:
+             THE BODY ENDS AT THE FIRST OCCURRENCE OF THE TERMINATOR
+    """
+    pos = start + 2
+    if content.startswith("-", pos):
+        pos += 1
+    eol = content.find("\n", pos)
+    eod = content[pos:eol] if eol != -1 else ""
+    end = content.find(eod, eol) if eod else -1
+    if end == -1:
+        raise ScanError(f"unterminated heredoc at {start}")
+    return end + len(eod)
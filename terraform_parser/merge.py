@@ -0,0 +1,232 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from terraform_parser.utils import collapse
+from terraform_parser.writer import address, iter_blocks, make_block, is_object, pairs
+
+# CONFLICT POLICIES
+ERROR = "error"  # RAISE MergeConflict
+LAST_WINS = "last-wins"  # THE LATER BLOCK REPLACES THE EARLIER ONE
+DEEP_MERGE = "deep-merge"  # MERGE BODIES KEY-BY-KEY; THE LATER VALUE WINS
+POLICIES = (ERROR, LAST_WINS, DEEP_MERGE)
+
+# BLOCKS WITHOUT LABELS; EACH OF THEIR ATTRIBUTES IS ITS OWN ADDRESS
+UNLABELLED = {"locals", "terraform"}
+
+
+class Conflict(object):
+    __slots__ = ["address", "key", "first", "second"]
+
+    def __init__(self, address, key, first, second):
+        """
+        :param address: (keyword, *labels) OF THE BLOCK
+        :param key: TUPLE OF ATTRIBUTE NAMES INSIDE THE BLOCK, () FOR THE WHOLE BLOCK
+        :param first: PATH OF THE FILE WITH THE EARLIER DEFINITION
+        :param second: PATH OF THE FILE WITH THE LATER DEFINITION
+        """
+        self.address = address
+        self.key = key
+        self.first = first
+        self.second = second
+
+    def __str__(self):
+        keyword, *labels = self.address
+        name = ".".join([address(keyword, labels), *self.key])
+        return f"{name} defined in {self.first} and {self.second}"
+
+
+class MergeConflict(Exception):
+    def __init__(self, conflict):
+        Exception.__init__(self, str(conflict))
+        self.conflict = conflict
+
+
+class Merge(object):
+    """
+    MERGE THE parse() RESULTS OF MANY FILES INTO ONE SPEC.  BLOCKS ARE INDEXED
+    BY ADDRESS (KEYWORD AND LABELS), SO EACH BLOCK IS FOUND IN CONSTANT TIME
+    """
+
+    __slots__ = ["policy", "blocks", "conflicts", "errors"]
+
+    def __init__(self, policy=ERROR):
+        if policy not in POLICIES:
+            raise ValueError(f"expecting policy in {POLICIES}, not {policy!r}")
+        self.policy = policy
+        self.blocks = {}  # MAP FROM ADDRESS TO _Block, IN ORDER OF FIRST DEFINITION
+        self.conflicts = []
+        self.errors = {}  # MAP FROM path TO ERROR MESSAGE
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def add(self, path, result):
+        """
+        MERGE ONE parse() RESULT; WITH THE ERROR POLICY, A CONFLICT LEAVES THE
+        MERGE AS IT WAS BEFORE THE CALL
+        :param path: WHERE result CAME FROM, FOR THE CONFLICT REPORT
+        """
+        blocks = []
+        for keyword, labels, body in iter_blocks(result):
+            if keyword in UNLABELLED:
+                for key, value in pairs(body):
+                    blocks.append(((keyword, key), {key: [value]}))
+            else:
+                blocks.append(((keyword, *labels), _groups(body)))
+
+        if self.policy == ERROR:
+            # FIND ANY CONFLICT BEFORE CHANGING ANYTHING
+            seen = {}
+            for address, groups in blocks:
+                block = self.blocks.get(address)
+                first = seen.get(address, block and block.groups)
+                if first is not None and first != groups:
+                    previous = path if address in seen else block.path
+                    raise MergeConflict(Conflict(address, (), previous, path))
+                seen[address] = groups
+
+        for address, groups in blocks:
+            self._add(path, address, groups)
+
+    def _add(self, path, address, groups):
+        block = self.blocks.get(address)
+        if block is None:
+            self.blocks[address] = _Block(path, groups)
+            return
+        if block.groups == groups:
+            return
+        if self.policy == DEEP_MERGE:
+            _deep_merge(block.groups, groups, address, (), block.path, path, self.conflicts)
+            block.path = path
+            return
+        conflict = Conflict(address, (), block.path, path)
+        if self.policy == ERROR:
+            raise MergeConflict(conflict)
+        self.conflicts.append(conflict)
+        block.path = path
+        block.groups = groups
+
+    def result(self):
+        """
+        :return: THE MERGED SPEC, IN THE SHAPE parse() RETURNS (ALL locals IN
+                 ONE BLOCK, ALL terraform IN ANOTHER)
+        """
+        output = []
+        unlabelled = {}
+        for (keyword, *labels), block in self.blocks.items():
+            if keyword in UNLABELLED:
+                groups = unlabelled.get(keyword)
+                if groups is None:
+                    groups = unlabelled[keyword] = {}
+                    output.append(keyword)
+                groups.update(block.groups)
+            else:
+                output.append(make_block(keyword, labels, _body(block.groups)))
+        return collapse([
+            make_block(block, (), _body(unlabelled[block])) if isinstance(block, str) else block
+            for block in output
+        ])
+
+    def report(self):
+        """
+        :return: ONE LINE PER CONFLICT
+        """
+        return "\n".join(str(c) for c in self.conflicts)
+
+
+class _Block(object):
+    __slots__ = ["path", "groups"]
+
+    def __init__(self, path, groups):
+        self.path = path  # FILE OF THE LATEST DEFINITION
+        self.groups = groups
+
+
+def _groups(body):
+    """
+    :return: MAP FROM KEY TO LIST OF VALUES (NESTED BLOCKS, LIKE ingress, CAN REPEAT)
+    """
+    groups = {}
+    if not body:
+        return groups
+    for key, value in pairs(body):
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [value]
+        else:
+            group.append(value)
+    return groups
+
+
+def _body(groups):
+    """
+    :return: groups AS A parse() BODY
+    """
+    items = [{key: value} for key, values in groups.items() for value in values]
+    if len(items) == 1:
+        return items[0]
+    return items
+
+
+def _deep_merge(old, new, address, key, first, second, conflicts):
+    """
+    MERGE new GROUPS INTO old, KEY BY KEY; OBJECTS ARE MERGED RECURSIVELY,
+    ANYTHING ELSE THAT DIFFERS IS A CONFLICT, AND THE new VALUE WINS
+    """
+    for name, values in new.items():
+        existing = old.get(name)
+        if existing is None:
+            old[name] = values
+        elif existing == values:
+            continue
+        elif (
+            len(existing) == 1
+            and len(values) == 1
+            and is_object(existing[0])
+            and is_object(values[0])
+        ):
+            groups = _groups(existing[0])
+            _deep_merge(
+                groups, _groups(values[0]), address, key + (name,), first, second, conflicts
+            )
+            old[name] = [_body(groups)]
+        else:
+            conflicts.append(Conflict(address, key + (name,), first, second))
+            old[name] = values
+
+
+def merge(results, policy=ERROR):
+    """
+    :param results: ITERABLE OF (path, parse() RESULT), LATER WINS CONFLICTS
+    :param policy: ONE OF ERROR, LAST_WINS, DEEP_MERGE
+    :return: Merge
+    """
+    output = Merge(policy)
+    for path, result in results:
+        output.add(path, result)
+    return output
+
+
+def merge_files(paths, policy=ERROR, jobs=None, cache=None):
+    """
+    PARSE paths (SEE parse_files) AND MERGE THEM, IN THE ORDER GIVEN; FILES
+    THAT FAIL TO PARSE ARE RECORDED IN Merge.errors
+    """
+    from terraform_parser.parallel import parse_files
+
+    paths = list(paths)
+    # parse_files() YIELDS IN COMPLETION ORDER; MERGE IN THE ORDER GIVEN
+    parsed = {p.path: p for p in parse_files(paths, jobs=jobs, cache=cache)}
+    output = Merge(policy)
+    for path in paths:
+        file = parsed[path]
+        if file.error:
+            output.errors[path] = file.error
+        else:
+            output.add(path, file.result)
+    return output
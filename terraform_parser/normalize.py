@@ -0,0 +1,239 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import operator
+
+from terraform_parser.utils import collapse, Template
+from terraform_parser.writer import is_object, iter_blocks, make_block
+
+# OPERATORS THAT ALWAYS RETURN A bool
+BOOLEAN_OPS = {"eq", "neq", "lt", "lte", "gt", "gte", "and", "or", "not", "missing", "exists"}
+# OPERATORS WHERE (a op b) op c IS a op b op c
+ASSOCIATIVE_OPS = {"add", "mul", "and", "or"}
+# OPERATORS FOLDED WHEN ALL ARGUMENTS ARE int
+INTEGER_OPS = {"add": operator.add, "sub": operator.sub, "mul": operator.mul}
+COMPARISON_OPS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+}
+
+
+def normalize(result):
+    """
+    FOLD CONSTANTS, AND MERGE LITERAL RUNS, SO THE RESULT IS SMALLER, BUT
+    EVALUATES THE SAME:
+
+        "a${"b"}c"              {"literal": "abc"}
+        "a${"b${c}"}"           {"concat": [{"literal": "ab"}, "c"]}
+        true ? a : b            "a"
+        x == "" ? true : false  {"eq": ["x", {"literal": ""}]}
+        --1, !true, 1 + 2       1, false, 3
+        map("Name", x)          {"Name": "x"}
+
+    THE ATTRIBUTES OF A BLOCK ARE NOT FOLDED, EVEN IF NAMED LIKE AN OPERATOR
+    (eg locals { not = true }).  BUT AN OBJECT VALUE WITH ONE OPERATOR-NAMED
+    KEY IS THE SAME dict AS THE OPERATOR (x = {not = true} AND x = !true ARE
+    BOTH {"not": true}), SO IT IS FOLDED, AS evaluate() WOULD.  THE INPUT IS
+    NOT CHANGED; UNCHANGED PARTS ARE SHARED WITH THE OUTPUT
+
+    :param result: WHAT parse() RETURNS
+    """
+    return collapse([
+        make_block(keyword, labels, _body(body)) for keyword, labels, body in iter_blocks(result)
+    ])
+
+
+def normalize_expression(expr):
+    """
+    SAME AS normalize(), FOR ONE EXPRESSION (eg THE VALUE OF AN ATTRIBUTE).
+    ONLY parse() MARKS A STRING TEMPLATE (SEE Template), SO ONLY THOSE HAVE
+    THEIR LITERALS MERGED; A {"concat": ...} BUILT ANY OTHER WAY IS A CALL
+    """
+    if isinstance(expr, list):
+        if is_object(expr):
+            return _body(expr)
+        return [normalize_expression(v) for v in expr]
+    elif not isinstance(expr, dict):
+        return expr
+    elif len(expr) == 1 and "literal" in expr:
+        return expr
+    elif is_object(expr):
+        return _body(expr)
+    output = {k: normalize_expression(v) for k, v in expr.items()}
+    if isinstance(expr, Template):
+        output = Template(output)
+    if len(output) == 1:
+        ((op, args),) = output.items()
+        fold = FOLDS.get(op)
+        if fold:
+            return fold(op, args, output)
+    return output
+
+
+def _body(body):
+    """
+    :param body: A dict, OR LIST OF SINGLE-KEY dicts, OF attribute: value
+    :return: body, WITH ITS VALUES NORMALIZED, AND ITS NAMES NOT
+    """
+    if isinstance(body, list):
+        return [{k: normalize_expression(v) for k, v in item.items()} for item in body]
+    elif isinstance(body, dict):
+        return {k: normalize_expression(v) for k, v in body.items()}
+    return body
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_literal(value):
+    return isinstance(value, dict) and len(value) == 1 and isinstance(value.get("literal"), str)
+
+
+def _kind(value):
+    """
+    :return: TYPE OF A CONSTANT, OR None IF value IS NOT ONE (A str IS A REFERENCE)
+    """
+    if isinstance(value, bool):
+        return "bool"
+    elif isinstance(value, (int, float)):
+        return "number"
+    elif _is_literal(value):
+        return "string"
+    return None
+
+
+def _fold_concat(op, args, expr):
+    if not isinstance(expr, Template):
+        # concat(a, ["b", "c"]) IS ALSO {"concat": [a, "b", "c"]}, AND "b", "c" ARE NOT TEXT
+        return expr
+    parts = []
+    for part in args if isinstance(args, list) else [args]:
+        if isinstance(part, Template):
+            # "a${"b${c}"}" IS "ab${c}"
+            inner = part["concat"]
+            parts.extend(inner if isinstance(inner, list) else [inner])
+        else:
+            parts.append(part)
+
+    # CONSTANTS ARE TEXT, AND RUNS OF TEXT ARE ONE LITERAL
+    merged = []
+    for part in parts:
+        if isinstance(part, bool):
+            part = {"literal": "true" if part else "false"}
+        elif _is_int(part):
+            part = {"literal": str(part)}
+        if _is_literal(part) and merged and _is_literal(merged[-1]):
+            merged[-1] = {"literal": merged[-1]["literal"] + part["literal"]}
+        else:
+            merged.append(part)
+
+    if len(merged) == 1 and _is_literal(merged[0]):
+        return merged[0]
+    if merged == (args if isinstance(args, list) else [args]):
+        return expr
+    return Template({op: merged if len(merged) > 1 else merged[0]})
+
+
+def _fold_map(op, args, expr):
+    # map("a", 1, "b", 2) IS {a = 1, b = 2}, IF THE KEYS ARE LITERALS
+    if not isinstance(args, list) or len(args) % 2 or not all(_is_literal(k) for k in args[::2]):
+        return expr
+    keys = [k["literal"] for k in args[::2]]
+    if len(set(keys)) != len(keys):
+        return expr
+    # THE SAME SHAPE parse() GIVES {a = 1, b = 2}
+    output = collapse([{k: v} for k, v in zip(keys, args[1::2])])
+    if not is_object(output):
+        # A KEY THAT LOOKS LIKE AN OPERATOR, eg {"add": 1}
+        return expr
+    return output
+
+
+def _fold_sign(op, args, expr):
+    # {neg = 1} IS ALSO {"neg": 1}; is_object() CAN NOT TELL, SO IT IS -1, AS IN evaluate()
+    if _is_int(args) or isinstance(args, float):
+        return -args if op == "neg" else args
+    return expr
+
+
+def _fold_not(op, args, expr):
+    # {not = true} IS ALSO {"not": true}, AND FOLDS TO false, AS IN evaluate()
+    if isinstance(args, bool):
+        return not args
+    return expr
+
+
+def _fold_if(op, args, expr):
+    if not isinstance(args, list) or len(args) != 3:
+        return expr
+    when, then, otherwise = args
+    if isinstance(when, bool):
+        return then if when else otherwise
+    if _is_boolean(when) and isinstance(then, bool) and isinstance(otherwise, bool):
+        if then and not otherwise:
+            # c ? true : false IS c
+            return when
+        if otherwise and not then:
+            return {"not": when}
+    return expr
+
+
+def _is_boolean(value):
+    return isinstance(value, bool) or (
+        isinstance(value, dict) and len(value) == 1 and next(iter(value)) in BOOLEAN_OPS
+    )
+
+
+def _fold_binary(op, args, expr):
+    if not isinstance(args, list) or len(args) < 2:
+        return expr
+    if op in ASSOCIATIVE_OPS and any(
+        isinstance(a, dict) and len(a) == 1 and isinstance(a.get(op), list) for a in args
+    ):
+        # (a + b) + c IS a + b + c
+        flat = []
+        for a in args:
+            if isinstance(a, dict) and len(a) == 1 and isinstance(a.get(op), list):
+                flat.extend(a[op])
+            else:
+                flat.append(a)
+        args = flat
+        expr = {op: args}
+
+    if op in INTEGER_OPS and all(_is_int(a) for a in args):
+        value = args[0]
+        for a in args[1:]:
+            value = INTEGER_OPS[op](value, a)
+        return value
+    if op in ("and", "or") and all(isinstance(a, bool) for a in args):
+        return all(args) if op == "and" else any(args)
+    if op in COMPARISON_OPS and len(args) == 2:
+        left, right = args
+        kinds = _kind(left), _kind(right)
+        if op in ("eq", "neq") and None not in kinds:
+            same = kinds[0] == kinds[1] and left == right
+            return same if op == "eq" else not same
+        if _is_int(left) and _is_int(right):
+            return COMPARISON_OPS[op](left, right)
+    return expr
+
+
+FOLDS = {
+    "concat": _fold_concat,
+    "map": _fold_map,
+    "neg": _fold_sign,
+    "pos": _fold_sign,
+    "not": _fold_not,
+    "if_then_else": _fold_if,
+    **{op: _fold_binary for op in ASSOCIATIVE_OPS | set(INTEGER_OPS) | set(COMPARISON_OPS)},
+}
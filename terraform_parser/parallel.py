@@ -0,0 +1,99 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from terraform_parser import parse
+
+# EACH WORKER KEEPS ITS OWN
+_cache = None
+
+
+class ParsedFile(object):
+    __slots__ = ["path", "result", "error"]
+
+    def __init__(self, path, result, error):
+        self.path = path
+        self.result = result
+        self.error = error
+
+    def __str__(self):
+        return f"ParsedFile({self.path}, error={self.error})"
+
+
+def find_files(directory, extension=".tf"):
+    """
+    :return: SORTED PATHS OF ALL FILES UNDER directory WITH GIVEN extension
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(extension):
+                yield os.path.join(root, name)
+
+
+def parse_directory(directory, jobs=None, cache=None, extension=".tf"):
+    """
+    PARSE ALL TERRAFORM FILES UNDER directory, SEE parse_files()
+    """
+    return parse_files(find_files(directory, extension), jobs=jobs, cache=cache)
+
+
+def parse_files(paths, jobs=None, cache=None):
+    """
+    PARSE MANY FILES WITH A POOL OF WORKER PROCESSES.  THE GRAMMAR IS BUILT ONCE
+    PER WORKER (WHEN IT IMPORTS terraform_parser), NOT ONCE PER FILE
+
+    :param paths: ITERABLE OF FILE PATHS
+    :param jobs: NUMBER OF WORKER PROCESSES (DEFAULT os.cpu_count()), 1 TO PARSE IN THIS PROCESS
+    :param cache: OPTIONAL ParseCache, SHARED BY ALL WORKERS
+    :return: GENERATOR OF ParsedFile, IN COMPLETION ORDER
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        # IN THIS PROCESS, SO PASS THE CACHE; _cache IS FOR WORKER PROCESSES ONLY
+        for path in paths:
+            yield _parse_file(path, cache)
+        return
+
+    paths = iter(paths)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(cache,)
+    ) as pool:
+        # BOUND THE WORK IN FLIGHT SO HUGE REPOSITORIES DO NOT QUEUE EVERYTHING AT ONCE
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(_parse_in_worker, path))
+            if len(pending) >= jobs * 4:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                for path in paths:
+                    pending.add(pool.submit(_parse_in_worker, path))
+                    break
+
+
+def _init_worker(cache):
+    global _cache
+    _cache = cache
+
+
+def _parse_in_worker(path):
+    return _parse_file(path, _cache)
+
+
+def _parse_file(path, cache):
+    try:
+        with open(path, "r", encoding="utf8") as f:
+            content = f.read()
+        return ParsedFile(path, parse(content, cache=cache), None)
+    except Exception as cause:
+        return ParsedFile(path, None, f"{cause.__class__.__name__}: {cause}")
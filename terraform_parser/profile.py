@@ -0,0 +1,166 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from threading import Lock
+from time import perf_counter
+
+from mo_parsing import ParseException
+from mo_parsing.core import ParserElement
+from mo_parsing.whitespaces import Whitespace
+
+WHITESPACE = "<whitespace>"  # KEY FOR TIME SPENT SKIPPING WHITESPACE AND COMMENTS
+COLUMNS = ("attempts", "successes", "failures", "time", "self")
+
+# THE PATCH IS SHARED BY ALL ACTIVE PROFILES, AND CHANGED ONLY UNDER _lock
+_lock = Lock()
+_active = []  # PROFILES, IN THE ORDER THEY WERE ENTERED
+_original = None  # (ParserElement._parse, Whitespace.skip) WITH NO PROFILE ACTIVE
+
+
+class Profile(object):
+    """
+    COUNT ATTEMPTS, SUCCESSES, FAILURES AND TIME FOR EACH NAMED PARSER ELEMENT
+
+        profile = Profile()
+        parse(content, profile=profile)
+        print(profile.report())
+
+    WHILE ACTIVE, EVERY PARSE (IN EVERY THREAD) IS PROFILED; WHEN NOT, THE
+    PARSER IS UNTOUCHED, AND COSTS NOTHING EXTRA
+
+    time IS INCLUSIVE (COUNTED ONCE, EVEN WHEN AN ELEMENT RECURSES INTO
+    ITSELF); self EXCLUDES THE TIME OF NESTED ELEMENTS
+    """
+
+    __slots__ = ["anonymous", "stats", "_depth", "_stack"]
+
+    def __init__(self, anonymous=False):
+        """
+        :param anonymous: True TO GIVE UNNAMED ELEMENTS THEIR OWN ROW (eg <And>);
+                          OTHERWISE THEIR TIME IS CHARGED TO THE NEAREST NAMED
+                          ELEMENT ENCLOSING THEM
+        """
+        self.anonymous = anonymous
+        self.stats = {}  # MAP FROM NAME TO [attempts, successes, failures, time, self]
+        self._depth = {}  # MAP FROM NAME TO HOW MANY ARE ACTIVE
+        self._stack = []  # TIME SPENT IN NESTED ELEMENTS, FOR EACH ACTIVE ELEMENT
+
+    def __enter__(self):
+        global _original
+        with _lock:
+            if self in _active:
+                raise RuntimeError("profile is already active")
+            if not _active:
+                _original = ParserElement._parse, Whitespace.skip
+            _active.append(self)
+            _install()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _original
+        with _lock:
+            _active.remove(self)
+            if _active:
+                # PROFILES MAY EXIT IN ANY ORDER, SO REBUILD THE PATCH FROM THE ORIGINAL
+                _install()
+            else:
+                ParserElement._parse, Whitespace.skip = _original
+                _original = None
+
+    def _entry(self, name):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = [0, 0, 0, 0.0, 0.0]
+        return entry
+
+    def _wrap_parse(self, parse):
+        depth, stack, anonymous = self._depth, self._stack, self.anonymous
+
+        def profile_parse(element, string, start, do_actions=True):
+            name = element.parser_name
+            if not name:
+                if not anonymous:
+                    return parse(element, string, start, do_actions)
+                name = f"<{element.__class__.__name__}>"
+            entry = self._entry(name)
+            entry[0] += 1
+            depth[name] = depth.get(name, 0) + 1
+            stack.append(0.0)
+            begin = perf_counter()
+            try:
+                result = parse(element, string, start, do_actions)
+                entry[1] += 1
+                return result
+            except ParseException:
+                entry[2] += 1
+                raise
+            finally:
+                duration = perf_counter() - begin
+                entry[4] += duration - stack.pop()
+                if stack:
+                    stack[-1] += duration
+                depth[name] -= 1
+                if not depth[name]:
+                    entry[3] += duration
+
+        return profile_parse
+
+    def _wrap_skip(self, skip):
+        stack = self._stack
+        entry = self._entry(WHITESPACE)
+
+        def profile_skip(whitespace, string, start):
+            begin = perf_counter()
+            try:
+                return skip(whitespace, string, start)
+            finally:
+                duration = perf_counter() - begin
+                entry[0] += 1
+                entry[1] += 1
+                entry[3] += duration
+                entry[4] += duration
+                if stack:
+                    stack[-1] += duration
+
+        return profile_skip
+
+    def to_dict(self):
+        """
+        :return: MAP FROM NAME TO {attempts, successes, failures, time, self}
+        """
+        return {name: dict(zip(COLUMNS, entry)) for name, entry in self.stats.items()}
+
+    def report(self, sort="self", limit=None):
+        """
+        :param sort: COLUMN TO SORT BY, LARGEST FIRST
+        :param limit: MAXIMUM NUMBER OF ROWS
+        :return: TEXT TABLE
+        """
+        column = COLUMNS.index(sort)
+        rows = sorted(self.stats.items(), key=lambda item: -item[1][column])[:limit]
+        width = max([len(name) for name, _ in rows] + [4])
+        lines = [
+            f"{'name':<{width}} {'attempts':>9} {'successes':>9} {'failures':>9}"
+            f" {'time':>9} {'self':>9}"
+        ]
+        for name, (attempts, successes, failures, time, self_time) in rows:
+            lines.append(
+                f"{name:<{width}} {attempts:9} {successes:9} {failures:9}"
+                f" {time:9.4f} {self_time:9.4f}"
+            )
+        return "\n".join(lines)
+
+
+def _install():
+    """
+    PATCH THE PARSER WITH EVERY ACTIVE PROFILE; CALLED WITH _lock HELD
+    """
+    parse, skip = _original
+    for profile in _active:
+        parse, skip = profile._wrap_parse(parse), profile._wrap_skip(skip)
+    ParserElement._parse, Whitespace.skip = parse, skip
@@ -6,12 +6,14 @@
 #
 # Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
 #
+import re
 
 from mo_dots import is_null, Data, from_data
 from mo_future import text, number_types, binary_type
 
 from mo_parsing import *
 from mo_parsing.utils import listwrap
+from terraform_parser.lexer import is_keyword
 
 
 class Call(object):
@@ -25,9 +27,23 @@ class Call(object):
     def __str__(self):
         return f"{self.op}({self.args}, {self.kwargs})"
 
+    def __reduce__(self):
+        if self is SQL_NULL:
+            # PICKLE BY NAME, SO THE SINGLETON SURVIVES CACHES AND PROCESS POOLS
+            return "SQL_NULL"
+        return Call, (self.op, self.args, self.kwargs)
+
 
 SQL_NULL = Call("null", [], {})
-null_locations = []
+
+
+class Template(dict):
+    """
+    A STRING TEMPLATE, {"concat": parts}.  EQUAL TO, AND WRITTEN AS, THE PLAIN
+    dict, BUT TELLS "${a}${b}" FROM concat(a, b), WHICH parse() WRITES THE SAME
+    """
+
+    __slots__ = []
 
 
 def simple_op(op, args, kwargs):
@@ -51,7 +67,23 @@ def normal_op(op, args, kwargs):
 scrub_op = simple_op
 
 
-def scrub(result):
+def collapse(values):
+    """
+    SAME RULE scrub() USES FOR LISTS: NONE, THE ONLY VALUE, OR ALL VALUES
+    """
+    if not values:
+        return None
+    elif len(values) == 1:
+        return values[0]
+    return values
+
+
+def scrub(result, null_locations=None):
+    """
+    CONVERT ParseResults TO JSON-LIKE STRUCTURE
+    :param result: WHAT TO SCRUB
+    :param null_locations: OPTIONAL LIST, TO COLLECT (container, key) OF EVERY SQL_NULL
+    """
     if result is SQL_NULL:
         return SQL_NULL
     elif result == None:
@@ -63,24 +95,25 @@ def scrub(result):
     elif isinstance(result, number_types):
         return result
     elif isinstance(result, Call):
-        kwargs = scrub(result.kwargs)
-        args = scrub(result.args)
-        if args is SQL_NULL:
+        kwargs = scrub(result.kwargs, null_locations)
+        args = scrub(result.args, null_locations)
+        if args is SQL_NULL and null_locations is not None:
             null_locations.append((kwargs, result.op))
         return scrub_op(result.op, args, kwargs)
     elif isinstance(result, dict) and not result:
         return result
     elif isinstance(result, list):
-        output = [rr for r in result for rr in [scrub(r)]]
+        output = [rr for r in result for rr in [scrub(r, null_locations)]]
 
         if not output:
             return None
         elif len(output) == 1:
             return output[0]
         else:
-            for i, v in enumerate(output):
-                if v is SQL_NULL:
-                    null_locations.append((output, i))
+            if null_locations is not None:
+                for i, v in enumerate(output):
+                    if v is SQL_NULL:
+                        null_locations.append((output, i))
             return output
     else:
         # ATTEMPT A DICT INTERPRETATION
@@ -88,13 +121,160 @@ def scrub(result):
             kv_pairs = list(result.items())
         except Exception as c:
             print(c)
-        output = {k: vv for k, v in kv_pairs for vv in [scrub(v)] if not is_null(vv)}
+        output = {
+            k: vv
+            for k, v in kv_pairs
+            for vv in [scrub(v, null_locations)]
+            if not is_null(vv)
+        }
+        if isinstance(result, Template):
+            output = Template(output)
         if isinstance(result, dict) or output:
-            for k, v in output.items():
-                if v is SQL_NULL:
-                    null_locations.append((output, k))
+            if null_locations is not None:
+                for k, v in output.items():
+                    if v is SQL_NULL:
+                        null_locations.append((output, k))
             return output
-        return scrub(list(result))
+        return scrub(list(result), null_locations)
+
+
+class Heredoc(Token):
+    """
+    MATCH THE REST OF A HEREDOC, STARTING AT ITS TERMINATOR (eg EOF)
+    THE TOKEN IS THE CONTENT UP TO THE FIRST OCCURRENCE OF THAT TERMINATOR.
+    THE TERMINATOR IS LOCAL TO THIS MATCH, SO PARSING IS REENTRANT
+    """
+
+    __slots__ = []
+
+    def parse_impl(self, string, start, do_actions=True):
+        eol = string.find("\n", start)
+        if eol == -1:
+            raise ParseException(self, start, string)
+        eod = string[start:eol]
+        if not eod:
+            raise ParseException(self, start, string)
+        end = string.find(eod, eol)
+        if end == -1:
+            raise ParseException(self, start, string)
+        return ParseResults(self, start, end + len(eod), [string[eol:end]], [])
+
+    def min_length(self):
+        return 2
+
+
+class Name(Token):
+    """
+    MATCH AN IDENTIFIER THAT IS NOT A KEYWORD
+    THE KEYWORD CHECK IS A SET LOOKUP, NOT A TRIAL PARSE OF EVERY KEYWORD
+    """
+
+    __slots__ = []
+    pattern = re.compile(r"[\w](\[\d+\]|[-\w])*")
+
+    def parse_impl(self, string, start, do_actions=True):
+        found = self.pattern.match(string, start)
+        if not found or is_keyword(found.group()):
+            raise ParseException(self, start, string)
+        return ParseResults(self, start, found.end(), [found.group()], [])
+
+    def min_length(self):
+        return 1
+
+
+class Dispatch(ParseExpression):
+    """
+    ORDERED ALTERNATION THAT ONLY TRIES THE ALTERNATIVES THAT CAN START WITH
+    THE NEXT CHARACTER (LIKE MatchFirst, WITHOUT THE FAILED ATTEMPTS)
+
+        Dispatch([
+            ('"', string),
+            ("[a-z]", call, "[a-z]+[(]"),  # OPTIONAL LOOKAHEAD, CHECKED BEFORE TRYING call
+            ("[a-z]", path),
+        ])
+
+    THE FIRST CHARACTER PATTERN, AND THE LOOKAHEAD, MUST BE TRUE FOR EVERY
+    MATCH OF THE ALTERNATIVE, OR IT WILL BE MISSED
+    """
+
+    __slots__ = ["firsts", "lookaheads", "lookup"]
+
+    def __init__(self, alternatives):
+        """
+        :param alternatives: LIST OF (first, expr) OR (first, expr, lookahead)
+        """
+        ParseExpression.__init__(self, [a[1] for a in alternatives])
+        self.firsts = [re.compile(a[0]) for a in alternatives]
+        self.lookaheads = [
+            re.compile(a[2]) if len(a) > 2 else None for a in alternatives
+        ]
+        self.lookup = {}  # MAP FROM CHARACTER TO LIST OF (lookahead, expr)
+
+    def copy(self):
+        output = ParseExpression.copy(self)
+        output.firsts = self.firsts
+        output.lookaheads = self.lookaheads
+        output.lookup = {}
+        return output
+
+    def streamline(self):
+        # NO FLATTENING, exprs MUST STAY ALIGNED WITH firsts AND lookaheads
+        if self.streamlined:
+            return self
+        exprs = [e.streamline() for e in self.exprs]
+        output = self
+        if any(a is not b for a, b in zip(exprs, self.exprs)):
+            output = self.copy()
+            output.exprs = exprs
+        output.streamlined = True
+        return output
+
+    def check_recursion(self, seen=()):
+        seen = seen + (self,)
+        for e in self.exprs:
+            e.check_recursion(seen)
+
+    def expecting(self):
+        # NOT A SET OF LITERALS; KEEP MatchFirst FROM REPLACING THIS WITH ITS OWN LOOKUP
+        return {}
+
+    def _min_length(self):
+        return min(e.min_length() for e in self.exprs)
+
+    @property
+    def whitespace(self):
+        return [e.whitespace for e in self.exprs]
+
+    def candidates(self, char):
+        """
+        :return: LIST OF (lookahead, expr) THAT CAN START WITH char
+        """
+        found = self.lookup.get(char)
+        if found is None:
+            found = self.lookup[char] = [
+                (lookahead, e)
+                for first, lookahead, e in zip(self.firsts, self.lookaheads, self.exprs)
+                if char and first.match(char)
+            ]
+        return found
+
+    def parse_impl(self, string, start, do_actions=True):
+        failures = []
+        for lookahead, e in self.candidates(string[start : start + 1]):
+            if lookahead and not lookahead.match(string, start):
+                continue
+            try:
+                result = e._parse(string, start, do_actions)
+                failures.extend(result.failures)
+                return ParseResults(self, result.start, result.end, [result], failures)
+            except ParseException as cause:
+                failures.append(cause)
+        raise ParseException(self, start, string, cause=failures)
+
+    def __str__(self):
+        if self.parser_name:
+            return self.parser_name
+        return " | ".join("{" + text(e) + "}" for e in self.exprs)
 
 
 def keyword(keywords):
@@ -0,0 +1,604 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import io
+import json
+import re
+
+from terraform_parser.utils import SQL_NULL
+
+INDENT = "  "
+
+# BINARY OPERATORS, AND HOW TIGHTLY THEY BIND (SAME ORDER AS keywords.KNOWN_OPS)
+BINARY_OPS = {
+    "mul": ("*", 9),
+    "div": ("/", 9),
+    "mod": ("%", 9),
+    "add": ("+", 8),
+    "sub": ("-", 8),
+    "lt": ("<", 7),
+    "lte": ("<=", 7),
+    "gt": (">", 7),
+    "gte": (">=", 7),
+    "eq": ("==", 6),
+    "neq": ("!=", 6),
+    "and": ("&&", 3),
+    "or": ("||", 2),
+}
+UNARY_OPS = {"neg": ("-", 10), "pos": ("+", 10), "not": ("!", 4)}
+TERNARY = 5
+ATOM = 12
+
+# SINGLE-KEY DICTS THAT ARE EXPRESSIONS, NOT OBJECTS
+EXPRESSIONS = {
+    "literal",
+    "concat",
+    "case",
+    "object",
+    "get",
+    "from",
+    "list",
+    "missing",
+    "exists",
+    "if_then_else",
+    *BINARY_OPS,
+    *UNARY_OPS,
+}
+
+# TYPE CONSTRAINTS (eg list(string)) WITH ONE ARGUMENT, NEVER EXPANDED
+TYPES = {"list", "map", "set", "object", "tuple"}
+
+# TERRAFORM BUILT-IN FUNCTIONS: {name: args} IS A CALL, NOT AN OBJECT
+FUNCTIONS = set(
+    """
+    abs ceil floor log max min parseint pow signum chomp format formatlist indent
+    join lower regex regexall replace split strrev substr title trim trimprefix
+    trimsuffix trimspace upper alltrue anytrue chunklist coalesce coalescelist
+    compact concat contains distinct element flatten index keys length list
+    lookup map matchkeys merge one range reverse setintersection setproduct
+    setsubtract setunion slice sort sum transpose values zipmap base64decode
+    base64encode base64gzip csvdecode jsondecode jsonencode textdecodebase64
+    textencodebase64 urlencode yamldecode yamlencode abspath dirname pathexpand
+    basename file fileexists fileset filebase64 templatefile formatdate timeadd
+    timestamp base64sha256 base64sha512 bcrypt filebase64sha256 filebase64sha512
+    filemd5 filesha1 filesha256 filesha512 md5 rsadecrypt sha1 sha256 sha512
+    uuid uuidv5 cidrhost cidrnetmask cidrsubnet cidrsubnets can nonsensitive
+    sensitive tobool tolist tomap tonumber toset tostring try type
+    """.split()
+)
+
+# BLOCK KIND (AS SEEN IN parse() OUTPUT) TO (KEYWORD, NUMBER OF LABELS)
+BLOCKS = {
+    "data": ("data", 2),
+    "var": ("variable", 1),
+    "output": ("output", 1),
+    "provider": ("provider", 1),
+    "local": ("locals", 0),
+    "terraform": ("terraform", 0),
+}
+# KEYWORD TO (KIND, NUMBER OF LABELS)
+KEYWORDS = {
+    "resource": (None, 2),
+    "module": (None, 1),
+    **{keyword: (kind, num_labels) for kind, (keyword, num_labels) in BLOCKS.items()},
+}
+SUB_RESOURCES = {"provisioner", "backend"}
+
+# KEYWORD TO THE PREFIX OF ITS TERRAFORM ADDRESS (resource HAS NONE)
+PREFIX = {"data": "data", "module": "module", "variable": "var", "locals": "local"}
+
+_identifier = re.compile(r"[\w](\[\d+\]|[-\w])*$")
+_terminator = "EOF"
+# A HEREDOC ENDS WITH A NEWLINE, AND THE INDENT BEFORE ITS TERMINATOR
+_heredoc_end = re.compile(r"\n[ \t]*$")
+
+
+def to_hcl(result):
+    """
+    parse() LOSES SOME DISTINCTIONS, SO THE TEXT IS CANONICAL, NOT THE ORIGINAL:
+    NESTED BLOCKS ARE WRITTEN AS `name = {...}`, AND AN ATTRIBUTE WITH AN
+    EMPTY OBJECT (WHICH parse() RETURNS AS A NAMELESS {}) IS NOT WRITTEN AT ALL
+
+    :param result: WHAT parse() RETURNS
+    :return: HCL2 TEXT THAT parse()S BACK TO result
+    """
+    file = io.StringIO()
+    write(result, file)
+    return file.getvalue()
+
+
+def write(result, file):
+    """
+    WRITE result (WHAT parse() RETURNS) TO file AS HCL2, ONE BLOCK AT A TIME
+    """
+    for i, (keyword, labels, body) in enumerate(iter_blocks(result)):
+        if i:
+            file.write("\n")
+        file.write(keyword)
+        for label in labels:
+            file.write(f" {_string(label)}")
+        file.write(" ")
+        _object(body, "", file)
+        file.write("\n")
+
+
+def iter_blocks(result):
+    """
+    :param result: WHAT parse() RETURNS
+    :return: GENERATOR OF (keyword, labels, body) FOR EACH BLOCK, eg
+             ("resource", ("aws_s3_bucket", "logs"), body)
+    """
+    if result is None:
+        return
+    for block in result if isinstance(result, list) else [result]:
+        for kind, value in block.items():
+            keyword, num_labels = BLOCKS.get(kind, (None, None))
+            if keyword is None:
+                keyword = "resource" if _is_resource(value) else "module"
+                num_labels, value = KEYWORDS[keyword][1], {kind: value}
+            yield from _labelled(keyword, num_labels, (), value)
+
+
+def _labelled(keyword, num_labels, labels, value):
+    if num_labels == 1 and _is_label(value):
+        # A BLOCK WITH AN EMPTY BODY IS PARSED AS {"literal": label}
+        yield keyword, labels + (value["literal"],), {}
+    elif not num_labels:
+        yield keyword, labels, value
+    else:
+        for label, inner in pairs(value):
+            yield from _labelled(keyword, num_labels - 1, labels + (label,), inner)
+
+
+def make_block(keyword, labels, body):
+    """
+    THE INVERSE OF iter_blocks()
+    :param body: A dict, OR LIST OF SINGLE-KEY dicts
+    :return: THE BLOCK, AS parse() WOULD RETURN IT
+    """
+    kind, _ = KEYWORDS[keyword]
+    if labels and not body:
+        *labels, last = labels
+        value = {"literal": last}
+    else:
+        value = body
+    for label in reversed(labels):
+        value = {label: value}
+    if kind is None:
+        # resource AND module ARE NOT WRAPPED IN THEIR KIND
+        return value
+    return {kind: value}
+
+
+def address(keyword, labels):
+    """
+    :return: TERRAFORM ADDRESS OF A BLOCK, eg aws_s3_bucket.logs, data.aws_vpc.this, var.x
+    """
+    if keyword == "resource":
+        return ".".join(labels)
+    return ".".join([PREFIX.get(keyword, keyword), *labels])
+
+
+def _is_resource(value):
+    """
+    resource "type" "name" {body} IS {type: {name: body}}, BUT
+    module "name" {body} IS {name: body}
+    """
+    if _is_label(value):
+        # resource "type" "name" {}
+        return True
+    if not isinstance(value, dict) or len(value) != 1:
+        return False
+    ((name, body),) = value.items()
+    if _is_label(body):
+        # module "name" {source = "..."} LOOKS THE SAME AS AN EMPTY resource
+        return name != "source"
+    if isinstance(body, list) and all(isinstance(v, dict) and len(v) == 1 for v in body):
+        # A BODY MAY HAVE ATTRIBUTES NAMED LIKE OPERATORS (eg not), SO LONG AS
+        # SOME ARE NOT; A LIST OF ONLY OPERATORS IS A TUPLE OF EXPRESSIONS
+        return not all(k in EXPRESSIONS or k in FUNCTIONS for v in body for k in v)
+    return is_object(body)
+
+
+def _is_label(value):
+    return isinstance(value, dict) and len(value) == 1 and isinstance(value.get("literal"), str)
+
+
+def pairs(value):
+    """
+    :return: THE (key, value) OF A dict, OR OF A LIST OF SINGLE-KEY dicts
+    """
+    if isinstance(value, dict):
+        return list(value.items())
+    return [(k, v) for item in value for k, v in item.items()]
+
+
+def is_object(value):
+    """
+    :return: True IF value IS AN OBJECT (NOT AN EXPRESSION) IN parse() OUTPUT
+    """
+    if isinstance(value, dict):
+        if len(value) != 1:
+            return not value
+        (key,) = value
+        return key not in EXPRESSIONS and key not in FUNCTIONS
+    if isinstance(value, list):
+        # AN ATTRIBUTE NAMED LIKE A FUNCTION (eg values) IS FINE, SO LONG AS
+        # ANOTHER IS NOT
+        if not all(isinstance(v, dict) and len(v) <= 1 for v in value):
+            return False
+        keys = [k for v in value for k in v]
+        return (
+            bool(keys)
+            and not any(k in EXPRESSIONS for k in keys)
+            and not all(k in FUNCTIONS for k in keys)
+        )
+    return False
+
+
+def _object(value, indent, file):
+    """
+    WRITE value (A dict, OR LIST OF SINGLE-KEY dicts) AS A BRACED BODY
+    """
+    items = pairs(value) if value else []
+    if not items:
+        file.write("{}")
+        return
+    inner = indent + INDENT
+    file.write("{\n")
+    for (key, val), width in zip(items, _widths(items)):
+        _attribute(key, val, inner, width, file)
+    file.write(indent)
+    file.write("}")
+
+
+def _widths(pairs):
+    """
+    ALIGN THE = OF CONSECUTIVE SIMPLE ATTRIBUTES, LIKE terraform fmt
+    :return: KEY WIDTH FOR EACH PAIR
+    """
+    widths = []
+    run = []
+    for key, value in pairs:
+        if _is_block(key, value) or is_object(value):
+            widths.extend([max(run, default=0)] * len(run))
+            widths.append(0)
+            run = []
+        else:
+            run.append(len(_key(key)))
+    widths.extend([max(run, default=0)] * len(run))
+    return widths
+
+
+def _is_block(key, value):
+    return (
+        key in SUB_RESOURCES
+        and isinstance(value, dict)
+        and len(value) == 1
+        and is_object(next(iter(value.values())))
+    )
+
+
+def _attribute(key, value, indent, width, file):
+    file.write(indent)
+    if _is_block(key, value):
+        ((label, body),) = value.items()
+        file.write(f"{key} {_string(label)} ")
+        _object(body, indent, file)
+    elif is_object(value):
+        file.write(f"{_key(key)} = ")
+        _object(value, indent, file)
+    else:
+        file.write(_key(key).ljust(width))
+        file.write(" = ")
+        file.write(_expression(value, indent))
+    file.write("\n")
+
+
+def _key(key):
+    return key if _identifier.match(key) else _string(key)
+
+
+def _string(text):
+    return _escape(json.dumps(text, ensure_ascii=False))
+
+
+def _escape(text):
+    return text.replace("${", "$${").replace("%{", "%%{")
+
+
+def _expression(value, indent, level=0):
+    """
+    :param level: HOW TIGHTLY THE SURROUNDING OPERATOR BINDS; value IS
+                  PARENTHESIZED IF IT BINDS LESS TIGHTLY
+    :return: value AS AN HCL EXPRESSION
+    """
+    text, binds = _expression_binds(value, indent)
+    return f"({text})" if binds < level else text
+
+
+def _expression_binds(value, indent):
+    """
+    :return: (TEXT, HOW TIGHTLY IT BINDS)
+    """
+    if value is SQL_NULL or value is None:
+        return "null", ATOM
+    elif value is True:
+        return "true", ATOM
+    elif value is False:
+        return "false", ATOM
+    elif isinstance(value, str):
+        return value, ATOM
+    elif isinstance(value, int):
+        return str(value), (UNARY_OPS["neg"][1] if value < 0 else ATOM)
+    elif isinstance(value, float):
+        text = repr(value)
+        if "." not in text:
+            mantissa, _, exponent = text.partition("e")
+            text = f"{mantissa}.0" + (f"e{exponent}" if exponent else "")
+        return text, (UNARY_OPS["neg"][1] if value < 0 else ATOM)
+    elif is_object(value):
+        file = io.StringIO()
+        _object(value, indent, file)
+        return file.getvalue(), ATOM
+    elif isinstance(value, list):
+        return _tuple(value, indent), ATOM
+    elif not isinstance(value, dict):
+        raise TypeError(f"can not write {value.__class__.__name__}")
+    elif is_for(value.get("from")):
+        return _for_tuple(value, indent), ATOM
+    elif "from" in value and set(value) <= {"from", "select"}:
+        return _splat(value, indent), ATOM
+    elif len(value) != 1:
+        file = io.StringIO()
+        _object(value, indent, file)
+        return file.getvalue(), ATOM
+
+    ((op, args),) = value.items()
+    if op == "literal":
+        return _literal(args, indent), ATOM
+    elif op == "concat":
+        return _concat(args, indent), ATOM
+    elif op == "case":
+        return _template([value], indent), ATOM
+    elif op == "object":
+        if isinstance(args, dict) and {"from", "groupby", "select"} <= set(args):
+            return _for_object(args, indent), ATOM
+        # THE object({a = string}) TYPE, WITH ONE OBJECT ARGUMENT
+        return _call(op, [args], indent), ATOM
+    elif op == "get":
+        expr, *offsets = args
+        if isinstance(expr, dict) and len(expr) == 1 and next(iter(expr)) not in EXPRESSIONS:
+            # f(1).bar, FOR ANY f, NOT ONLY THE KNOWN FUNCTIONS
+            ((name, params),) = expr.items()
+            text = _call(name, params, indent)
+        else:
+            text = _expression(expr, indent, ATOM)
+        if isinstance(expr, str):
+            # x.y IS A PATH, NOT A get; KEEP IT A get
+            if offsets and isinstance(offsets[0], int):
+                text = f"({text})"
+        for offset in offsets:
+            name = offset.get("literal") if isinstance(offset, dict) else None
+            if not isinstance(expr, str) and isinstance(name, str) and _identifier.match(name):
+                text += f".{name}"
+            else:
+                text += f"[{_expression(offset, indent)}]"
+        return text, ATOM
+    elif op == "list":
+        # x... IS ONLY MEANINGFUL AS THE LAST ARGUMENT OF A CALL, SEE _call()
+        return _call(op, [args], indent), ATOM
+    elif op in ("missing", "exists"):
+        binds = BINARY_OPS["eq"][1]
+        symbol = "==" if op == "missing" else "!="
+        return f"{_expression(args, indent, binds + 1)} {symbol} null", binds
+    elif op == "if_then_else":
+        when, then, otherwise = args
+        return (
+            f"{_expression(when, indent, TERNARY + 1)}"
+            f" ? {_expression(then, indent, TERNARY + 1)}"
+            f" : {_expression(otherwise, indent, TERNARY + 1)}"
+        ), TERNARY
+    elif op in UNARY_OPS:
+        symbol, binds = UNARY_OPS[op]
+        return f"{symbol}{_expression(args, indent, binds)}", binds
+    elif op in BINARY_OPS and isinstance(args, list) and len(args) == 2:
+        symbol, binds = BINARY_OPS[op]
+        left, right = args
+        return (
+            f"{_expression(left, indent, binds)} {symbol} {_expression(right, indent, binds + 1)}",
+            binds,
+        )
+    return _call(op, args, indent), ATOM
+
+
+def _call(name, args, indent):
+    params = args if isinstance(args, list) else [args]
+    items = [_expression(p, indent) for p in params]
+    last = params[-1] if params else None
+    if isinstance(last, dict) and set(last) == {"list"} and not (name in TYPES and len(params) == 1):
+        # f(a, b...) IS {"f": [a, {"list": b}]}
+        items[-1] = f"{_expression(last['list'], indent, ATOM)}..."
+    return f"{name}({', '.join(items)})"
+
+
+def _tuple(values, indent):
+    items = [_expression(v, indent + INDENT) for v in values]
+    if sum(len(i) for i in items) < 80 and not any("\n" in i for i in items):
+        return f"[{', '.join(items)}]"
+    inner = indent + INDENT
+    return "[\n" + "".join(f"{inner}{i},\n" for i in items) + f"{indent}]"
+
+
+def is_for(value):
+    """
+    :return: True IF value IS THE for PREAMBLE: {"select": names, "from": collection}
+    """
+    if not isinstance(value, dict) or set(value) != {"select", "from"}:
+        return False
+    names = value["select"]
+    names = names if isinstance(names, list) else [names]
+    return all(isinstance(n, dict) and "name" in n for n in names)
+
+
+def _preamble(value, indent):
+    names = value["select"]
+    names = names if isinstance(names, list) else [names]
+    return f"for {', '.join(n['name'] for n in names)} in {_expression(value['from'], indent)} :"
+
+
+def _for_tuple(value, indent):
+    text = f"[{_preamble(value['from'], indent)} {_expression(value['select']['value'], indent)}"
+    if "where" in value:
+        text += f" if {_expression(value['where'], indent)}"
+    return text + "]"
+
+
+def _for_object(value, indent):
+    select = value["select"]
+    if isinstance(select, dict) and set(select) == {"list"}:
+        # k => v... GROUPS THE VALUES OF EACH k
+        select = f"{_expression(select['list'], indent, ATOM)}..."
+    else:
+        select = _expression(select, indent)
+    text = (
+        f"{{{_preamble(value['from'], indent)}"
+        f" {_expression(value['groupby'], indent)} => {select}"
+    )
+    if "where" in value:
+        text += f" if {_expression(value['where'], indent)}"
+    return text + "}"
+
+
+def _splat(value, indent):
+    text = f"{_expression(value['from'], indent, ATOM)}[*]"
+    select = value.get("select")
+    if select:
+        text += "." + select["value"]
+    return text
+
+
+def _literal(text, indent):
+    if _is_heredoc(text, text):
+        terminator = _heredoc_terminator(text)
+        if terminator:
+            return f"<<{terminator}{_escape(text)}{terminator}"
+    return _string(text)
+
+
+def _is_heredoc(first, last):
+    """
+    :return: True IF A TEXT STARTING WITH first AND ENDING WITH last CAN BE A HEREDOC
+    """
+    return first.startswith("\n") and bool(_heredoc_end.search(last))
+
+
+def _heredoc_terminator(text):
+    for i in range(10):
+        terminator = _terminator + (str(i) if i else "")
+        if terminator not in text:
+            return terminator
+    return None
+
+
+def _concat(parts, indent):
+    parts = parts if isinstance(parts, list) else [parts]
+    literals = [p["literal"] for p in parts if isinstance(p, dict) and set(p) == {"literal"}]
+    directives = [p for p in parts if _is_directive(p) or _cases(p)]
+    if (
+        not (literals or directives)
+        or any(isinstance(p, list) and not _cases(p) for p in parts)
+        or any(l.endswith(("$", "%")) for l in literals)
+    ):
+        # NOT A STRING TEMPLATE, OR ONE THAT CAN NOT BE WRITTEN AS ONE
+        return f"concat({', '.join(_expression(p, indent) for p in parts)})"
+    return _template(parts, indent)
+
+
+def _cases(part):
+    """
+    parse() GIVES AN %{if} THAT IS THE WHOLE TEMPLATE AS {"case": cases}, BUT
+    ONE AMONG OTHER PARTS AS {"when": c, "then": t}, OR, WITH AN %{else}, AS
+    [{"when": c, "then": t}, otherwise]
+    :return: THE cases OF part, IF IT IS AN %{if}, ELSE None
+    """
+    if isinstance(part, dict) and set(part) == {"case"}:
+        cases = part["case"]
+        return cases if isinstance(cases, list) else [cases]
+    elif _is_when(part):
+        return [part]
+    elif isinstance(part, list) and part and _is_when(part[0]):
+        return part
+    return None
+
+
+def _is_when(part):
+    return isinstance(part, dict) and set(part) == {"when", "then"}
+
+
+def _is_directive(part):
+    """
+    :return: True IF part IS A %{for} WITH A TEMPLATE BODY
+    """
+    if not isinstance(part, dict) or not is_for(part.get("from")):
+        return False
+    body = part.get("select", {}).get("value")
+    return isinstance(body, dict) and len(body) == 1 and ("literal" in body or "concat" in body)
+
+
+def _template(parts, indent):
+    """
+    :return: parts AS A STRING TEMPLATE, OR HEREDOC IF MULTILINE
+    """
+    first, last = parts[0], parts[-1]
+    if (
+        isinstance(first, dict)
+        and isinstance(last, dict)
+        and _is_heredoc(first.get("literal", ""), last.get("literal", ""))
+    ):
+        body = _template_body(parts, indent, heredoc=True)
+        terminator = _heredoc_terminator(body)
+        if terminator:
+            return f"<<{terminator}{body}{terminator}"
+    return '"' + _template_body(parts, indent, heredoc=False) + '"'
+
+
+def _template_body(parts, indent, heredoc):
+    output = []
+    for part in parts:
+        if isinstance(part, dict) and set(part) == {"literal"}:
+            text = part["literal"]
+            output.append(_escape(text if heredoc else json.dumps(text, ensure_ascii=False)[1:-1]))
+        elif _cases(part):
+            for case in _cases(part):
+                if isinstance(case, dict) and "when" in case:
+                    output.append(f"%{{if {_expression(case['when'], indent)}}}")
+                    output.append(_template_body(_parts(case.get("then")), indent, heredoc))
+                else:
+                    output.append("%{else}")
+                    output.append(_template_body(_parts(case), indent, heredoc))
+            output.append("%{endif}")
+        elif isinstance(part, dict) and is_for(part.get("from")) and "select" in part:
+            output.append(f"%{{{_preamble(part['from'], indent)[:-2]}}}")
+            output.append(_template_body(_parts(part["select"]["value"]), indent, heredoc))
+            output.append("%{endfor}")
+        else:
+            output.append(f"${{{_expression(part, indent)}}}")
+    return "".join(output)
+
+
+def _parts(template):
+    """
+    :return: THE PARTS OF A TEMPLATE (A LITERAL, A concat, OR AN EXPRESSION)
+    """
+    if template is None:
+        return []
+    if isinstance(template, dict) and set(template) == {"concat"}:
+        parts = template["concat"]
+        return parts if isinstance(parts, list) else [parts]
+    return [template]
@@ -0,0 +1,58 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+COLUMNAR MEMORY BENCHMARK
+
+    python -m tests.benchmarks.columnar [directory]
+
+MEMORY HELD BY THE parse() RESULTS OF EVERY FILE, AS NESTED PYTHON
+OBJECTS, AND AS A frozen Corpus
+"""
+import pickle
+import sys
+import tracemalloc
+
+from terraform_parser.columnar import Corpus
+from terraform_parser.parallel import find_files, parse_files
+
+
+def held(build):
+    """
+    :return: (value, BYTES STILL ALLOCATED AFTER build() RETURNS)
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        return value, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main(directory="tests/examples"):
+    results = {p.path: p.result for p in parse_files(find_files(directory), jobs=1) if not p.error}
+    # UNPICKLE, SO THE NESTED OBJECTS ARE NOT SHARING ANYTHING WITH THE PARSER
+    blob = pickle.dumps(results)
+    nested, nested_size = held(lambda: pickle.loads(blob))
+
+    def build():
+        corpus = Corpus()
+        for path, result in nested.items():
+            corpus.add(path, result)
+        corpus.freeze()
+        return corpus
+
+    corpus, corpus_size = held(build)
+    print(f"{len(results)} files, {len(corpus)} nodes")
+    print(f"  nested: {nested_size / 1024:8.0f}KB")
+    print(f"columnar: {corpus_size / 1024:8.0f}KB  ({nested_size / corpus_size:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,47 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+DIAGRAM BENCHMARK
+
+    python -m tests.benchmarks.diagram
+
+DOT FOR LARGER AND LARGER GRAPHS (SEE tests.benchmarks.graph), AND THE
+Graphviz LAYOUT, IF dot IS INSTALLED
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from terraform_parser.diagram import to_dot, render
+from terraform_parser.graph import DependencyGraph
+from tests.benchmarks.graph import result
+
+
+def main():
+    for files in (100, 1000, 5000):
+        graph = DependencyGraph()
+        for n in range(files):
+            graph.update(f"module{n % 20}/{n}.tf", result(n))
+
+        start = time.perf_counter()
+        dot = to_dot(graph)
+        dot_time = time.perf_counter() - start
+        line = f"{len(graph):6} nodes: dot {dot_time:6.3f}s ({dot.count(chr(10))} lines)"
+
+        if shutil.which("dot"):
+            with tempfile.TemporaryDirectory() as directory:
+                start = time.perf_counter()
+                render(dot, os.path.join(directory, "diagram.svg"))
+                line += f"  layout {time.perf_counter() - start:6.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+EVALUATION BENCHMARK
+
+    python -m tests.benchmarks.evaluate
+
+EVALUATE THOUSANDS OF locals UNDER MANY VARIABLE SETS (ONE PER ENVIRONMENT),
+COMPILING THEM FOR EVERY ENVIRONMENT (AS A TREE-WALKING INTERPRETER WOULD
+WALK THEM), AND COMPILING THEM ONCE
+"""
+from terraform_parser import parse
+from terraform_parser.evaluate import Evaluator
+from tests.benchmarks.suite import best
+
+ENVIRONMENTS = [
+    {"env": env, "size": size, "zones": [f"{env}-{z}" for z in "abc"], "tags": {"team": "web"}}
+    for env, size in (("dev", 1), ("test", 2), ("stage", 3), ("prod", 5))
+] * 25
+
+
+def locals_source(n):
+    lines = ["locals {", "  l0 = var.size"]
+    for i in range(1, n):
+        previous = f"local.l{max(0, i - 1 - i % 3)}"
+        lines.append([
+            f"  l{i} = {previous} * 2 + {i} > 100 ? {previous} % 97 : {previous} + var.size",
+            f'  l{i} = "${{var.env}}-{i}" == "prod-{i}" ? {previous} : {previous} + 1',
+            f"  l{i} = length(var.zones) + {previous}",
+            f'  l{i} = merge(var.tags, {{n = "{i}"}}) == {{}} ? 0 : {previous} - 1',
+        ][i % 4])
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    for n in (100, 1000, 3000):
+        result = parse(locals_source(n))
+
+        def walk():
+            for variables in ENVIRONMENTS:
+                evaluator = Evaluator()
+                evaluator.add(result)
+                evaluator.scope(variables).to_dict()
+
+        evaluator = Evaluator()
+        evaluator.add(result)
+
+        def compiled():
+            for variables in ENVIRONMENTS:
+                evaluator.scope(variables).to_dict()
+
+        evaluations = n * len(ENVIRONMENTS)
+        walk_time = best(walk)
+        compiled_time = best(compiled)
+        print(
+            f"{n:5} locals x {len(ENVIRONMENTS)} environments:"
+            f"  compile each time {walk_time:7.3f}s ({walk_time / evaluations * 1e6:5.1f}us per local)"
+            f"  compile once {compiled_time:7.3f}s ({compiled_time / evaluations * 1e6:5.1f}us per local)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+SYNTHETIC TERRAFORM
+
+    python -m tests.benchmarks.generate <kind> <n> > example.tf
+
+WHERE kind IS ONE OF resources, nesting, heredoc, operators, conditions, AND n IS HOW
+BIG TO MAKE IT
+"""
+import sys
+
+
+def resources(n):
+    """
+    :return: n RESOURCES, EACH WITH A MIX OF ATTRIBUTES AND A NESTED BLOCK
+    """
+    return "\n".join(
+        f'resource "aws_instance" "r{i}" {{\n'
+        f"  ami           = data.aws_ami.ubuntu.id\n"
+        f'  instance_type = var.large ? "m5.large" : "t3.micro"\n'
+        f"  subnet_id     = aws_subnet.private[{i % 3}].id\n"
+        f"  count         = {i % 4}\n"
+        f"  tags = {{\n"
+        f'    Name = "server-${{count.index}}-{i}"\n'
+        f"    Team = local.team\n"
+        f"  }}\n"
+        f"  ebs_block_device {{\n"
+        f'    device_name = "/dev/sd{chr(ord("f") + i % 5)}"\n'
+        f"    volume_size = {(i % 8 + 1) * 10}\n"
+        f"  }}\n"
+        f"}}\n"
+        for i in range(n)
+    )
+
+
+def nesting(depth):
+    """
+    :return: ONE RESOURCE WITH BLOCKS NESTED depth DEEP
+    """
+    lines = ['resource "aws_wafv2_web_acl" "deep" {']
+    for d in range(depth):
+        indent = "  " * (d + 1)
+        lines.append(f"{indent}level{d} {{")
+        lines.append(f"{indent}  name = \"level-{d}\"")
+    for d in reversed(range(depth)):
+        lines.append("  " * (d + 1) + "}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def heredoc(n):
+    """
+    :return: ONE RESOURCE WITH AN n-LINE HEREDOC, ONE INTERPOLATION EVERY FEW LINES
+    """
+    body = "\n".join(
+        f"echo 'step {i} on ${{var.host}}' >> /var/log/setup.log"
+        if i % 5 == 0
+        else f"echo 'step {i}' >> /var/log/setup.log"
+        for i in range(n)
+    )
+    return f'resource "aws_instance" "h" {{\n  user_data = <<EOF\n{body}\nEOF\n}}\n'
+
+
+def operators(n):
+    """
+    :return: locals WITH AN n-TERM ARITHMETIC CHAIN, AND AN n-TERM BOOLEAN CHAIN
+    """
+    ops = ["+", "*", "-", "/"]
+    arithmetic = " ".join(f"var.x{i} {ops[i % 4]}" for i in range(n)) + " 1"
+    logic = " && ".join(f"var.y{i} == {i}" for i in range(n))
+    return f"locals {{\n  a = {arithmetic}\n  b = {logic}\n}}\n"
+
+
+def conditions(n):
+    """
+    :return: locals WITH AN n-DEEP CONDITIONAL CHAIN, OVER NEGATED AND INDEXED OPERANDS
+    """
+    chain = " : ".join(
+        f"(!var.on[{i}] || var.all) && -var.n{i}.size >= {i} ? local.v{i}[*].id"
+        for i in range(n)
+    )
+    return f"locals {{\n  c = {chain} : null\n}}\n"
+
+
+GENERATORS = {
+    "resources": resources,
+    "nesting": nesting,
+    "heredoc": heredoc,
+    "operators": operators,
+    "conditions": conditions,
+}
+
+
+if __name__ == "__main__":
+    kind, n = sys.argv[1:]
+    sys.stdout.write(GENERATORS[kind](int(n)))
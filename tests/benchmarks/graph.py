@@ -0,0 +1,63 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+DEPENDENCY GRAPH BENCHMARK
+
+    python -m tests.benchmarks.graph
+
+BUILD THE GRAPH OF MANY FILES (ALREADY PARSED), THEN TIME THE QUERIES, AND
+REPLACING ONE FILE
+"""
+import time
+
+from terraform_parser.graph import DependencyGraph
+
+PER_FILE = 10
+
+
+def result(n):
+    blocks = [{"var": {f"tags{n}": {"default": {"team": {"literal": "platform"}}}}}]
+    for i in range(PER_FILE):
+        previous = f"aws_instance.i{n}_{i - 1}.id" if i else f"aws_instance.i{n - 1}_0.id"
+        blocks.append({"aws_instance": {f"i{n}_{i}": [
+            {"ami": "data.aws_ami.this.id"},
+            {"subnet_id": {"element": [f"aws_subnet.s{n}.*.id", "count.index"]}},
+            {"tags": {"merge": [f"var.tags{n}", {"previous": previous}]}},
+        ]}})
+    return blocks
+
+
+def timed(action):
+    start = time.perf_counter()
+    value = action()
+    return value, time.perf_counter() - start
+
+
+def main():
+    for files in (100, 1000, 5000):
+        results = [(f"{n}.tf", result(n)) for n in range(files)]
+        graph = DependencyGraph()
+
+        def build():
+            for path, value in results:
+                graph.update(path, value)
+
+        _, build_time = timed(build)
+        closure, closure_time = timed(lambda: graph.closure("aws_instance.i0_0", reverse=True))
+        cycles, cycle_time = timed(graph.cycles)
+        _, update_time = timed(lambda: graph.update(*results[files // 2]))
+        print(
+            f"{len(graph):6} nodes: build {build_time:6.3f}s"
+            f"  impact of one ({len(closure)} nodes) {closure_time * 1000:7.1f}ms"
+            f"  cycles {cycle_time * 1000:7.1f}ms  update one file {update_time * 1000:5.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+HEREDOC BENCHMARK
+
+    python -m tests.benchmarks.heredoc
+
+RESOURCES WITH LARGE HEREDOCS: LITERAL IAM POLICIES, AND user_data
+SCRIPTS WITH A FEW INTERPOLATIONS
+"""
+import json
+import time
+
+from terraform_parser import parse
+
+STATEMENT = {
+    "Effect": "Allow",
+    "Action": ["s3:GetObject", "s3:PutObject", "s3:ListBucket"],
+    "Resource": ["arn:aws:s3:::bucket", "arn:aws:s3:::bucket/*"],
+    "Condition": {"StringEquals": {"aws:PrincipalTag/team": "platform"}},
+}
+
+
+def policy(n):
+    body = json.dumps({"Version": "2012-10-17", "Statement": [STATEMENT] * 20}, indent=2)
+    return f'resource "aws_iam_policy" "p{n}" {{\n  policy = <<EOF\n{body}\nEOF\n}}\n'
+
+
+def user_data(n):
+    lines = "\n".join(f"echo 'step {i}' >> /var/log/setup.log" for i in range(60))
+    return (
+        f'resource "aws_instance" "i{n}" {{\n'
+        f"  user_data = <<-EOT\n"
+        f"    #!/bin/bash\n"
+        f"    export NAME=${{var.name}}-{n}\n"
+        f"{lines}\n"
+        f"    aws s3 cp s3://${{aws_s3_bucket.logs.id}}/setup.sh .\n"
+        f"  EOT\n"
+        f"}}\n"
+    )
+
+
+def generate(n):
+    """
+    :return: n RESOURCES, ALTERNATING POLICY AND user_data
+    """
+    return "".join(policy(i) if i % 2 else user_data(i) for i in range(n))
+
+
+def main(n=40, repeat=5):
+    content = generate(n)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(content)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    print(f"{len(content) / 1024:.0f}KB of heredocs: {best * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
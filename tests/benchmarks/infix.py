@@ -0,0 +1,48 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+EXPRESSION BENCHMARK
+
+    python -m tests.benchmarks.infix
+
+PARSE LONGER AND LONGER EXPRESSIONS WITH mo_parsing's infix_notation (A FLAT
+LIST, REDUCED LEVEL BY LEVEL) AND WITH PRECEDENCE CLIMBING; THE TIME PER
+TERM SHOULD NOT GROW FOR CLIMBING
+"""
+import re
+
+from mo_parsing import infix_notation
+
+from terraform_parser.grammar import multiline_white, compound, expression, precedence
+from tests.benchmarks.generate import operators, conditions
+from tests.benchmarks.suite import best
+
+with multiline_white:
+    flat = infix_notation(compound, precedence).finalize()
+climbing = expression.finalize()
+
+
+def expressions(content):
+    # THE RIGHT SIDE OF EACH local
+    return re.findall(r"^  \w+ = (.*)$", content, re.MULTILINE)
+
+
+def main():
+    for name, generate in (("operators", operators), ("conditions", conditions)):
+        for n in (10, 20, 40, 80, 160):
+            texts = expressions(generate(n))
+            line = f"{name:10} {n:4} terms"
+            for engine_name, engine in (("flat", flat), ("climbing", climbing)):
+                duration = best(lambda: [engine.parse(t, parse_all=True) for t in texts])
+                line += f"  {engine_name} {duration:7.4f}s {duration / n * 1e6:6.0f}us per term"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+MERGE BENCHMARK
+
+    python -m tests.benchmarks.merge
+
+MERGE MORE AND MORE FILES (ALREADY PARSED), HALF OF THEM OVERRIDING
+BLOCKS OF THE OTHER HALF; THE TIME PER FILE SHOULD NOT GROW
+"""
+import time
+
+from terraform_parser.merge import Merge, DEEP_MERGE
+
+
+def result(n, override):
+    blocks = [
+        {"aws_instance": {f"i{n}_{i}": [
+            {"ami": {"literal": "ami-123456"}},
+            {"instance_type": {"literal": "t3.large" if override else "t3.micro"}},
+            {"tags": [{"name": {"literal": f"i{n}_{i}"}}, {"team": {"literal": "platform"}}]},
+        ]}}
+        for i in range(5)
+    ]
+    blocks.append({"local": {f"x{n}": n}})
+    return blocks
+
+
+def main():
+    for count in (1000, 4000, 16000):
+        results = [(f"{n}.tf", result(n, False)) for n in range(count // 2)]
+        results += [(f"override_{n}.tf", result(n, True)) for n in range(count // 2)]
+        start = time.perf_counter()
+        merge = Merge(DEEP_MERGE)
+        for path, blocks in results:
+            merge.add(path, blocks)
+        merge.result()
+        duration = time.perf_counter() - start
+        print(
+            f"{count:6} files {len(merge):6} blocks {len(merge.conflicts):6} conflicts"
+            f" {duration:6.3f}s  {duration / count * 1e6:5.0f}us per file"
+        )
+
+
+if __name__ == "__main__":
+    main()
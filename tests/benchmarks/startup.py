@@ -0,0 +1,48 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+STARTUP BENCHMARK
+
+    python -m tests.benchmarks.startup
+
+EACH STATEMENT IS RUN IN A FRESH INTERPRETER; THE BEST OF SEVERAL RUNS IS
+REPORTED, LESS THE COST OF STARTING AN EMPTY INTERPRETER
+"""
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "import": "import terraform_parser",
+    "first parse": "import terraform_parser; terraform_parser.parse('locals {}')",
+}
+
+
+def run(statement, repeat=7):
+    """
+    :return: BEST WALL-CLOCK SECONDS TO RUN statement IN A NEW INTERPRETER
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def main():
+    empty = run("pass")
+    print(f"{'interpreter':>12}: {empty * 1000:7.1f}ms")
+    for name, statement in STATEMENTS.items():
+        print(f"{name:>12}: {(run(statement) - empty) * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+BENCHMARK SUITE
+
+    python -m tests.benchmarks.suite [--save] [--threshold 0.25] [--baseline FILE]
+
+PARSE THE EXAMPLE CORPUS, AND SYNTHETIC FILES OF GROWING SIZE (SEE
+tests.benchmarks.generate), THEN COMPARE WITH THE BASELINE FILE.  EXITS WITH 1
+IF ANY MEASURE IS WORSE THAN THE BASELINE BY MORE THAN threshold.  THE
+BASELINE IS WRITTEN ON THE FIRST RUN, OR WITH --save
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import terraform_parser.functions
+from terraform_parser import parse
+from terraform_parser.parallel import find_files
+from tests.benchmarks.generate import GENERATORS
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# SIZES FOR EACH GENERATOR; nesting IS EXPONENTIAL, SO KEPT SMALL
+SCALING = {
+    "resources": (25, 50, 100, 200),
+    "nesting": (4, 8, 12, 16),
+    "heredoc": (100, 200, 400, 800),
+    "operators": (10, 20, 40, 80),
+    "conditions": (10, 20, 40, 80),
+}
+
+
+def percentile(values, p):
+    """
+    :return: NEAREST-RANK PERCENTILE OF values
+    """
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))]
+
+
+class ScrubTimer(object):
+    """
+    WRAP THE scrub() USED BY THE PARSE ACTIONS, TO SPLIT GRAMMAR TIME FROM scrub TIME
+    """
+
+    __slots__ = ["scrub", "duration"]
+
+    def __init__(self):
+        self.scrub = terraform_parser.functions.scrub
+        self.duration = 0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.scrub(*args, **kwargs)
+        finally:
+            self.duration += time.perf_counter() - start
+
+    def __enter__(self):
+        terraform_parser.functions.scrub = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        terraform_parser.functions.scrub = self.scrub
+
+
+class GcTimer(object):
+    """
+    TIME SPENT IN THE CYCLIC GARBAGE COLLECTOR
+    """
+
+    __slots__ = ["start", "duration"]
+
+    def __init__(self):
+        self.start = None
+        self.duration = 0
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.start = time.perf_counter()
+        elif self.start is not None:
+            self.duration += time.perf_counter() - self.start
+
+    def __enter__(self):
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        gc.callbacks.remove(self)
+
+
+def corpus(directory):
+    contents = []
+    for path in find_files(directory):
+        with open(path, encoding="utf8") as f:
+            contents.append(f.read())
+    size = sum(len(c.encode("utf8")) for c in contents)
+
+    latencies = []
+    with ScrubTimer() as timer, GcTimer() as collector:
+        for content in contents:
+            start = time.perf_counter()
+            parse(content)
+            latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+
+    tracemalloc.start()
+    try:
+        for content in contents:
+            parse(content)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "corpus.files": len(contents),
+        "corpus.mb_per_s": size / total / 1e6,
+        "corpus.p50_ms": percentile(latencies, 50) * 1000,
+        "corpus.p90_ms": percentile(latencies, 90) * 1000,
+        "corpus.p99_ms": percentile(latencies, 99) * 1000,
+        "corpus.max_ms": max(latencies) * 1000,
+        "corpus.grammar_s": total - timer.duration - collector.duration,
+        "corpus.scrub_s": timer.duration,
+        "corpus.gc_s": collector.duration,
+        "corpus.peak_mb": peak / 1e6,
+    }
+
+
+def scaling():
+    output = {}
+    for kind, sizes in SCALING.items():
+        for n in sizes:
+            content = GENERATORS[kind](n)
+            output[f"scaling.{kind}.{n}_s"] = best(lambda: parse(content))
+    return output
+
+
+def best(action, repeat=3, budget=2):
+    """
+    :return: FASTEST OF UP TO repeat RUNS, STOPPING ONCE budget SECONDS ARE SPENT
+    """
+    durations = []
+    while len(durations) < repeat and sum(durations) < budget:
+        # DO NOT CHARGE THIS RUN FOR GARBAGE LEFT BY THE LAST (BUT, UNLIKE
+        # timeit, DO CHARGE IT FOR ITS OWN: parse() MAKES MANY OBJECTS)
+        gc.collect()
+        start = time.perf_counter()
+        action()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def regressions(baseline, results, threshold):
+    """
+    :return: LIST OF (name, baseline, result) WORSE THAN baseline BY MORE THAN threshold
+    """
+    output = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None or not expected or name.endswith(".files"):
+            continue
+        if name.endswith("_per_s"):
+            # BIGGER IS BETTER
+            worse = actual < expected * (1 - threshold)
+        else:
+            worse = actual > expected * (1 + threshold)
+        if worse:
+            output.append((name, expected, actual))
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.suite")
+    parser.add_argument("--directory", default="tests/examples")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--save", action="store_true", help="replace the baseline")
+    args = parser.parse_args(argv)
+
+    parse("locals {}")  # BUILD THE GRAMMAR BEFORE TIMING ANYTHING
+    results = {**corpus(args.directory), **scaling()}
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+
+    for name, value in results.items():
+        before = baseline.get(name)
+        change = f"{(value / before - 1) * 100:+6.1f}%" if before else ""
+        print(f"{name:32} {value:10.3f} {change}")
+
+    if args.save or not baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    worse = regressions(baseline, results, args.threshold)
+    for name, expected, actual in worse:
+        print(f"REGRESSION {name}: {expected:.3f} -> {actual:.3f}")
+    return 1 if worse else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+WRITER BENCHMARK
+
+    python -m tests.benchmarks.writer [directory]
+
+WRITE THE BLOCKS OF EVERY FILE, REPEATED MORE AND MORE TIMES; THE TIME PER
+BLOCK SHOULD NOT GROW WITH THE SIZE OF THE OUTPUT
+"""
+import os
+import sys
+import time
+
+from terraform_parser import write
+from terraform_parser.parallel import find_files, parse_files
+
+
+def main(directory="tests/examples"):
+    blocks = []
+    for parsed in parse_files(find_files(directory), jobs=1):
+        if parsed.error or not parsed.result:
+            continue
+        result = parsed.result
+        blocks.extend(result if isinstance(result, list) else [result])
+
+    with open(os.devnull, "w") as file:
+        for repeat in (1, 4, 16, 64):
+            start = time.perf_counter()
+            write(blocks * repeat, file)
+            duration = time.perf_counter() - start
+            count = len(blocks) * repeat
+            print(f"{count:7} blocks {duration:7.3f}s  {duration / count * 1e6:6.1f}us per block")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,39 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from tests.benchmarks.generate import GENERATORS, resources, nesting
+from tests.benchmarks.suite import regressions, percentile
+
+
+class TestBenchmarks(FuzzyTestCase):
+    def test_generators_parse(self):
+        for kind, generate in GENERATORS.items():
+            self.assertTrue(parse(generate(3)), kind)
+        self.assertEqual(len(parse(resources(4))), 4)
+        self.assertEqual(
+            parse(nesting(2)),
+            {"aws_wafv2_web_acl": {"deep": {"level0": [
+                {"name": {"literal": "level-0"}},
+                {"level1": {"name": {"literal": "level-1"}}},
+            ]}}},
+        )
+
+    def test_regressions(self):
+        baseline = {"corpus.mb_per_s": 1.0, "corpus.p50_ms": 10.0, "corpus.files": 100}
+        self.assertEqual(
+            regressions(baseline, {"corpus.mb_per_s": 0.8, "corpus.p50_ms": 12.0}, 0.25), []
+        )
+        self.assertEqual(
+            regressions(baseline, {"corpus.mb_per_s": 0.7, "corpus.p50_ms": 13.0}, 0.25),
+            [("corpus.mb_per_s", 1.0, 0.7), ("corpus.p50_ms", 10.0, 13.0)],
+        )
+        self.assertEqual(percentile([3, 1, 2, 4], 50), 2)
+        self.assertEqual(percentile([3, 1, 2, 4], 99), 4)
@@ -0,0 +1,99 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_files import File
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, parse_blocks, split_blocks, blocks, parse_lazy, iter_parse
+
+CONTENT = """
+# } not a brace
+variable "a" {default = "}"}
+/* { */
+resource "b" "c" {
+  value = "${lookup(var.m, "}")} %{if true}{%{endif}"
+  other = "\\"}"
+  // }
+}
+output "d" {value = <<EOF
+text } ${var.a}
+EOF
+}
+locals {
+  x = "$${"
+}
+"""
+
+
+class TestBlocks(FuzzyTestCase):
+    def test_split(self):
+        spans = list(split_blocks(CONTENT))
+        texts = [CONTENT[s:e] for s, e in spans]
+        self.assertEqual(
+            [t.split()[0] for t in texts], ["variable", "resource", "output", "locals"]
+        )
+        self.assertEqual(texts[0], """variable "a" {default = "}"}""")
+        self.assertTrue(texts[2].endswith("EOF\n}"))
+
+    def test_same_as_parse(self):
+        self.assertEqual(parse_blocks(CONTENT, jobs=1), parse(CONTENT))
+
+        content = File("tests/examples/aws/aws_ec2_ebs_docker_host/main.tf").read()
+        self.assertEqual(parse_blocks(content, jobs=1), parse(content))
+
+    def test_worker_pool(self):
+        old, blocks.MIN_PARALLEL_SIZE = blocks.MIN_PARALLEL_SIZE, 0
+        try:
+            self.assertEqual(parse_blocks(CONTENT, jobs=2), parse(CONTENT))
+        finally:
+            blocks.MIN_PARALLEL_SIZE = old
+
+    def test_error(self):
+        content = CONTENT.replace("default = ", "default = = ")
+        with self.assertRaises(Exception):
+            parse_blocks(content, jobs=1)
+
+    def test_lazy_headers(self):
+        lazy = parse_lazy(CONTENT)
+        self.assertEqual(
+            [(b.kind, b.labels) for b in lazy],
+            [
+                ("variable", ("a",)),
+                ("resource", ("b", "c")),
+                ("output", ("d",)),
+                ("locals", ()),
+            ],
+        )
+        self.assertTrue(all(b._value is blocks._not_parsed for b in lazy))
+
+    def test_lazy_value(self):
+        content = File("tests/examples/aws/aws_ec2_ebs_docker_host/data.tf").read()
+        lazy = parse_lazy(content)
+        self.assertEqual([b.value for b in lazy], parse(content))
+        self.assertIs(lazy[1].value, lazy[1].value)
+
+    def test_lazy_byte_span(self):
+        content = '# café ☕\nvariable "é" {}\nlocals {\n  a = "ü"\n}\n'
+        data = content.encode("utf8")
+        lazy = parse_lazy(content)
+        self.assertEqual([b.labels for b in lazy], [("é",), ()])
+        for b in lazy:
+            self.assertEqual(data[b.start : b.end].decode("utf8"), b.text)
+        self.assertEqual(lazy[1].text, 'locals {\n  a = "ü"\n}')
+        self.assertEqual(lazy[1].value, {"local": {"a": {"literal": "ü"}}})
+
+    def test_iter_parse(self):
+        content = File("tests/examples/aws/aws_ec2_ebs_docker_host/main.tf").read()
+        self.assertEqual(list(iter_parse(content)), parse(content))
+
+    def test_iter_parse_streams(self):
+        content = CONTENT + 'resource "broken" {'
+        values = iter_parse(content)
+        self.assertEqual(next(values), {"var": {"a": {"default": {"literal": "}"}}}})
+        with self.assertRaises(Exception):
+            list(values)
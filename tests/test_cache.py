@@ -0,0 +1,82 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import os
+import pickle
+import tempfile
+import zlib
+
+from mo_files import File
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, ParseCache
+from terraform_parser.utils import SQL_NULL
+
+
+class TestCache(FuzzyTestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_hit(self):
+        cache = ParseCache(self.temp.name)
+        content = File("tests/examples/aws/aws_ec2_ebs_docker_host/data.tf").read()
+        self.assertNotIn(content, cache)
+        expected = parse(content, cache=cache)
+        self.assertIn(content, cache)
+        self.assertEqual(cache[content], expected)
+        self.assertEqual(parse(content, cache=cache), parse(content))
+
+    def test_null_is_preserved(self):
+        cache = ParseCache(self.temp.name)
+        content = """variable "x" {default = null}"""
+        parse(content, cache=cache)
+        result = cache[content]
+        self.assertIs(result["var"]["x"]["default"], SQL_NULL)
+
+    def test_version_change_invalidates(self):
+        content = """output "host" {value="${-1}"}"""
+        parse(content, cache=ParseCache(self.temp.name, version="old"))
+        self.assertIn(content, ParseCache(self.temp.name, version="old"))
+        self.assertNotIn(content, ParseCache(self.temp.name, version="new"))
+
+    def test_eviction(self):
+        cache = ParseCache(self.temp.name, max_size=2000)
+        for i in range(100):
+            cache[f"""output "host{i}" {{value = {i}}}"""] = {"output": {f"host{i}": {"value": i}}}
+        total = sum(
+            os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(self.temp.name) for f in files
+        )
+        self.assertLessEqual(total, 2000)
+        self.assertIn("""output "host99" {value = 99}""", cache)
+        self.assertNotIn("""output "host0" {value = 0}""", cache)
+
+    def test_replace_keeps_size(self):
+        cache = ParseCache(self.temp.name)
+        for _ in range(10):
+            cache["x"] = {"output": {"x": {"value": 1}}}
+        self.assertEqual(cache.size, ParseCache(self.temp.name).size)
+
+    def test_corrupt_entry_is_reparsed(self):
+        cache = ParseCache(self.temp.name)
+        content = """output "host" {value = 1}"""
+        expected = parse(content, cache=cache)
+        for data in (
+            b"not zlib",
+            zlib.compress(b"cterraform_parser.utils\nNoSuchClass\n."),  # AttributeError
+            zlib.compress(b"cno_such_module\nNoSuchClass\n."),  # ImportError
+            zlib.compress(pickle.dumps([1])[:-2]),  # TRUNCATED
+        ):
+            with open(cache._path(cache.key(content)), "wb") as f:
+                f.write(data)
+            with self.assertRaises(KeyError):
+                cache[content]
+            self.assertNotIn(content, cache)
+            self.assertEqual(parse(content, cache=cache), expected)
@@ -0,0 +1,75 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.cli import main, expand
+
+DIRECTORY = "tests/examples/aws/aws_ec2_ebs_docker_host"
+
+
+def run(*argv):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = main(list(argv), stdout, stderr)
+    return code, [json.loads(line) for line in stdout.getvalue().splitlines()], stderr.getvalue()
+
+
+class TestCli(FuzzyTestCase):
+    def test_files(self):
+        code, records, _ = run("--jobs", "1", DIRECTORY)
+        self.assertEqual(code, 0)
+        self.assertEqual([r["path"] for r in records], list(expand([DIRECTORY])))
+        for record in records:
+            with open(record["path"]) as file:
+                self.assertEqual(record["result"], parse(file.read()))
+
+    def test_blocks(self):
+        code, records, _ = run("-j", "1", "--blocks", os.path.join(DIRECTORY, "*.tf"))
+        self.assertEqual(code, 0)
+        addresses = {r["address"] for r in records}
+        self.assertIn("aws_instance.this", addresses)
+        self.assertIn("data.aws_vpc.this", addresses)
+        self.assertIn("var.hostname", addresses)
+
+    def test_failures(self):
+        with tempfile.TemporaryDirectory() as directory:
+            good = os.path.join(directory, "good.tf")
+            bad = os.path.join(directory, "bad.tf")
+            with open(good, "w") as file:
+                file.write('variable "x" {\n  default = null\n}\n')
+            with open(bad, "w") as file:
+                file.write("resource {\n")
+            code, records, errors = run("-j", "1", bad, good)
+        self.assertEqual(code, 1)
+        self.assertEqual(records[0]["path"], bad)
+        self.assertIn("ParseException", records[0]["error"])
+        # SQL_NULL IS WRITTEN AS null
+        self.assertEqual(records[1]["result"], {"var": {"x": {"default": None}}})
+        self.assertIn("1 of 2 files failed", errors)
+
+    def test_module(self):
+        # WORKER PROCESSES, AND A CACHE
+        with tempfile.TemporaryDirectory() as cache:
+            for _ in range(2):
+                output = subprocess.run(
+                    [sys.executable, "-m", "terraform_parser", "-j", "2", "--cache", cache, DIRECTORY],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                records = [json.loads(line) for line in output.splitlines()]
+                self.assertEqual(len(records), len(list(expand([DIRECTORY]))))
+            self.assertTrue(os.listdir(cache))
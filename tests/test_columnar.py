@@ -0,0 +1,91 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, Corpus
+from terraform_parser.columnar import from_files, DICT, LIST, STRING, TEMPLATE
+from terraform_parser.parallel import find_files
+from terraform_parser.utils import SQL_NULL, Template
+
+DIRECTORY = "tests/examples/aws/aws_ec2_ebs_docker_host"
+
+
+class TestColumnar(FuzzyTestCase):
+    def test_round_trip(self):
+        corpus = from_files(find_files(DIRECTORY), jobs=1)
+        for path in find_files(DIRECTORY):
+            with open(path) as f:
+                expected = parse(f.read())
+            # STRICT COMPARISON, NOT FUZZY
+            self.assertTrue(corpus.to_json(path) == expected, path)
+        self.assertIsNone(corpus.strings)
+
+    def test_scalars(self):
+        value = {"a": [1, -2, 2 ** 40, 1.5, True, False, None, SQL_NULL, "x", {}, []]}
+        corpus = Corpus()
+        corpus.add("f", value)
+        corpus.freeze()
+        result = corpus.to_json("f")
+        self.assertTrue(result == value)
+        self.assertIs(result["a"][7], SQL_NULL)
+
+    def test_cursor(self):
+        corpus = Corpus()
+        root = corpus.add("f", {"resource": {"aws_s3_bucket": {"logs": {"bucket": "logs"}}}})
+        corpus.add("g", {"var": {"x": {"default": ["a", "b"]}}})
+        corpus.freeze()
+
+        bucket = root["resource"]["aws_s3_bucket"]["logs"]["bucket"]
+        self.assertEqual(bucket.kind, STRING)
+        self.assertEqual(bucket.value, "logs")
+        self.assertEqual(bucket.key, "bucket")
+        self.assertEqual(bucket.parent.parent.key, "aws_s3_bucket")
+
+        default = corpus["g"]["var"]["x"]["default"]
+        self.assertEqual(default.kind, LIST)
+        self.assertEqual(len(default), 2)
+        self.assertEqual(default[-1].value, "b")
+        self.assertEqual([c.value for c in default], ["a", "b"])
+        self.assertEqual(corpus["g"].kind, DICT)
+        self.assertIsNone(corpus["g"].get("missing"))
+
+        # ADDING AFTER freeze() STILL WORKS
+        corpus.add("h", {"var": "logs"})
+        self.assertEqual(corpus.to_json("h"), {"var": "logs"})
+        self.assertEqual(corpus.to_json("f")["resource"]["aws_s3_bucket"]["logs"]["bucket"], "logs")
+
+    def test_template(self):
+        result = parse('locals {\n  a = "x${var.y}"\n  b = concat(var.y, var.z)\n}')
+        corpus = Corpus()
+        corpus.add("f", result)
+        corpus.freeze()
+        a, b = corpus["f"]["local"]
+        self.assertEqual(a["a"].kind, TEMPLATE)
+        self.assertEqual(a["a"]["concat"][1].value, "var.y")
+        self.assertEqual(b["b"].kind, DICT)
+        a, b = corpus.to_json("f")["local"]
+        self.assertIsInstance(a["a"], Template)
+        self.assertNotIsInstance(b["b"], Template)
+
+    def test_replace(self):
+        corpus = Corpus()
+        corpus.add("f", {"a": [1.5, "x"]})
+        corpus.add("g", {"b": [2.5, {"c": 3}]})
+        size = len(corpus)
+        corpus.add("f", {"a": [4.5]})
+        self.assertEqual(len(corpus), size - 1)
+        self.assertEqual(len(corpus.numbers), 2)
+        self.assertTrue(corpus.to_json("g") == {"b": [2.5, {"c": 3}]})
+        self.assertTrue(corpus.to_json("f") == {"a": [4.5]})
+        self.assertEqual(corpus["g"]["b"][1]["c"].parent.parent.key, "b")
+
+        corpus.remove("g")
+        self.assertEqual(len(corpus), 3)
+        self.assertEqual(corpus.numbers, [4.5])
+        self.assertTrue(corpus.to_json("f") == {"a": [4.5]})
@@ -6,7 +6,15 @@
 #
 # Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
 #
-from unittest import TestCase
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+
+from terraform_parser import parse, DependencyGraph
+from terraform_parser.diagram import to_dot, render, TYPE
+from terraform_parser.graph import from_files
+from terraform_parser.parallel import find_files
 
 
 class TestDiagram(TestCase):
@@ -14,10 +22,64 @@ class TestDiagram(TestCase):
     def test_simple(self):
 
         # LOAD THE TERRAFORM
+        paths = find_files("tests/examples/aws/aws_static_site")
 
         # MAKE CONNECTIONS
+        graph = from_files(paths, jobs=1)
 
+        # DIAGRAM
+        dot = to_dot(graph)
+        self.assertTrue(dot.startswith("digraph terraform {"))
+        self.assertIn('label="tests/examples/aws/aws_static_site";', dot)
+        self.assertIn('"aws_s3_bucket_policy.this" -> "aws_s3_bucket.this";', dot)
+        # VARIABLES AND LOCALS ARE PRUNED
+        self.assertNotIn("var.", dot)
+        self.assertNotIn("local.", dot)
 
+    def test_aggregate(self):
+        graph = DependencyGraph()
+        content = "".join(
+            f'resource "aws_instance" "i{i}" {{\n  subnet_id = aws_subnet.main.id\n}}\n'
+            for i in range(5)
+        )
+        content += 'resource "aws_subnet" "main" {\n  vpc_id = local.vpc\n}\n'
+        graph.update("main.tf", parse(content))
+        vpc = 'resource "aws_vpc" "main" {}\nlocals {\n  vpc = aws_vpc.main.id\n}\n'
+        graph.update("vpc/vpc.tf", parse(vpc))
 
-        # DIAGRAM
-        pass
+        dot = to_dot(graph)
+        self.assertIn('"./aws_instance" [label="aws_instance\\n× 5", style=bold];', dot)
+        self.assertIn('"./aws_instance" -> "aws_subnet.main";', dot)
+        # THE local IS PRUNED, ITS EDGES ARE KEPT
+        self.assertIn('"aws_subnet.main" -> "aws_vpc.main";', dot)
+
+        dot = to_dot(graph, cluster=TYPE, aggregate=10)
+        self.assertIn('label="aws_instance";', dot)
+        self.assertIn('"aws_instance.i3" -> "aws_subnet.main";', dot)
+
+    def test_pruned_cycle(self):
+        graph = DependencyGraph()
+        content = (
+            "locals {\n"
+            "  a = [local.b, aws_s3_bucket.y.id]\n"
+            "  b = local.c\n"
+            "  c = local.a\n"
+            "}\n"
+            'resource "aws_s3_bucket" "y" {}\n'
+        )
+        content += "".join(
+            f'resource "aws_s3_bucket" "{n}" {{\n  bucket = local.{n}\n}}\n' for n in "abc"
+        )
+        graph.update("main.tf", parse(content))
+        dot = to_dot(graph, aggregate=10)
+        # EVERY ADDRESS IN THE CYCLE OF locals REACHES aws_s3_bucket.y
+        for n in "abc":
+            self.assertIn(f'"aws_s3_bucket.{n}" -> "aws_s3_bucket.y";', dot)
+
+    @skipIf(not shutil.which("dot"), "Graphviz is not installed")
+    def test_render(self):
+        graph = from_files(find_files("tests/examples/aws"), jobs=1)
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "diagram.svg")
+            render(to_dot(graph), output)
+            self.assertGreater(os.path.getsize(output), 0)
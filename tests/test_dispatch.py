@@ -0,0 +1,83 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_parsing import Literal, Regex
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.utils import Dispatch
+
+
+class TestDispatch(FuzzyTestCase):
+    def test_order(self):
+        word = Regex(r"[a-z]+") / (lambda t: "word:" + t[0])
+        call = (Regex(r"[a-z]+") + Literal("()")) / (lambda t: "call:" + t[0])
+        number = Regex(r"\d+")
+        parser = Dispatch([
+            ("[a-z]", call, "[a-z]+[(]"),
+            ("[a-z]", word),
+            (r"\d", number),
+        ]).finalize()
+
+        self.assertEqual(parser.parse("abc()", parse_all=True)[0], "call:abc")
+        self.assertEqual(parser.parse("abc", parse_all=True)[0], "word:abc")
+        self.assertEqual(parser.parse("42", parse_all=True)[0], "42")
+        with self.assertRaises(Exception):
+            parser.parse("(", parse_all=True)
+        with self.assertRaises(Exception):
+            parser.parse("", parse_all=True)
+
+    def test_compound(self):
+        result = parse("""
+        locals {
+          a = TRUE
+          b = -1
+          c = .5
+          d = max (1, 2)
+          e = true_thing
+          f = "%{ if x }y%{ endif }%{ for i in l }${i}%{ endfor }"
+        }
+        """)
+        self.assertEqual(
+            result,
+            {"local": [
+                {"a": True},
+                {"b": -1},
+                {"c": 0.5},
+                {"d": {"max": [1, 2]}},
+                {"e": "true_thing"},
+                {"f": {"concat": [
+                    {"when": "x", "then": {"literal": "y"}},
+                    {
+                        "from": {
+                            "select": {"name": "i", "value": "index"},
+                            "from": "l",
+                        },
+                        "select": {"value": "i"},
+                    },
+                ]}},
+            ]},
+        )
+
+    def test_assignments(self):
+        # port STARTS LIKE provisioner, BUT IS AN ATTRIBUTE
+        result = parse("""
+        resource "null_resource" "n" {
+          port = 1
+          provisioner "local-exec" {
+            command = "x"
+          }
+        }
+        """)
+        self.assertEqual(
+            result,
+            {"null_resource": {"n": [
+                {"port": 1},
+                {"provisioner": {"local-exec": {"command": {"literal": "x"}}}},
+            ]}},
+        )
@@ -0,0 +1,63 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+parse() OF tests/examples MUST STAY THE SAME AS IT WAS WHEN THE WHOLE TREE WAS
+BUILT, THEN scrub()ED.  THOSE RESULTS ARE IN baseline.json, MADE WITH THAT
+VERSION OF THE PARSER FIRST ON THE PATH:
+
+    PYTHONPATH=<old checkout> python tests/test_equivalence.py
+"""
+import json
+import os
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.utils import SQL_NULL
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+EXAMPLES = "tests/examples"
+
+
+def to_json(value):
+    return json.dumps(
+        value, sort_keys=True, default=lambda v: "<<NULL>>" if v is SQL_NULL else str(v)
+    )
+
+
+def example_files():
+    # NOT parallel.find_files(), THE OLD VERSION DOES NOT HAVE IT
+    for root, dirs, files in os.walk(EXAMPLES):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".tf"):
+                yield os.path.join(root, name).replace(os.sep, "/")
+
+
+class TestEquivalence(FuzzyTestCase):
+    def test_examples(self):
+        with open(BASELINE, encoding="utf8") as f:
+            baseline = json.load(f)
+        paths = list(example_files())
+        self.assertGreater(len(paths), 100)
+        self.assertEqual(sorted(baseline), sorted(paths))
+        for path in paths:
+            with open(path, encoding="utf8") as f:
+                content = f.read()
+            self.assertEqual(to_json(parse(content)), to_json(baseline[path]), path)
+
+
+if __name__ == "__main__":
+    # ONE LINE PER FILE, SO A CHANGE SHOWS AS A SMALL DIFF
+    lines = []
+    for path in example_files():
+        with open(path, encoding="utf8") as f:
+            lines.append(f"{json.dumps(path)}: {to_json(parse(f.read()))}")
+    with open(BASELINE, "w", encoding="utf8") as f:
+        f.write("{\n" + ",\n".join(lines) + "\n}\n")
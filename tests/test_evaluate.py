@@ -0,0 +1,156 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, Evaluator
+from terraform_parser.evaluate import compile_expression, EvaluationError, CycleError
+
+MAIN = """
+variable "env" {
+  default = "dev"
+}
+variable "sizes" {
+  default = {dev = 1, prod = 3}
+}
+variable "servers" {}
+
+locals {
+  name     = "app-${var.env}"
+  count    = var.sizes[var.env] * 2 + 1
+  size     = local.count > 4 ? "large" : "small"
+  tags     = merge(var.tags, {Name = local.name, Env = upper(var.env)})
+  ids      = [for i, s in var.servers : "${i}:${s.id}" if s.id != "b"]
+  by_id    = {for s in var.servers : s.id => s.zone}
+  by_zone  = {for s in var.servers : s.zone => s.id...}
+  splat    = var.servers[*].id
+  legacy   = var.servers.*.id
+  listing  = "%{for s in var.servers}${s.id},%{endfor}"
+  debug    = "[%{if var.env == "dev"}debug%{else}quiet%{endif}]"
+  joined   = join(",", concat(local.splat, ["z"]))
+  fallback = try(var.missing, "none")
+  known    = contains(["a", "b"], "b")
+  subnet   = cidrsubnet("10.0.0.0/16", 8, local.count)
+}
+"""
+
+
+class TestEvaluate(FuzzyTestCase):
+    def test_locals(self):
+        evaluator = Evaluator()
+        evaluator.add(parse(MAIN))
+        servers = [{"id": "a", "zone": "x"}, {"id": "b", "zone": "x"}, {"id": "c", "zone": "y"}]
+        scope = evaluator.scope({"servers": servers, "tags": {"Team": "web"}})
+        self.assertEqual(
+            scope.to_dict(),
+            {
+                "name": "app-dev",
+                "count": 3,
+                "size": "small",
+                "tags": {"Team": "web", "Name": "app-dev", "Env": "DEV"},
+                "ids": ["0:a", "2:c"],
+                "by_id": {"a": "x", "b": "x", "c": "y"},
+                "by_zone": {"x": ["a", "b"], "y": ["c"]},
+                "splat": ["a", "b", "c"],
+                "legacy": ["a", "b", "c"],
+                "listing": "a,b,c,",
+                "debug": "[debug]",
+                "joined": "a,b,c,z",
+                "fallback": "none",
+                "known": True,
+                "subnet": "10.0.3.0/24",
+            },
+        )
+
+        # SAME COMPILED locals, ANOTHER SET OF VARIABLES
+        scope = evaluator.scope({"env": "prod", "servers": [], "tags": {}})
+        self.assertEqual(scope["count"], 7)
+        self.assertEqual(scope["size"], "large")
+        self.assertEqual(scope["tags"], {"Name": "app-prod", "Env": "PROD"})
+        self.assertEqual(scope["listing"], "")
+
+    def test_memoized(self):
+        evaluator = Evaluator()
+        evaluator.add(parse("locals {\n  a = var.x + 1\n  b = local.a * local.a\n}"))
+        calls = []
+        compiled = evaluator.locals["a"]
+        evaluator.locals["a"] = lambda env: calls.append(1) or compiled(env)
+        scope = evaluator.scope({"x": 2})
+        self.assertEqual(scope["b"], 9)
+        self.assertEqual(scope["a"], 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_cycle(self):
+        evaluator = Evaluator()
+        evaluator.add(parse("locals {\n  a = local.b\n  b = local.c\n  c = local.a\n  d = 1\n}"))
+        scope = evaluator.scope()
+        with self.assertRaises(CycleError):
+            scope["a"]
+        with self.assertRaises(CycleError):
+            # try() DOES NOT HIDE A CYCLE
+            scope.evaluate(parse('locals {\n  x = try(local.b, "")\n}')["local"]["x"])
+        self.assertEqual(scope["d"], 1)
+
+    def test_errors(self):
+        scope = Evaluator().scope({"x": {"a": 1}})
+        with self.assertRaises(EvaluationError):
+            scope.evaluate("var.x.b")
+        with self.assertRaises(EvaluationError):
+            scope.evaluate("local.nothing")
+        with self.assertRaises(EvaluationError):
+            scope.evaluate({"div": [1, 0]})
+        with self.assertRaises(EvaluationError):
+            scope.evaluate({"timestamp": {}})
+        self.assertEqual(scope.evaluate({"can": "var.x.b"}), False)
+        # AN OBJECT WITH ONE OPERATOR-NAMED KEY PARSES AS THAT OPERATOR
+        with self.assertRaises(EvaluationError):
+            compile_expression(parse("locals {\n  x = jsonencode({add = 1})\n}")["local"]["x"])
+
+    def test_compile_once(self):
+        function = compile_expression(
+            {"if_then_else": [{"gt": ["each.value", 2]}, {"literal": "big"}, {"literal": "small"}]}
+        )
+        self.assertEqual(
+            [function({"each": {"value": v}}) for v in (1, 3)], ["small", "big"]
+        )
+
+    def test_collection_arguments(self):
+        evaluator = Evaluator()
+        evaluator.add(parse(
+            "locals {\n"
+            "  json   = jsonencode({a = 1, b = 2})\n"
+            "  keys   = keys({a = 1, b = 2})\n"
+            "  values = values({a = 1, b = 2})\n"
+            "  map    = tomap({a = 1, b = 2})\n"
+            '  flip   = transpose({a = ["x"], b = ["x", "y"]})\n'
+            '  zip    = zipmap(["a", "b"], [1, 2])\n'
+            "  zipped = zipmap(local.keys, [3, 4])\n"
+            '  lists  = concat(["a"], ["b", "c"])\n'
+            '  mixed  = concat(local.keys, ["c"])\n'
+            '  text   = "a${"b"}c"\n'
+            '  names  = jsonencode(["a", "b"])\n'
+            "  ints   = jsonencode([1, 2])\n"
+            "}"
+        ))
+        self.assertEqual(
+            evaluator.scope().to_dict(),
+            {
+                "json": '{"a":1,"b":2}',
+                "keys": ["a", "b"],
+                "values": [1, 2],
+                "map": {"a": 1, "b": 2},
+                "flip": {"x": ["a", "b"], "y": ["b"]},
+                "zip": {"a": 1, "b": 2},
+                "zipped": {"a": 3, "b": 4},
+                "lists": ["a", "b", "c"],
+                "mixed": ["a", "b", "c"],
+                "text": "abc",
+                "names": '["a","b"]',
+                "ints": "[1,2]",
+            },
+        )
@@ -0,0 +1,96 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, DependencyGraph
+from terraform_parser.graph import references, from_files
+from terraform_parser.parallel import find_files
+
+MAIN = """
+resource "aws_instance" "this" {
+  ami                    = data.aws_ami.this.id
+  key_name               = aws_key_pair.this[0].key_name
+  vpc_security_group_ids = aws_security_group.this.*.id
+  tags                   = merge(var.tags, {Name = local.name})
+  user_data              = "#!/bin/bash\\necho ${var.message}"
+  depends_on             = ["aws_iam_role.this"]
+}
+
+resource "aws_key_pair" "this" {
+  count      = var.key_count
+  public_key = file("${path.module}/key.pub")
+}
+
+locals {
+  name  = "${var.prefix}-host"
+  names = [for s in aws_instance.this : s.tags.Name if s.id != ""]
+}
+"""
+
+VARIABLES = """
+variable "tags" {}
+variable "prefix" {
+  default = "x"
+}
+"""
+
+
+class TestGraph(FuzzyTestCase):
+    def test_references(self):
+        value = parse(MAIN)
+        self.assertEqual(
+            set(references(value)),
+            {
+                "data.aws_ami.this",
+                "aws_key_pair.this",
+                "aws_security_group.this",
+                "var.tags",
+                "local.name",
+                "var.message",
+                "aws_iam_role.this",
+                "var.key_count",
+                "var.prefix",
+                "aws_instance.this",
+            },
+        )
+
+    def test_queries(self):
+        graph = DependencyGraph()
+        graph.update("main.tf", parse(MAIN))
+        graph.update("variables.tf", parse(VARIABLES))
+
+        self.assertEqual(graph.dependencies("local.names"), {"aws_instance.this"})
+        self.assertEqual(graph.dependents("var.prefix"), {"local.name"})
+        self.assertEqual(
+            graph.closure("var.prefix", reverse=True),
+            {"local.name", "aws_instance.this", "local.names"},
+        )
+        self.assertEqual(graph.closure("local.names"), graph.dependencies("aws_instance.this") | {
+            "aws_instance.this", "var.prefix", "var.key_count",
+        })
+        self.assertEqual(graph.cycles(), [])
+        self.assertIn("var.tags", graph)
+
+        # REPLACE ONE FILE: local.name NOW REFERS BACK TO local.names
+        graph.update("main.tf", parse(MAIN.replace('"${var.prefix}-host"', "local.names[0]")))
+        self.assertEqual(graph.dependents("var.prefix"), set())
+        self.assertEqual(graph.cycles(), [["aws_instance.this", "local.name", "local.names"]])
+
+        graph.remove("main.tf")
+        self.assertEqual(graph.dependents("var.tags"), set())
+        self.assertNotIn("aws_instance.this", graph)
+        self.assertEqual(len(graph), 2)
+
+    def test_examples(self):
+        graph = from_files(find_files("tests/examples/aws/aws_static_site"), jobs=1)
+        self.assertEqual(
+            graph.dependencies("local.bucket_name"),
+            {"local.prefix_with_domain", "var.bucket_override_name"},
+        )
+        self.assertIn("output.bucket_name", graph.closure("local.bucket_name", reverse=True))
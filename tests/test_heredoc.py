@@ -0,0 +1,49 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import json
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.functions import to_multiline
+from terraform_parser.grammar import multiline_string_parser
+from terraform_parser.utils import scrub
+
+BODIES = [
+    "\n",
+    '\n{"Action": "s3:*", "Resource": "*"}\n',
+    "\ncost is $5 or 5%\n",
+    "\necho $${HOME} %%{not a directive}\n",
+    "\nhello ${var.name}!\n",
+    "\n${var.a}${var.b}",
+    '\n${lookup(var.m, "}")} and ${join(",", [for x in var.l : x])}\n',
+    "\n%{if var.x}yes%{endif} ${var.y}\n",
+    "\ntrailing $",
+    "\n$$${var.x}\n",
+    "\n${unclosed\n",
+]
+
+
+class TestHeredoc(FuzzyTestCase):
+    def test_same_as_template_grammar(self):
+        for body in BODIES:
+            expected = scrub(list(multiline_string_parser.parse(body)))
+            result = scrub(to_multiline({"content": body}))
+            self.assertEqual(json.dumps(result), json.dumps(expected), body)
+
+    def test_literal(self):
+        result = parse('locals {\n  p = <<EOF\n{"a": 1}\nEOF\n}')
+        self.assertEqual(result, {"local": {"p": {"literal": '\n{"a": 1}\n'}}})
+
+    def test_interpolation(self):
+        result = parse("locals {\n  p = <<EOF\nhi ${var.name}\nEOF\n}")
+        self.assertEqual(
+            result,
+            {"local": {"p": {"concat": [{"literal": "\nhi "}, "var.name", {"literal": "\n"}]}}},
+        )
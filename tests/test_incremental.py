@@ -0,0 +1,72 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_files import File
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, IncrementalParser
+
+CONTENT = """
+variable "a" {default = 1}
+
+# a comment
+resource "b" "c" {
+  value = var.a
+}
+
+output "d" {value = <<EOF
+text ${var.a}
+EOF
+}
+"""
+
+
+class TestIncremental(FuzzyTestCase):
+    def test_examples(self):
+        content = File("tests/examples/aws/aws_ec2_ebs_docker_host/main.tf").read()
+        parser = IncrementalParser(content)
+        self.assertEqual(parser.result, parse(content))
+
+    def test_edit_one_block(self):
+        parser = IncrementalParser(CONTENT)
+        new = CONTENT.replace("value = var.a", "value = var.a + 2")
+        parser.update(new)
+        self.assertEqual(parser.reparsed, 1)
+        self.assertEqual(parser.result, parse(new))
+
+    def test_edit_range(self):
+        parser = IncrementalParser(CONTENT)
+        start = CONTENT.index("default = 1") + len("default = ")
+        parser.edit(start, start + 1, "2")
+        self.assertEqual(parser.reparsed, 1)
+        self.assertEqual(parser.result, parse(CONTENT.replace("default = 1", "default = 2")))
+
+    def test_insert_and_delete_block(self):
+        parser = IncrementalParser(CONTENT)
+        new = CONTENT.replace("# a comment", 'locals {x = "y"}')
+        parser.update(new)
+        self.assertEqual(parser.reparsed, 1)
+        self.assertEqual(parser.result, parse(new))
+
+        parser.update(CONTENT)
+        self.assertEqual(parser.reparsed, 0)
+        self.assertEqual(parser.result, parse(CONTENT))
+
+    def test_edit_beyond_region(self):
+        # OPEN COMMENT SWALLOWS THE NEXT BLOCK
+        parser = IncrementalParser(CONTENT)
+        new = CONTENT.replace("# a comment", "/*").replace("output", "*/ output")
+        parser.update(new)
+        self.assertEqual(parser.result, parse(new))
+
+    def test_bad_edit_keeps_state(self):
+        parser = IncrementalParser(CONTENT)
+        with self.assertRaises(Exception):
+            parser.update(CONTENT.replace("value = var.a", "value = "))
+        self.assertEqual(parser.content, CONTENT)
+        self.assertEqual(parser.result, parse(CONTENT))
@@ -0,0 +1,104 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import os
+import shutil
+import tempfile
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser.index import BlockIndex
+
+
+class TestIndex(FuzzyTestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp.name, "source")
+        shutil.copytree("tests/examples/aws/aws_ec2_ebs_docker_host", self.source)
+        self.index = BlockIndex(os.path.join(self.temp.name, "index.sqlite"))
+
+    def tearDown(self):
+        self.index.close()
+        self.temp.cleanup()
+
+    def test_find(self):
+        self.index.update(self.source)
+
+        found = self.index.find("aws_security_group.this")
+        self.assertEqual(len(found), 1)
+        self.assertEqual(os.path.basename(found[0].path), "security.tf")
+        self.assertEqual(
+            [os.path.basename(b.path) for b in self.index.find("data.aws_vpc.this")],
+            ["data.tf"],
+        )
+        self.assertEqual(
+            [os.path.basename(b.path) for b in self.index.find("var.hostname")],
+            ["variables.tf"],
+        )
+        self.assertEqual(self.index.find("aws_instance.missing"), [])
+
+    def test_list_by_type(self):
+        self.index.update(self.source)
+        rules = self.index.blocks(type="aws_security_group_rule")
+        self.assertGreater(len(rules), 1)
+        self.assertTrue(all(b.kind == "resource" for b in rules))
+
+        with open(rules[0].path, "rb") as f:
+            text = f.read()[rules[0].start : rules[0].end].decode("utf8")
+        self.assertTrue(text.startswith('resource "aws_security_group_rule"'))
+
+    def test_incremental(self):
+        self.assertGreater(self.index.update(self.source), 0)
+        self.assertEqual(self.index.update(self.source), 0)
+
+        path = os.path.join(self.source, "extra.tf")
+        with open(path, "w") as f:
+            f.write('resource "aws_s3_bucket" "logs" {}')
+        self.assertEqual(self.index.update(self.source), 1)
+        self.assertEqual(len(self.index.find("aws_s3_bucket.logs")), 1)
+
+        os.remove(path)
+        self.assertEqual(self.index.update(self.source), 0)
+        self.assertEqual(self.index.find("aws_s3_bucket.logs"), [])
+
+    def test_errors(self):
+        with open(os.path.join(self.source, "bad.tf"), "w") as f:
+            f.write('resource "aws_s3_bucket" "logs" {')
+        self.index.update(self.source)
+        self.assertEqual(
+            [os.path.basename(p) for p, _ in self.index.errors()], ["bad.tf"]
+        )
+
+    def test_bad_encoding(self):
+        with open(os.path.join(self.source, "latin.tf"), "wb") as f:
+            f.write(b'locals {name = "caf\xe9"}\n')
+        self.index.update(self.source)
+        self.assertEqual(
+            [os.path.basename(p) for p, _ in self.index.errors()], ["latin.tf"]
+        )
+        self.assertTrue(self.index.find("aws_instance.this"))
+
+    def test_absolute_paths(self):
+        self.index.update(self.source)
+        cwd = os.getcwd()
+        os.chdir(self.temp.name)
+        try:
+            self.assertEqual(self.index.update("source"), 0)
+        finally:
+            os.chdir(cwd)
+        for block in self.index.find("aws_instance.this"):
+            self.assertTrue(os.path.isabs(block.path))
+
+    def test_body_error(self):
+        with open(os.path.join(self.source, "body.tf"), "w") as f:
+            f.write('resource "aws_s3_bucket" "logs" {\n  bucket = = 1\n}\n')
+        self.index.update(self.source)
+        errors = dict((os.path.basename(p), e) for p, e in self.index.errors())
+        self.assertIn('resource "aws_s3_bucket" "logs"', errors["body.tf"])
+        # THE HEADER IS STILL FOUND
+        self.assertEqual(len(self.index.find("aws_s3_bucket.logs")), 1)
@@ -0,0 +1,94 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import json
+import random
+
+from mo_parsing import infix_notation
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.grammar import multiline_white, compound, expression, precedence
+from terraform_parser.utils import scrub, SQL_NULL
+
+# THE ORIGINAL CONSTRUCTION: A FLAT LIST OF OPERANDS AND OPERATORS, REDUCED LEVEL BY LEVEL
+with multiline_white:
+    legacy = infix_notation(compound, precedence).finalize()
+climbing = expression.finalize()
+
+OPERANDS = ["1", "2.5", '"s${b}"', "null"]  # NO LISTS: THE FLAT LIST CAN NOT HOLD THEM
+REFERENCES = ["a", "var.x", "f(x, 2)", "(a + b)"]  # THESE CAN TAKE A SUFFIX
+SUFFIXES = ["", "[0]", ".id", "[*].id", "[var.i]"]
+BINARY = ["*", "/", "%", "+", "-", ">=", "<=", "<", ">", "==", "!=", "&&", "||"]
+
+
+def to_json(value):
+    return json.dumps(
+        value, sort_keys=True, default=lambda v: "<<NULL>>" if v is SQL_NULL else str(v)
+    )
+
+
+def random_expression(rand, size):
+    # ! ONLY WHERE THE FLAT REDUCTION GIVES A SENSIBLE ANSWER: AT THE START, OR AFTER && AND ||
+    terms = []
+    for i in range(size):
+        if rand.random() < 0.5:
+            operand = rand.choice(OPERANDS)
+        else:
+            operand = rand.choice(REFERENCES) + rand.choice(SUFFIXES)
+        if rand.random() < 0.2:
+            operand = "-" + operand
+        if i:
+            op = rand.choice(BINARY + ["?"])
+            if op == "?" and i + 1 < size:
+                terms.append(f"? {operand} : {rand.choice(OPERANDS)}")
+                continue
+            op = op if op != "?" else "+"
+            if op in ("&&", "||") and rand.random() < 0.3:
+                operand = "!" + operand
+            terms.append(f"{op} {operand}")
+        else:
+            terms.append(("!" if rand.random() < 0.2 else "") + operand)
+    return " ".join(terms)
+
+
+class TestInfix(FuzzyTestCase):
+    def test_same_as_flat(self):
+        rand = random.Random(42)
+        for _ in range(300):
+            text = random_expression(rand, rand.randint(1, 8))
+            expected = scrub(legacy.parse(text, parse_all=True))
+            actual = scrub(climbing.parse(text, parse_all=True))
+            self.assertEqual(to_json(actual), to_json(expected), text)
+
+    def test_precedence(self):
+        def x(text):
+            return parse(f"locals {{\n  x = {text}\n}}")["local"]["x"]
+
+        self.assertEqual(x("a + b * c"), {"add": ["a", {"mul": ["b", "c"]}]})
+        self.assertEqual(x("1 - 2 - 3"), {"sub": [{"sub": [1, 2]}, 3]})
+        self.assertEqual(x("a || b && c || d"), {"or": ["a", {"and": ["b", "c"]}, "d"]})
+        self.assertEqual(x("(a + b) + (c + d)"), {"add": ["a", "b", "c", "d"]})
+        self.assertEqual(x("!a == b"), {"not": {"eq": ["a", "b"]}})
+        self.assertEqual(x("a && !b"), {"and": ["a", {"not": "b"}]})
+        self.assertEqual(x("-1 + -a"), {"add": [-1, {"neg": "a"}]})
+        self.assertEqual(x("a ? b ? c : d : e"), {"if_then_else": ["a", {"if_then_else": ["b", "c", "d"]}, "e"]})
+        self.assertEqual(x("a || b ? c : d"), {"or": ["a", {"if_then_else": ["b", "c", "d"]}]})
+        self.assertEqual(x("a == null"), {"missing": "a"})
+        self.assertEqual(x("f(x)[0].c"), {"get": [{"get": [{"f": "x"}, 0]}, {"literal": "c"}]})
+        self.assertEqual(x("a[*].b"), {"from": "a", "select": {"value": "b"}})
+
+    def test_long_chains(self):
+        # ONE PASS PER OPERAND, SO LONG CHAINS AND DEEP NESTING ARE NOT A PROBLEM
+        text = " && ".join(f"var.y{i} == {i}" for i in range(300))
+        result = parse(f"locals {{\n  x = {text}\n}}")["local"]["x"]
+        self.assertEqual(len(result["and"]), 300)
+
+        text = "1" + " + (1" * 30 + ")" * 30
+        result = parse(f"locals {{\n  x = {text}\n}}")["local"]["x"]
+        self.assertEqual(result, {"add": [1] * 31})
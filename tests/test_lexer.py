@@ -0,0 +1,69 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.lexer import tokenize, is_keyword, ScanError
+
+
+def kinds(content):
+    return [(kind, content[start:end]) for kind, start, end in tokenize(content)]
+
+
+class TestLexer(FuzzyTestCase):
+    def test_tokens(self):
+        self.assertEqual(
+            kinds('a = [1.5, b.c] # comment\n\n  d = x >= 2'),
+            [
+                ("identifier", "a"),
+                ("operator", "="),
+                ("operator", "["),
+                ("number", "1.5"),
+                ("operator", ","),
+                ("identifier", "b"),
+                ("operator", "."),
+                ("identifier", "c"),
+                ("operator", "]"),
+                ("newline", "\n\n  "),
+                ("identifier", "d"),
+                ("operator", "="),
+                ("identifier", "x"),
+                ("operator", ">="),
+                ("number", "2"),
+            ],
+        )
+
+    def test_keywords(self):
+        self.assertTrue(is_keyword("for"))
+        self.assertTrue(is_keyword("TRUE"))
+        self.assertTrue(is_keyword("true-thing"))
+        self.assertFalse(is_keyword("index"))
+        self.assertFalse(is_keyword("FOR"))
+        self.assertEqual(kinds("in inner"), [("keyword", "in"), ("identifier", "inner")])
+
+    def test_strings_and_heredocs(self):
+        content = 'x = "a ${f("}")} b" <<EOF\n"\nEOF\n'
+        self.assertEqual(
+            kinds(content),
+            [
+                ("identifier", "x"),
+                ("operator", "="),
+                ("string", '"a ${f("}")} b"'),
+                ("heredoc", '<<EOF\n"\nEOF'),
+                ("newline", "\n"),
+            ],
+        )
+        with self.assertRaises(ScanError):
+            list(tokenize('x = "abc'))
+
+    def test_name_is_not_keyword(self):
+        self.assertEqual(
+            parse("locals {\n a = index\n b = true\n c = true_x\n}"),
+            {"local": [{"a": "index"}, {"b": True}, {"c": "true_x"}]},
+        )
@@ -0,0 +1,48 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import gc
+import sys
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+from terraform_parser.parallel import find_files
+from terraform_parser.utils import scrub, SQL_NULL
+
+
+class TestMemory(FuzzyTestCase):
+    def test_null_locations_are_opt_in(self):
+        null_locations = []
+        content = {"a": SQL_NULL, "b": [1, SQL_NULL]}
+        result = scrub(content, null_locations)
+        self.assertEqual(len(null_locations), 2)
+        self.assertEqual(scrub(content), result)
+
+    def test_flat_memory(self):
+        contents = []
+        for path in find_files("tests/examples"):
+            with open(path, "r", encoding="utf8") as f:
+                contents.append(f.read())
+
+        def parse_all(passes):
+            for _ in range(passes):
+                for content in contents:
+                    parse(content)
+            gc.collect()
+            # MEMORY BLOCKS IN USE, AND OBJECTS TRACKED BY THE COLLECTOR
+            return sys.getallocatedblocks(), len(gc.get_objects())
+
+        parse_all(1)  # WARM UP
+        # THOUSANDS OF PARSES, IN ROUNDS, SO ANY GROWTH SHOWS AS A TREND
+        rounds = [parse_all(4) for _ in range(5)]
+        first_blocks, first_objects = rounds[0]
+        for blocks, objects in rounds[1:]:
+            # A LEAK OF EVEN ONE OBJECT PER PARSE WOULD ADD HUNDREDS EACH ROUND
+            self.assertLess(blocks - first_blocks, 100)
+            self.assertLess(objects - first_objects, 100)
@@ -0,0 +1,102 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, to_hcl, Merge, merge_files
+from terraform_parser.merge import DEEP_MERGE, LAST_WINS, MergeConflict
+from terraform_parser.parallel import find_files
+from terraform_parser.writer import iter_blocks
+
+FIRST = parse(
+    'resource "aws_s3_bucket" "b" {\n'
+    '  bucket = "x"\n'
+    "  tags = {\n"
+    "    a = 1\n"
+    "  }\n"
+    "}\n"
+    "locals {\n"
+    "  x = 1\n"
+    "}\n"
+)
+SECOND = parse(
+    'resource "aws_s3_bucket" "b" {\n'
+    '  acl    = "private"\n'
+    '  bucket = "y"\n'
+    "  tags = {\n"
+    "    b = 2\n"
+    "  }\n"
+    "}\n"
+    "locals {\n"
+    "  y = 2\n"
+    "}\n"
+)
+
+
+class TestMerge(FuzzyTestCase):
+    def test_error(self):
+        merge = Merge()
+        merge.add("a.tf", FIRST)
+        merge.add("a.tf", FIRST)  # IDENTICAL DEFINITIONS DO NOT CONFLICT
+        with self.assertRaises(MergeConflict):
+            merge.add("b.tf", SECOND)
+        self.assertEqual(merge.conflicts, [])
+        with self.assertRaises(MergeConflict):
+            merge.add("c.tf", parse("locals {\n  z = 3\n}\n" + to_hcl(SECOND)))
+        # NOTHING FROM b.tf OR c.tf WAS MERGED
+        self.assertEqual(merge.result(), FIRST)
+
+    def test_error_within_file(self):
+        merge = Merge()
+        with self.assertRaises(MergeConflict):
+            merge.add("a.tf", parse("locals {\n  x = 1\n}\nlocals {\n  x = 2\n}\n"))
+        self.assertEqual(len(merge), 0)
+
+    def test_last_wins(self):
+        merge = Merge(LAST_WINS)
+        merge.add("a.tf", FIRST)
+        merge.add("b.tf", SECOND)
+        self.assertEqual(merge.report(), "aws_s3_bucket.b defined in a.tf and b.tf")
+        self.assertEqual(
+            merge.result(),
+            [
+                {"aws_s3_bucket": {"b": [
+                    {"acl": {"literal": "private"}},
+                    {"bucket": {"literal": "y"}},
+                    {"tags": {"b": 2}},
+                ]}},
+                {"local": [{"x": 1}, {"y": 2}]},
+            ],
+        )
+
+    def test_deep_merge(self):
+        merge = Merge(DEEP_MERGE)
+        merge.add("a.tf", FIRST)
+        merge.add("b.tf", SECOND)
+        self.assertEqual(merge.report(), "aws_s3_bucket.b.bucket defined in a.tf and b.tf")
+        self.assertEqual(
+            merge.result(),
+            [
+                {"aws_s3_bucket": {"b": [
+                    {"bucket": {"literal": "y"}},
+                    {"tags": [{"a": 1}, {"b": 2}]},
+                    {"acl": {"literal": "private"}},
+                ]}},
+                {"local": [{"x": 1}, {"y": 2}]},
+            ],
+        )
+
+    def test_files(self):
+        paths = list(find_files("tests/examples/aws/aws_static_site"))
+        merge = merge_files(paths, jobs=1)
+        expected = set()
+        for path in paths:
+            with open(path) as f:
+                expected.update((k, l) for k, l, _ in iter_blocks(parse(f.read())))
+        self.assertEqual({(k, l) for k, l, _ in iter_blocks(merge.result())}, expected)
+        self.assertEqual(merge.conflicts, [])
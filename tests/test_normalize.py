@@ -0,0 +1,122 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import json
+import random
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, normalize, to_hcl
+from terraform_parser.evaluate import Evaluator, EvaluationError
+from terraform_parser.normalize import normalize_expression
+from terraform_parser.parallel import find_files
+
+VARIABLES = {"n": 3, "s": "x", "b": True, "l": ["p", "q"]}
+OPERANDS = ["1", "2", "-3", "true", "false", '"a"', '"b${"c"}"', '"n=${var.n}"', "var.n", "var.b"]
+BINARY = ["+", "-", "*", "==", "!=", "<", ">=", "&&", "||"]
+
+
+def x(text):
+    return parse(f"locals {{\n  x = {text}\n}}")["local"]["x"]
+
+
+def random_expression(rand, size):
+    text = rand.choice(OPERANDS)
+    for _ in range(size):
+        text = f"{text} {rand.choice(BINARY)} {rand.choice(OPERANDS)}"
+        if rand.random() < 0.3:
+            text = f"({text})"
+        if rand.random() < 0.2:
+            text = f"{rand.choice(OPERANDS)} == {rand.choice(OPERANDS)} ? {text} : {rand.choice(OPERANDS)}"
+        if rand.random() < 0.2:
+            text = f'"<${{{text}}}>"'
+    return text
+
+
+def evaluate(expr):
+    try:
+        return Evaluator().scope(VARIABLES).evaluate(expr)
+    except EvaluationError:
+        return "<error>"
+
+
+class TestNormalize(FuzzyTestCase):
+    def test_folds(self):
+        self.assertEqual(normalize_expression(x('"a${"b"}c"')), {"literal": "abc"})
+        self.assertEqual(normalize_expression(x('"a${"b${var.c}"}"')), {"concat": [{"literal": "ab"}, "var.c"]})
+        self.assertEqual(normalize_expression(x('"port ${8080}"')), {"literal": "port 8080"})
+        self.assertEqual(normalize_expression(x("--1")), 1)
+        self.assertEqual(normalize_expression(x("!true")), False)
+        self.assertEqual(normalize_expression(x("60 * 60 * 24")), 86400)
+        self.assertEqual(normalize_expression(x("true ? var.a : var.b")), "var.a")
+        self.assertEqual(normalize_expression(x('"a" == "a" ? var.a : var.b')), "var.a")
+        self.assertEqual(normalize_expression(x('var.a == "" ? true : false')), {"eq": ["var.a", {"literal": ""}]})
+        self.assertEqual(normalize_expression(x('var.a == "" ? false : true')), {"not": {"eq": ["var.a", {"literal": ""}]}})
+        self.assertEqual(normalize_expression(x("(true ? var.a + var.b : 0) + var.c")), {"add": ["var.a", "var.b", "var.c"]})
+        self.assertEqual(normalize_expression(x('map("Name", var.h)')), {"Name": "var.h"})
+        self.assertEqual(normalize_expression(x('1 == "1"')), False)
+
+        # AN OBJECT WITH ONE OPERATOR-NAMED KEY PARSES THE SAME AS THE OPERATOR,
+        # SO IT IS FOLDED, AND EVALUATES THE SAME AS BEFORE
+        self.assertEqual(x("{not = true}"), x("!true"))
+        self.assertEqual(normalize_expression(x("{not = true}")), False)
+        self.assertEqual(normalize_expression(x("{neg = 1}")), -1)
+        self.assertEqual(evaluate(x("{neg = 1}")), -1)
+
+        # NOT FOLDED
+        self.assertEqual(normalize_expression(x("var.a == var.a")), {"eq": ["var.a", "var.a"]})
+        self.assertEqual(normalize_expression(x("var.a ? 1 : 0")), {"if_then_else": ["var.a", 1, 0]})
+        self.assertEqual(normalize_expression(x('map("add", 1)')), {"map": [{"literal": "add"}, 1]})
+        self.assertEqual(normalize_expression(x("1.5 * 2")), {"mul": [1.5, 2]})
+        self.assertEqual(
+            normalize_expression(x('concat(var.l, ["a", "b"])')),
+            {"concat": ["var.l", {"literal": "a"}, {"literal": "b"}]},
+        )
+
+    def test_attributes(self):
+        result = parse('resource "a" "b" {\n  add = 1 + 2\n  not = !true\n  name = "${"x"}y"\n}')
+        self.assertEqual(
+            normalize(result),
+            {"a": {"b": [{"add": 3}, {"not": False}, {"name": {"literal": "xy"}}]}},
+        )
+        self.assertEqual(parse('locals {\n  x = "${"a"}b"\n}', normalize=True), {"local": {"x": {"literal": "ab"}}})
+
+        # A BODY WITH ONE ATTRIBUTE IS A dict, BUT STILL NOT AN OPERATOR
+        self.assertEqual(normalize(parse("locals {\n  not = true\n}")), {"local": {"not": True}})
+        self.assertEqual(normalize(parse("locals {\n  neg = 1\n}")), {"local": {"neg": 1}})
+        self.assertEqual(
+            normalize(parse('resource "a" "b" {\n  concat = "x"\n}')),
+            {"a": {"b": {"concat": {"literal": "x"}}}},
+        )
+
+    def test_same_value(self):
+        rand = random.Random(7)
+        texts = ['concat(var.l, ["a", "b"])', 'concat(["a"], ["b", "c"])']
+        for _ in range(300):
+            texts.append(random_expression(rand, rand.randint(1, 5)))
+        for text in texts:
+            expr = x(text)
+            expected = evaluate(expr)
+            actual = evaluate(normalize_expression(expr))
+            self.assertEqual(json.dumps(actual), json.dumps(expected), text)
+
+    def test_corpus(self):
+        # SMALLER, AND STILL WRITES BACK TO THE SAME
+        before, after = 0, 0
+        for path in find_files("tests/examples"):
+            with open(path) as file:
+                try:
+                    result = parse(file.read())
+                except Exception:
+                    continue
+            folded = normalize(result)
+            before += len(json.dumps(result, default=str))
+            after += len(json.dumps(folded, default=str))
+            if folded != result:
+                self.assertEqual(parse(to_hcl(folded)), folded, path)
+        self.assertLess(after, before)
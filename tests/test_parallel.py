@@ -0,0 +1,67 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import os
+import tempfile
+
+from mo_files import File
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, parse_directory, parse_files, ParseCache
+from terraform_parser.parallel import find_files
+from terraform_parser.utils import SQL_NULL
+
+
+class TestParallel(FuzzyTestCase):
+    def test_directory(self):
+        expected = list(find_files("tests/examples/aws"))
+        results = list(parse_directory("tests/examples/aws", jobs=2))
+        self.assertEqual(sorted(r.path for r in results), sorted(expected))
+        self.assertEqual([r.error for r in results if r.error], [])
+
+        for r in results:
+            if r.path.endswith(os.path.join("aws_ec2_ebs_docker_host", "data.tf")):
+                self.assertEqual(r.result, parse(File(r.path).read()))
+                break
+        else:
+            self.fail("expecting data.tf")
+
+    def test_errors_are_reported_per_file(self):
+        with tempfile.TemporaryDirectory() as temp:
+            good = os.path.join(temp, "good.tf")
+            bad = os.path.join(temp, "bad.tf")
+            with open(good, "w") as f:
+                f.write("""variable "x" {default = null}""")
+            with open(bad, "w") as f:
+                f.write("""variable "x" {""")
+
+            results = {r.path: r for r in parse_files([good, bad], jobs=2)}
+
+        self.assertIs(results[good].result["var"]["x"]["default"], SQL_NULL)
+        self.assertIsNone(results[good].error)
+        self.assertIsNone(results[bad].result)
+        self.assertIn("ParseException", results[bad].error)
+
+    def test_in_process_cache_is_per_call(self):
+        with tempfile.TemporaryDirectory() as temp:
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(temp, f"{i}.tf"))
+                with open(paths[-1], "w") as f:
+                    f.write(f"""variable "x{i}" {{default = {i}}}""")
+            cache = ParseCache(os.path.join(temp, "cache"))
+
+            cached = parse_files(paths[:2], jobs=1, cache=cache)
+            next(cached)
+            # ANOTHER CALL, WITHOUT A CACHE, WHILE THE FIRST IS UNFINISHED
+            list(parse_files(paths[2:], jobs=1))
+            list(cached)
+
+            for path in paths:
+                with open(path) as f:
+                    self.assertEqual(f.read() in cache, path != paths[2])
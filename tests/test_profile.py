@@ -0,0 +1,102 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from threading import Thread
+
+from mo_parsing.core import ParserElement
+from mo_parsing.whitespaces import Whitespace
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, Profile
+from terraform_parser.profile import WHITESPACE
+
+CONTENT = """
+# A COMMENT
+resource "aws_instance" "this" {
+  count = var.enabled ? 1 : 0
+  tags  = {for k, v in var.tags : k => upper(v)}
+}
+"""
+
+
+class TestProfile(FuzzyTestCase):
+    def test_counts(self):
+        profile = Profile()
+        result = parse(CONTENT, profile=profile)
+        self.assertEqual(result, parse(CONTENT))
+
+        stats = profile.to_dict()
+        self.assertEqual(stats["everything"], {"attempts": 1, "successes": 1, "failures": 0})
+        self.assertGreater(stats["expression"]["attempts"], 0)
+        self.assertGreater(stats[WHITESPACE]["attempts"], 0)
+        for name, row in stats.items():
+            self.assertEqual(row["attempts"], row["successes"] + row["failures"])
+            self.assertLessEqual(row["self"], row["time"] + 1e-6)
+            self.assertFalse(name.startswith("<") and name != WHITESPACE)
+
+    def test_accumulates(self):
+        profile = Profile()
+        parse(CONTENT, profile=profile)
+        parse(CONTENT, profile=profile)
+        self.assertEqual(profile.to_dict()["everything"]["attempts"], 2)
+
+    def test_anonymous(self):
+        profile = Profile(anonymous=True)
+        parse(CONTENT, profile=profile)
+        self.assertTrue(any(name.startswith("<And") for name in profile.stats))
+
+    def test_report(self):
+        profile = Profile()
+        parse(CONTENT, profile=profile)
+        lines = profile.report(sort="attempts", limit=5).splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[0].startswith("name"))
+        attempts = [int(line.split()[1]) for line in lines[1:]]
+        self.assertEqual(attempts, sorted(attempts, reverse=True))
+
+    def test_restored(self):
+        parse_, skip = ParserElement._parse, Whitespace.skip
+        profile = Profile()
+        with self.assertRaises(Exception):
+            parse("resource {", profile=profile)
+        self.assertIs(ParserElement._parse, parse_)
+        self.assertIs(Whitespace.skip, skip)
+
+        with profile:
+            with self.assertRaises(Exception):
+                with profile:
+                    pass
+        self.assertIs(ParserElement._parse, parse_)
+
+    def test_overlapping(self):
+        parse_, skip = ParserElement._parse, Whitespace.skip
+        first, second = Profile(), Profile()
+        first.__enter__()
+        second.__enter__()
+        parse(CONTENT)
+        first.__exit__(None, None, None)  # NOT THE LAST ONE ENTERED
+        parse(CONTENT)
+        second.__exit__(None, None, None)
+        self.assertIs(ParserElement._parse, parse_)
+        self.assertIs(Whitespace.skip, skip)
+        self.assertEqual(first.to_dict()["everything"]["attempts"], 1)
+        self.assertEqual(second.to_dict()["everything"]["attempts"], 2)
+
+    def test_threads(self):
+        parse_ = ParserElement._parse
+
+        def work():
+            for _ in range(5):
+                parse(CONTENT, profile=Profile())
+
+        threads = [Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIs(ParserElement._parse, parse_)
@@ -0,0 +1,95 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import subprocess
+import sys
+import tempfile
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+import terraform_parser
+from terraform_parser import parse, ParseCache
+
+# EVERY PUBLIC NAME OF terraform_parser BEFORE THE GRAMMAR WAS LAZY
+BASELINE_NAMES = """
+    ADD AND And AnyChar ASSIGN assignment assignments basic_template binary_ops Call
+    CaselessKeyword CaselessLiteral Char CharsNotIn CloseMatch code COLON Combine
+    COMMA comment compound compound_string CR Data data delimited_list Dict DIV
+    dynamic_accessor ELLIPSIS ELSE Empty eod_parser EQ everything expect export
+    expression FALSE first FollowedBy FOR for_end for_object for_preamble for_start
+    for_template for_tuple Forward function_call functions Group GT GTE identifier
+    IF if_else if_ends if_template if_when IN infix_notation int_num is_number json
+    Keyword keyword keywords KNOWN_OPS LB LC LDC LEFT_ASSOC LineEnd LineStart
+    Literal local LookAhead LookBehind LP LPC LT LTE Many MatchAll MatchFirst MOD
+    module MUL multiline multiline_content multiline_string multiline_string_parser
+    multiline_white name NEG NEQ NO_WHITESPACE NoMatch NOT NotAny NULL object one_of
+    OneOrMore Optional OR Or output parse ParseEnhancement ParseException
+    ParseExpression ParserElement ParseResults ParseSyntaxException path POS
+    PrecededBy property provider quote RB RC real_num RecursiveGrammarException
+    Regex resource rest RIGHT_ASSOC RP scrub set_parser_names simple_accessor
+    single_line_white SkipTo splat_accessor SQL_NULL string_segment StringEnd
+    StringStart SUB sub_resource Suppress template terraform THEN to_concat
+    to_inner_object to_json_call to_json_operator to_list to_multiline
+    to_multiline_string to_offset to_splat to_string Token TokenConverter TRUE
+    unary_ops utils variable White Whitespace Word WordEnd WordStart ZeroOrMore
+""".split()
+# GLOBALS OF THE OLD HEREDOC RULE, REMOVED WHEN TERMINATORS BECAME PER PARSE
+REMOVED = {"eod_parser", "multiline_content", "rest"}
+
+CONTENT = 'resource "aws_s3_bucket" "logs" {bucket = "logs"}'
+
+
+def grammar_built(statement):
+    """
+    :return: True IF RUNNING statement IN A NEW INTERPRETER BUILT THE GRAMMAR
+    """
+    code = f"import sys\n{statement}\nprint('terraform_parser.grammar' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return output.stdout.strip() == "True"
+
+
+class TestStartup(FuzzyTestCase):
+    def test_import_does_not_build_grammar(self):
+        self.assertFalse(grammar_built("import terraform_parser"))
+        self.assertFalse(grammar_built("from terraform_parser import parse_lazy, ParseCache"))
+        self.assertTrue(grammar_built("from terraform_parser import everything"))
+
+    def test_cache_hit_does_not_build_grammar(self):
+        with tempfile.TemporaryDirectory() as temp:
+            parse(CONTENT, cache=ParseCache(temp))
+            statement = (
+                "from terraform_parser import parse, ParseCache\n"
+                f"parse({CONTENT!r}, cache=ParseCache({temp!r}))"
+            )
+            self.assertFalse(grammar_built(statement))
+
+    def test_unknown_name_does_not_build_grammar(self):
+        statement = (
+            "import terraform_parser\n"
+            "try:\n"
+            "    terraform_parser.no_such_name\n"
+            "except AttributeError:\n"
+            "    pass"
+        )
+        self.assertFalse(grammar_built(statement))
+
+    def test_baseline_names(self):
+        for name in BASELINE_NAMES:
+            if name not in REMOVED:
+                getattr(terraform_parser, name)
+        for name in REMOVED:
+            with self.assertRaises(AttributeError):
+                getattr(terraform_parser, name)
+
+    def test_lazy_names(self):
+        # normalize IS ALSO A SUBMODULE, BUT THE EXPORT IS THE FUNCTION
+        for name in terraform_parser._lazy:
+            self.assertTrue(callable(getattr(terraform_parser, name)), name)
+        self.assertEqual(terraform_parser.utils.__name__, "terraform_parser.utils")
@@ -0,0 +1,50 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from concurrent.futures import ThreadPoolExecutor
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse
+
+
+def heredoc(terminator, dash, body):
+    return (
+        f'resource "a" "{terminator}" {{\n'
+        f"  policy = <<{dash}{terminator}\n"
+        f"{body}\n"
+        f"  {terminator}\n"
+        f"}}\n"
+    )
+
+
+DOCUMENTS = [
+    heredoc("EOF", "", "  hello ${var.name}"),
+    heredoc("POLICY", "-", '  {"Action": "s3:*", "Note": "EOF is not the end"}'),
+    heredoc("END", "", "  %{if var.x}yes%{endif}"),
+    heredoc("EOT", "-", "  EO\n  E\n  line"),
+]
+
+
+class TestThreads(FuzzyTestCase):
+    def test_heredoc_terminators(self):
+        result = parse(DOCUMENTS[1])
+        expected = {"a": {"POLICY": {"policy": {
+            "literal": '\n  {"Action": "s3:*", "Note": "EOF is not the end"}\n  '
+        }}}}
+        self.assertEqual(result, expected)
+
+    def test_concurrent_mixed_terminators(self):
+        expected = [parse(d) for d in DOCUMENTS]
+        work = [i % len(DOCUMENTS) for i in range(400)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: (i, parse(DOCUMENTS[i])), work))
+
+        for i, result in results:
+            self.assertEqual(result, expected[i])
@@ -0,0 +1,131 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import io
+import json
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from terraform_parser import parse, to_hcl, write
+from terraform_parser.parallel import find_files
+from terraform_parser.utils import SQL_NULL
+
+
+def to_json(value):
+    return json.dumps(
+        value, sort_keys=True, default=lambda v: "<<NULL>>" if v is SQL_NULL else str(v)
+    )
+
+
+def drop_empty(value):
+    """
+    parse() RETURNS `x = {}` AS A NAMELESS {}, WHICH CAN NOT BE WRITTEN BACK
+    """
+    if isinstance(value, list):
+        return [drop_empty(v) for v in value if v != {}]
+    if isinstance(value, dict):
+        return {k: drop_empty(v) for k, v in value.items()}
+    return value
+
+
+class TestWriter(FuzzyTestCase):
+    def test_examples_round_trip(self):
+        paths = list(find_files("tests/examples"))
+        self.assertGreater(len(paths), 100)
+        for path in paths:
+            with open(path, encoding="utf8") as f:
+                expected = parse(f.read())
+            text = to_hcl(expected)
+            # STRICT COMPARISON, NOT FUZZY
+            self.assertEqual(to_json(parse(text)), to_json(drop_empty(expected)), path)
+            # CANONICAL: WRITING AGAIN CHANGES NOTHING
+            self.assertEqual(to_hcl(parse(text)), text, path)
+
+    def test_expressions(self):
+        expressions = [
+            "1 + 2 * 3",
+            "(1 + 2) * 3",
+            "a - (b - c)",
+            "!var.x",
+            "-var.x",
+            "var.a == null ? 1 : 2",
+            "a && b || c",
+            "var.list[*].id",
+            "aws_instance.x[0].id",
+            'x["k"]',
+            "x[var.i]",
+            "foo(1).bar",
+            '[for s in var.list : upper(s) if s != ""]',
+            "{for k, v in var.map : k => v...}",
+            '"hi ${var.x}!"',
+            '"%{if var.x}yes%{else}no%{endif}"',
+            '"a%{if var.x}yes%{else}no%{endif}b"',
+            '"a%{if var.x}y${var.y}s%{endif}"',
+            '"${var.a}%{if var.x}yes%{endif}"',
+            '"%{for x in var.l}${x},%{endfor}"',
+            '"cost $${x} is 5%%{y}"',
+            '"\\nfoo"',
+            '"\\nhi ${var.x}"',
+        ]
+        for expression in expressions:
+            source = f"locals {{\n  a = {expression}\n}}\n"
+            self.assertEqual(to_hcl(parse(source)), source, expression)
+
+    def test_blocks(self):
+        source = (
+            'resource "aws_s3_bucket" "logs" {}\n'
+            "\n"
+            'module "vpc" {\n'
+            '  source = "./vpc"\n'
+            "}\n"
+            "\n"
+            'data "aws_vpc" "this" {\n'
+            "  id      = var.vpc_id\n"
+            "  default = true\n"
+            "}\n"
+            "\n"
+            'variable "tags" {\n'
+            '  type = "map"\n'
+            "}\n"
+        )
+        self.assertEqual(to_hcl(parse(source)), source)
+
+    def test_types(self):
+        source = (
+            'variable "a" {\n'
+            "  type = object({\n"
+            "    name = string\n"
+            "    tags = list(string)\n"
+            "  })\n"
+            "}\n"
+            "\n"
+            'variable "b" {\n'
+            "  type = map(object({\n"
+            "    size = number\n"
+            "  }))\n"
+            "}\n"
+            "\n"
+            'variable "c" {\n'
+            "  type = object({})\n"
+            "}\n"
+        )
+        self.assertEqual(to_hcl(parse(source)), source)
+
+    def test_heredoc_if(self):
+        sources = [
+            "locals {\n  a = <<EOF\nhello\n%{if var.x}yes%{else}no%{endif}\nbye\nEOF\n}\n",
+            "locals {\n  a = <<EOF\nhello ${var.y}\n%{if var.x}yes%{endif}\nEOF\n}\n",
+        ]
+        for source in sources:
+            self.assertEqual(to_hcl(parse(source)), source, source)
+
+    def test_write_streams(self):
+        result = parse('locals {\n  a = <<EOF\nline ${var.x}\nEOF\n}\n')
+        file = io.StringIO()
+        write(result, file)
+        self.assertEqual(file.getvalue(), "locals {\n  a = <<EOF\nline ${var.x}\nEOF\n}\n")